@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Client, Booking, Hostel, Room, RoomImage, PromoParticipant, Notification, Reviews
+from .models import Client, Booking, Hostel, Room, RoomImage, PromoParticipant, Notification, NotificationArchive, Reviews
 
 class RoomImageInline(admin.TabularInline):
     model = RoomImage
@@ -15,5 +15,6 @@ admin.site.register(Hostel)
 admin.site.register(Room, RoomAdmin)
 admin.site.register(PromoParticipant)
 admin.site.register(Notification)
+admin.site.register(NotificationArchive)
 admin.site.register(Reviews)
 admin.site.register(RoomImage)
@@ -1,5 +1,10 @@
+from django.db import DEFAULT_DB_ALIAS
 from rest_framework_simplejwt.authentication import JWTAuthentication
-from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+from .models import ClaimsUser, Client
+from .services.users import cached_user, token_version
 
 class CustomJWTAuthentication(JWTAuthentication):
     def get_user(self, validated_token):
@@ -12,3 +17,59 @@ class CustomJWTAuthentication(JWTAuthentication):
              raise AuthenticationFailed('У цього користувача немає профілю клієнта або прав адміністратора')
 
         return user
+
+
+def deferred_instance(model, values):
+    """
+    Екземпляр model лише з полями values ({attname: значення}), решта відкладені.
+    Model.from_db бере значення в порядку _meta.concrete_fields, а не field_names.
+    """
+    attnames = [field.attname for field in model._meta.concrete_fields if field.attname in values]
+    return model.from_db(DEFAULT_DB_ALIAS, attnames, [values[attname] for attname in attnames])
+
+
+def claims_user(validated_token):
+    """ClaimsUser з підписаних claims; профіль клієнта — відкладений Client з client_id."""
+    user_id = ClaimsUser._meta.pk.to_python(validated_token[api_settings.USER_ID_CLAIM])
+    user = deferred_instance(ClaimsUser, {
+        'id': user_id,
+        'username': validated_token['username'],
+        'is_staff': validated_token['is_staff'],
+        'is_superuser': validated_token['is_superuser'],
+        'is_active': True,
+    })
+    client = None
+    if validated_token.get('client_id'):
+        client = deferred_instance(Client, {'id': validated_token['client_id'], 'user_id': user_id})
+        client._state.fields_cache['user'] = user
+    # None у кеші зворотного OneToOne означає «профілю немає» без запиту до БД
+    user._state.fields_cache['client'] = client
+    return user
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """
+    Автентифікація без запитів до БД: request.user збирається з claims токена.
+    Токени, видані до появи claims, обслуговуються повним User з LRU процесу.
+    Відкликані токени (services.users.revoke_tokens) відхиляються з 401.
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken('Токен не містить ідентифікатора користувача')
+
+        # Один GET у Redis: деактивація, видалення чи зміна ролі підвищують версію токенів
+        if validated_token.get('token_version', 0) < token_version(user_id):
+            raise AuthenticationFailed('Токен відкликано, оновіть його', code='token_revoked')
+
+        if 'role' in validated_token:
+            return claims_user(validated_token)
+
+        user = cached_user(user_id)
+        if user is None:
+            raise AuthenticationFailed('Користувача не знайдено', code='user_not_found')
+        if not user.is_active:
+            raise AuthenticationFailed('Користувач неактивний', code='user_inactive')
+        return user
@@ -1,24 +1,94 @@
+import asyncio
 import json
+import logging
+from collections import deque
 from urllib.parse import parse_qs
 from channels.generic.websocket import AsyncWebsocketConsumer
 from channels.db import database_sync_to_async
+from django.conf import settings
 from django.contrib.auth.models import AnonymousUser
+from django.db.models import Q
 from rest_framework_simplejwt.tokens import AccessToken
-from django.contrib.auth import get_user_model
 
-User = get_user_model()
+from .authentication import ClaimsJWTAuthentication
+from .models import Hostel, Notification
+from .services.availability import availability_group
+from .services.notificate import notification_event
+
+logger = logging.getLogger(__name__)
+
+# Скільки пропущених сповіщень віддаємо при відновленні; якщо більше — клієнт перечитує список через REST
+REPLAY_LIMIT = 100
+# Код закриття для клієнта, що не встигає читати сповіщення (NOTIFICATION_WS_BUFFER_LIMIT)
+SLOW_CONSUMER_CLOSE_CODE = 4008
+# Відправка кадрів зламалась: з'єднання закривається, фронтенд перепідключиться з last_id
+SEND_FAILED_CLOSE_CODE = 1011
+# Готелю немає або він не активний: підписка на його зайнятість недоступна
+HOSTEL_NOT_FOUND_CLOSE_CODE = 4404
 
 @database_sync_to_async
 def get_user_from_token(token_string):
     try:
-        access_token = AccessToken(token_string)
-        user = User.objects.get(id=access_token['user_id'])
-        return user
+        # Claims-токен не потребує запиту до БД; старі токени — через LRU користувачів
+        return ClaimsJWTAuthentication().get_user(AccessToken(token_string))
     except Exception as e:
         print(f"Помилка токена: {e}")
         return AnonymousUser()
 
+@database_sync_to_async
+def missed_notifications(user_id, last_id, limit=REPLAY_LIMIT):
+    """
+    Сповіщення, доставлені після last_id, у порядку доставки (індекс recipient, delivered_at, id).
+    Не за id: диспетчер повторює невдалі рядки пізніше, тож менший id приходить після більшого.
+    None — last_id не знайдено серед доставлених, клієнт перечитує список через REST.
+    """
+    notifications = Notification.objects.filter(recipient_id=user_id, delivered_at__isnull=False)
+    if last_id:
+        delivered_at = notifications.filter(pk=last_id).values_list('delivered_at', flat=True).first()
+        if delivered_at is None:
+            return None
+        notifications = notifications.filter(
+            Q(delivered_at__gt=delivered_at) | Q(delivered_at=delivered_at, id__gt=last_id)
+        )
+    return list(notifications.order_by('delivered_at', 'id')[:limit + 1])
+
+
+@database_sync_to_async
+def active_hostel_exists(hostel_id):
+    return Hostel.objects.filter(pk=hostel_id, is_active=True).exists()
+
+
+def parse_last_id(value):
+    try:
+        return max(int(value), 0)
+    except (TypeError, ValueError):
+        return None
+
+
 class NotificationConsumer(AsyncWebsocketConsumer):
+    """
+    Події з'єднання не надсилаються по одній: вони збираються в черзі протягом
+    NOTIFICATION_WS_COALESCE_MS і йдуть одним кадром {"batch": [...]} (одна подія — як є).
+
+    Недоставлені дані обмежені NOTIFICATION_WS_BUFFER_LIMIT байтами: черга, кадр, який
+    сервер ще пише в сокет, і кадри без підтвердження {"ack": N} (N — кількість отриманих
+    кадрів). Daphne не показує застосунку буфер сокета, тож повільного читача видно лише
+    з підтверджень. Понад ліміт клієнт відключається з кодом 4008.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.coalesce_window = settings.NOTIFICATION_WS_COALESCE_MS / 1000
+        self.buffer_limit = settings.NOTIFICATION_WS_BUFFER_LIMIT
+        self.outbox = []  # [(розмір, подія)], ще не передані серверу
+        self.outbox_bytes = 0
+        self.writing_bytes = 0  # кадр, send якого ще не завершився
+        self.frames_sent = 0
+        self.unacked = deque()  # розміри надісланих, але не підтверджених кадрів
+        self.unacked_bytes = 0
+        self.flush_task = None
+        self.dropped = False
+
     async def connect(self):
         query_string = self.scope['query_string'].decode('utf-8')
         query_params = parse_qs(query_string)
@@ -32,12 +102,138 @@ class NotificationConsumer(AsyncWebsocketConsumer):
             await self.close()
         else:
             self.group_name = f"user_{self.user.id}"
+            # Спершу підписка, потім відтворення: подія між ними може прийти двічі, але не загубиться
             await self.channel_layer.group_add(self.group_name, self.channel_name)
             await self.accept()
+            last_id = parse_last_id(query_params.get('last_id', [None])[0])
+            if last_id is not None:
+                await self.replay(last_id)
+
+    async def receive(self, text_data=None, bytes_data=None):
+        # Курсор можна передати й повідомленням: {"last_id": 123}; підтвердження — {"ack": 5}
+        try:
+            message = json.loads(text_data or '{}')
+            last_id = parse_last_id(message.get('last_id'))
+        except (ValueError, AttributeError):
+            return
+        if 'ack' in message:
+            self.acknowledge(message['ack'])
+        if last_id is not None:
+            await self.replay(last_id)
+
+    def acknowledge(self, count):
+        """Клієнт отримав перші count кадрів з'єднання: вони більше не займають буфер."""
+        try:
+            count = int(count)
+        except (TypeError, ValueError):
+            return
+        while self.unacked and self.frames_sent - len(self.unacked) < count:
+            self.unacked_bytes -= self.unacked.popleft()
+
+    def pending_bytes(self):
+        return self.outbox_bytes + self.writing_bytes + self.unacked_bytes
+
+    async def replay(self, last_id):
+        missed = await missed_notifications(self.user.id, last_id)
+        if missed is None or len(missed) > REPLAY_LIMIT:
+            await self.send_frame({"resync": True})
+            return
+        for notification in missed:
+            await self.send_notification(notification_event(notification))
 
     async def disconnect(self, close_code):
+        self.outbox = []
+        self.outbox_bytes = 0
+        if self.flush_task is not None:
+            self.flush_task.cancel()
         if hasattr(self, 'group_name'):
             await self.channel_layer.group_discard(self.group_name, self.channel_name)
 
+    async def enqueue(self, item):
+        if self.dropped:
+            return
+        size = len(json.dumps(item))
+        if self.pending_bytes() + size > self.buffer_limit:
+            # Клієнт не читає: звільняємо пам'ять воркера, фронтенд перепідключиться з last_id
+            logger.warning(
+                "Повільний клієнт %s: %s байт не доставлено, з'єднання закрито", self.group_name, self.pending_bytes()
+            )
+            self.dropped = True
+            self.outbox = []
+            self.outbox_bytes = 0
+            if self.flush_task is not None:
+                self.flush_task.cancel()
+            await self.close(code=SLOW_CONSUMER_CLOSE_CODE)
+            return
+        self.outbox.append((size, item))
+        self.outbox_bytes += size
+        if self.flush_task is None:
+            self.flush_task = asyncio.ensure_future(self.flush())
+            self.flush_task.add_done_callback(self.flush_done)
+
+    def flush_done(self, task):
+        # Без цього виняток фонової задачі губиться, а черга більше ніколи не розвантажується
+        if task.cancelled() or task.exception() is None:
+            return
+        logger.error("Не вдалося надіслати сповіщення %s", self.group_name, exc_info=task.exception())
+        self.dropped = True
+        self.outbox = []
+        self.outbox_bytes = 0
+        asyncio.ensure_future(self.close(code=SEND_FAILED_CLOSE_CODE))
+
+    async def flush(self):
+        try:
+            while self.outbox:
+                if self.coalesce_window:
+                    await asyncio.sleep(self.coalesce_window)
+                items = [item for _, item in self.outbox]
+                self.outbox, self.outbox_bytes = [], 0
+                await self.send_frame(items[0] if len(items) == 1 else {"batch": items})
+        finally:
+            self.flush_task = None
+
+    async def send_frame(self, payload):
+        # json.dumps екранує не-ASCII, тож довжина рядка дорівнює розміру кадру в байтах
+        text = json.dumps(payload)
+        self.writing_bytes = len(text)
+        try:
+            await self.send(text_data=text)
+        finally:
+            self.writing_bytes = 0
+        self.frames_sent += 1
+        self.unacked.append(len(text))
+        self.unacked_bytes += len(text)
+
     async def send_notification(self, event):
-        await self.send(text_data=json.dumps(event["data"]))
\ No newline at end of file
+        await self.enqueue(event["data"])
+
+    async def send_unread_count(self, event):
+        # Актуальний лише останній лічильник, попередні з черги прибираємо
+        self.outbox = [(size, item) for size, item in self.outbox if set(item) != {"unread_count"}]
+        self.outbox_bytes = sum(size for size, _ in self.outbox)
+        await self.enqueue({"unread_count": event["count"]})
+
+
+class AvailabilityConsumer(AsyncWebsocketConsumer):
+    """
+    Публічна підписка на зайнятість номерів готелю: ws/hostels/<id>/availability/.
+    Кадр — {"deltas": [{"room", "start_date", "last_date", "state"}]}, ночі [start_date, last_date).
+    """
+
+    async def connect(self):
+        hostel_id = self.scope['url_route']['kwargs']['hostel_id']
+        if not await active_hostel_exists(hostel_id):
+            # Приймаємо й одразу закриваємо, щоб клієнт отримав код, а не просто відмову рукостискання
+            await self.accept()
+            await self.close(code=HOSTEL_NOT_FOUND_CLOSE_CODE)
+            return
+        self.group_name = availability_group(hostel_id)
+        await self.channel_layer.group_add(self.group_name, self.channel_name)
+        await self.accept()
+
+    async def disconnect(self, close_code):
+        if hasattr(self, 'group_name'):
+            await self.channel_layer.group_discard(self.group_name, self.channel_name)
+
+    async def send_availability(self, event):
+        await self.send(text_data=json.dumps({"deltas": event["deltas"]}))
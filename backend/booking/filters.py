@@ -0,0 +1,28 @@
+from django.contrib.postgres.search import SearchRank
+from django.db import connection
+from django.db.models import F
+from rest_framework import filters
+
+from .services.search import build_search_query
+
+
+class FullTextSearchFilter(filters.SearchFilter):
+    """
+    Заміна SearchFilter для моделей зі збереженим полем search_vector.
+    Параметр ?search= працює як раніше, але шукає по GIN-індексу та сортує за релевантністю.
+    """
+    vector_field = 'search_vector'
+
+    def filter_queryset(self, request, queryset, view):
+        terms = self.get_search_terms(request)
+        if not terms:
+            return queryset
+        if connection.vendor != 'postgresql':
+            return super().filter_queryset(request, queryset, view)
+
+        query = build_search_query(terms)
+        if query is None:
+            return queryset
+        return queryset.filter(**{self.vector_field: query}).annotate(
+            search_rank=SearchRank(F(self.vector_field), query)
+        ).order_by('-search_rank', 'pk')
@@ -0,0 +1,51 @@
+import time
+import tracemalloc
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from booking.services.broadcast import AUDIENCE_ADMINS, BROADCAST_CHUNK_SIZE, audience_ids, broadcast
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = ("Вимірює час і пікову пам'ять розсилки великій кількості отримувачів. "
+            "Дані створюються в транзакції й відкочуються.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--recipients', type=int, default=100_000)
+        parser.add_argument('--chunk-size', type=int, default=BROADCAST_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self._run(options)
+                raise Rollback
+        except Rollback:
+            self.stdout.write("Тестові дані відкочено.")
+
+    def _run(self, options):
+        self.stdout.write(f"Створення {options['recipients']} адміністраторів...")
+        User.objects.bulk_create(
+            (User(username=f"bench_broadcast_{i}", is_staff=True) for i in range(options['recipients'])),
+            batch_size=10000
+        )
+
+        tracemalloc.start()
+        started = time.perf_counter()
+        created = broadcast(
+            audience_ids(AUDIENCE_ADMINS), "Технічні роботи", "Сервіс буде недоступний з 02:00 до 03:00.",
+            chunk_size=options['chunk_size']
+        )
+        elapsed = time.perf_counter() - started
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{created} сповіщень за {elapsed:.2f} с ({created / elapsed:.0f}/с), "
+            f"пік пам'яті {peak / 1024 / 1024:.1f} МБ"
+        ))
@@ -0,0 +1,78 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Q
+
+from booking.models import Hostel
+from booking.services.search import build_search_query, update_hostel_search_vector
+from booking.filters import FullTextSearchFilter
+
+WORDS = [
+    "затишний", "центр", "хостел", "сніданок", "парковка", "басейн", "вокзал", "море",
+    "гори", "тиша", "кава", "парк", "музей", "ратуша", "ліс", "озеро", "wifi", "кухня",
+]
+CITIES = ["Київ", "Львів", "Одеса", "Харків", "Дніпро", "Ужгород", "Чернівці"]
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = ("Порівнює план і час пошуку готелів через ILIKE (SearchFilter) та через tsvector + GIN. "
+            "Дані створюються в транзакції й відкочуються.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hostels', type=int, default=200_000)
+        parser.add_argument('--term', default='ратуша')
+        parser.add_argument('--repeat', type=int, default=20)
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError("Бенчмарк повнотекстового пошуку потребує PostgreSQL.")
+        try:
+            with transaction.atomic():
+                self._run(options)
+                raise Rollback
+        except Rollback:
+            self.stdout.write("Тестові дані відкочено.")
+
+    def _run(self, options):
+        random.seed(42)
+        self.stdout.write(f"Створення {options['hostels']} готелів...")
+        batch = []
+        for i in range(options['hostels']):
+            batch.append(Hostel(
+                name=f"Хостел {i}",
+                city=random.choice(CITIES),
+                address=f"вул. {random.choice(WORDS)}, {i}",
+                about=" ".join(random.choices(WORDS, k=60)),
+                is_active=True,
+            ))
+            if len(batch) >= 10000:
+                Hostel.objects.bulk_create(batch)
+                batch = []
+        if batch:
+            Hostel.objects.bulk_create(batch)
+        update_hostel_search_vector(Hostel.objects.values('pk'))
+        with connection.cursor() as cursor:
+            cursor.execute(f"ANALYZE {Hostel._meta.db_table}")
+
+        term = options['term']
+        fields = ['name', 'about', 'city', 'address']
+        ilike = Hostel.objects.filter(
+            Q(*[Q(**{f"{field}__icontains": term}) for field in fields], _connector=Q.OR)
+        )
+        query = build_search_query([term])
+        fulltext = Hostel.objects.filter(search_vector=query)
+
+        for name, qs in (("SearchFilter (ILIKE)", ilike), (FullTextSearchFilter.__name__, fulltext)):
+            self.stdout.write(self.style.MIGRATE_HEADING(name))
+            self.stdout.write(qs.explain(analyze=True))
+            started = time.perf_counter()
+            for _ in range(options['repeat']):
+                list(qs.values_list('id', flat=True)[:20])
+            elapsed = (time.perf_counter() - started) / options['repeat'] * 1000
+            self.stdout.write(f"{elapsed:.2f} мс на запит (перші 20 результатів)\n")
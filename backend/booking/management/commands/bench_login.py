@@ -0,0 +1,78 @@
+import random
+import time
+
+from django.contrib.auth import authenticate
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Q
+from django.test.utils import CaptureQueriesContext
+
+from booking.models import Client
+from booking.serializers import UniversalTokenObtainSerializer
+from booking.services.logins import last_login_buffer
+
+PASSWORD = 'bench-password'
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = ("Порівнює кількість входів за секунду на одному воркері: старий шлях (подвійна перевірка хешу, "
+            "синхронний last_login) і поточний. Дані створюються в транзакції й відкочуються.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=10_000)
+        parser.add_argument('--logins', type=int, default=20)
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self._run(options)
+                raise Rollback
+        except Rollback:
+            self.stdout.write("Тестові дані відкочено.")
+
+    def _run(self, options):
+        random.seed(42)
+        self.stdout.write(f"Створення {options['users']} клієнтів...")
+        # Хеш однаковий для всіх: рахувати його під час наповнення немає сенсу
+        password = make_password(PASSWORD)
+        users = User.objects.bulk_create(
+            (User(username=f"bench_login_{i}", email=f"Bench.Login.{i}@example.com", password=password)
+             for i in range(options['users'])),
+            batch_size=5000
+        )
+        Client.objects.bulk_create((Client(user=user, age=30) for user in users), batch_size=5000)
+        logins = [f"bench.login.{random.randrange(options['users'])}@example.com" for _ in range(options['logins'])]
+        # Старий шлях шукав email точно, тому для нього беремо той самий регістр, що й у БД
+        legacy_logins = [login.replace('bench.login', 'Bench.Login') for login in logins]
+
+        def legacy(login_input):
+            user = User.objects.filter(Q(username=login_input) | Q(email=login_input)).first()
+            if not user.check_password(PASSWORD):
+                raise RuntimeError("Невірний пароль")
+            user = authenticate(username=user.username, password=PASSWORD)
+            UniversalTokenObtainSerializer.get_token(user)
+            user.client.update_last_login()
+
+        def pipeline(login_input):
+            serializer = UniversalTokenObtainSerializer(data={'username': login_input, 'password': PASSWORD})
+            serializer.is_valid(raise_exception=True)
+
+        for name, func, inputs in (("Старий вхід", legacy, legacy_logins), ("Поточний вхід", pipeline, logins)):
+            with CaptureQueriesContext(connection) as ctx:
+                started = time.perf_counter()
+                for login_input in inputs:
+                    func(login_input)
+                elapsed = time.perf_counter() - started
+            self.stdout.write(
+                f"{name}: {len(inputs) / elapsed:.1f} входів/с, "
+                f"{len(ctx.captured_queries) / len(inputs):.1f} запитів на вхід"
+            )
+
+        flushed = last_login_buffer.flush()
+        self.stdout.write(f"Записано last_login пачкою: {flushed}")
@@ -0,0 +1,90 @@
+import random
+import time
+from datetime import date, timedelta
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from booking.models import Booking, Client, Hostel, Room
+from booking.services.occupancy import booked_room_ids, rebuild_nights
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = ("Порівнює пошук вільних номерів через підзапит по Booking "
+            "та через індекс зайнятості RoomNight. Дані створюються в транзакції й відкочуються.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--bookings', type=int, default=1_000_000)
+        parser.add_argument('--rooms', type=int, default=2000)
+        parser.add_argument('--repeat', type=int, default=20)
+        parser.add_argument('--batch-size', type=int, default=10000)
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self._run(options)
+                raise Rollback
+        except Rollback:
+            self.stdout.write("Тестові дані відкочено.")
+
+    def _run(self, options):
+        random.seed(42)
+        user = User.objects.create_user(username='bench_room_search')
+        client = Client.objects.create(user=user, age=30)
+        hostel = Hostel.objects.create(name="Bench", about="", address="", admin=user)
+        rooms = Room.objects.bulk_create(
+            [Room(number=i, price=500, bed=2, hostel=hostel) for i in range(options['rooms'])]
+        )
+
+        self.stdout.write(f"Створення {options['bookings']} бронювань...")
+        # Непересічні броні кожного номера йдуть підряд, тож історія тягнеться на роки назад
+        cursor = {room.id: date(2015, 1, 1) for room in rooms}
+        batch = []
+        for _ in range(options['bookings']):
+            room = random.choice(rooms)
+            start = cursor[room.id] + timedelta(days=random.randint(0, 3))
+            end = start + timedelta(days=random.randint(1, 5))
+            cursor[room.id] = end
+            batch.append(Booking(
+                client=client, room=room, price=500,
+                start_date=start, last_date=end, approved=random.random() < 0.8
+            ))
+            if len(batch) >= options['batch_size']:
+                Booking.objects.bulk_create(batch)
+                batch = []
+        if batch:
+            Booking.objects.bulk_create(batch)
+
+        self.stdout.write("Побудова індексу зайнятості...")
+        rebuild_nights(batch_size=options['batch_size'])
+
+        check_in = max(cursor.values()) - timedelta(days=30)
+        check_out = check_in + timedelta(days=3)
+
+        def legacy():
+            booked = Booking.objects.filter(
+                start_date__lt=check_out,
+                last_date__gt=check_in,
+                approved=True
+            ).values_list('room_id', flat=True)
+            return list(Room.objects.exclude(id__in=booked).values_list('id', flat=True))
+
+        def indexed():
+            return list(
+                Room.objects.exclude(id__in=booked_room_ids(check_in, check_out)).values_list('id', flat=True)
+            )
+
+        if sorted(legacy()) != sorted(indexed()):
+            self.stderr.write(self.style.ERROR("Результати пошуку відрізняються!"))
+
+        for name, func in (("Підзапит Booking", legacy), ("Індекс RoomNight", indexed)):
+            started = time.perf_counter()
+            for _ in range(options['repeat']):
+                func()
+            elapsed = (time.perf_counter() - started) / options['repeat'] * 1000
+            self.stdout.write(f"{name}: {elapsed:.2f} мс на запит")
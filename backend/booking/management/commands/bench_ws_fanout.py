@@ -0,0 +1,134 @@
+import asyncio
+import time
+import tracemalloc
+
+from asgiref.sync import async_to_sync, sync_to_async
+from channels.layers import DEFAULT_CHANNEL_LAYER, InMemoryChannelLayer, channel_layers
+from channels.testing import WebsocketCommunicator
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.test import override_settings
+
+from booking.consumers import NotificationConsumer
+from booking.serializers import UniversalTokenObtainSerializer
+from booking.services.notificate import create_notification
+from booking.services.outbox import dispatch_batch
+
+
+def percentile(values, q):
+    return values[min(len(values) - 1, int(len(values) * q))]
+
+
+class Command(BaseCommand):
+    help = ("Відкриває N WebSocket-з'єднань NotificationConsumer в одному процесі, розсилає пачки сповіщень "
+            "через create_notification і outbox та вимірює утримані з'єднання, пам'ять на з'єднання "
+            "і затримку від створення до отримання. Тестові користувачі та їхні сповіщення видаляються після заміру.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--connections', type=int, default=500)
+        parser.add_argument('--bursts', type=int, default=3)
+        parser.add_argument('--per-user', type=int, default=3, help="сповіщень кожному користувачу за пачку")
+        parser.add_argument('--coalesce-ms', type=int, default=None,
+                            help="вікно об'єднання подій замість NOTIFICATION_WS_COALESCE_MS")
+        parser.add_argument('--timeout', type=float, default=10, help="очікування кадру одним клієнтом (с)")
+        parser.add_argument('--in-memory', action='store_true',
+                            help="InMemoryChannelLayer замість налаштованого (Redis)")
+
+    def handle(self, *args, **options):
+        previous_layer = None
+        if options['in_memory']:
+            previous_layer = channel_layers.set(DEFAULT_CHANNEL_LAYER, InMemoryChannelLayer(capacity=10_000))
+        overrides = {}
+        if options['coalesce_ms'] is not None:
+            overrides['NOTIFICATION_WS_COALESCE_MS'] = options['coalesce_ms']
+        # Без зовнішньої транзакції: database_sync_to_async у consumer викликає close_old_connections,
+        # який закрив би з'єднання разом з atomic. Дані пишуться в autocommit і видаляються в finally
+        usernames = [f"bench_ws_{i}" for i in range(options['connections'])]
+        try:
+            with override_settings(**overrides):
+                self._run(usernames, options)
+        finally:
+            # Сповіщення та архів видаляються каскадом разом з користувачами
+            User.objects.filter(username__in=usernames).delete()
+            self.stdout.write("Тестові дані видалено.")
+            if options['in_memory']:
+                channel_layers.set(DEFAULT_CHANNEL_LAYER, previous_layer)
+
+    def _run(self, usernames, options):
+        self.stdout.write(f"Створення {len(usernames)} користувачів...")
+        User.objects.bulk_create((User(username=username) for username in usernames), batch_size=5000)
+        users = list(User.objects.filter(username__in=usernames).order_by('pk'))
+        # Claims-токени: підключення не ходить у БД за користувачем
+        tokens = [str(UniversalTokenObtainSerializer.get_token(user).access_token) for user in users]
+        async_to_sync(self._bench)(users, tokens, options)
+
+    async def _bench(self, users, tokens, options):
+        tracemalloc.start()
+        baseline, _ = tracemalloc.get_traced_memory()
+        communicators = []
+        for token in tokens:
+            communicator = WebsocketCommunicator(NotificationConsumer.as_asgi(), f"/ws/notifications/?token={token}")
+            connected, _ = await communicator.connect(timeout=options['timeout'])
+            if not connected:
+                break
+            communicators.append(communicator)
+        held, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        count = len(communicators)
+        self.stdout.write(
+            f"Утримано з'єднань: {count} з {len(tokens)}, "
+            f"пам'ять на з'єднання {(held - baseline) / max(count, 1) / 1024:.1f} КБ"
+        )
+
+        sent_at = {}
+        latencies = []
+        frames = 0
+        missing = 0
+
+        async def collect(communicator, expected):
+            nonlocal frames, missing
+            received = 0
+            while received < expected:
+                try:
+                    frame = await communicator.receive_json_from(timeout=options['timeout'])
+                except asyncio.TimeoutError:
+                    missing += expected - received
+                    return
+                now = time.perf_counter()
+                frames += 1
+                # Як фронтенд: без підтверджень consumer закриє з'єднання як повільне
+                communicator.acked = getattr(communicator, 'acked', 0) + 1
+                await communicator.send_json_to({"ack": communicator.acked})
+                for item in frame.get('batch', [frame]):
+                    if 'id' in item:
+                        latencies.append(now - sent_at[item['id']])
+                        received += 1
+
+        def publish():
+            for _ in range(options['per_user']):
+                for user in users[:count]:
+                    notification = create_notification(user, "Навантаження", "Тестове сповіщення")
+                    sent_at[notification.id] = time.perf_counter()
+            while any(dispatch_batch()[:2]):
+                pass
+
+        for burst in range(options['bursts']):
+            receivers = [asyncio.ensure_future(collect(c, options['per_user'])) for c in communicators]
+            started = time.perf_counter()
+            await sync_to_async(publish)()
+            await asyncio.gather(*receivers)
+            self.stdout.write(f"Пачка {burst + 1}: {time.perf_counter() - started:.2f} с")
+
+        for communicator in communicators:
+            await communicator.disconnect()
+
+        if not latencies:
+            self.stderr.write(self.style.ERROR("Жодне сповіщення не дійшло до клієнтів."))
+            return
+        latencies.sort()
+        self.stdout.write(self.style.SUCCESS(
+            f"Отримано {len(latencies)} сповіщень у {frames} кадрах, втрачено {missing}; "
+            f"затримка p50={percentile(latencies, 0.5) * 1000:.1f} мс "
+            f"p99={percentile(latencies, 0.99) * 1000:.1f} мс"
+        ))
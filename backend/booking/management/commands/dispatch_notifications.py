@@ -0,0 +1,52 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from booking.services.outbox import OUTBOX_BATCH_SIZE, dispatch_batch, outbox_stats
+
+
+class Command(BaseCommand):
+    help = "Доставляє сповіщення з outbox у WebSocket-групи пакетами, з повторами та backoff"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=OUTBOX_BATCH_SIZE)
+        parser.add_argument('--interval', type=float, default=0.5, help="пауза, коли черга порожня (с)")
+        parser.add_argument('--report-every', type=float, default=60, help="період звіту про чергу (с)")
+        parser.add_argument('--once', action='store_true', help="вичерпати чергу й завершитися")
+
+    def handle(self, *args, **options):
+        delivered = failed = 0
+        latencies = []
+        last_report = time.monotonic()
+        try:
+            while True:
+                batch_delivered, batch_failed, batch_latencies = dispatch_batch(options['batch_size'])
+                delivered += batch_delivered
+                failed += batch_failed
+                latencies.extend(batch_latencies)
+
+                idle = not (batch_delivered or batch_failed)
+                if idle and options['once']:
+                    break
+                if time.monotonic() - last_report >= options['report_every']:
+                    self.report(delivered, failed, latencies)
+                    delivered = failed = 0
+                    latencies = []
+                    last_report = time.monotonic()
+                if idle:
+                    time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            pass
+        self.report(delivered, failed, latencies)
+
+    def report(self, delivered, failed, latencies):
+        stats = outbox_stats()
+        line = (
+            f"доставлено={delivered} помилок={failed} черга={stats['depth']} "
+            f"найстаріше={stats['oldest_age']:.1f}с відкинуто={stats['dead']}"
+        )
+        if latencies:
+            latencies.sort()
+            p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+            line += f" затримка: сер={sum(latencies) / len(latencies):.2f}с p95={p95:.2f}с макс={latencies[-1]:.2f}с"
+        self.stdout.write(line)
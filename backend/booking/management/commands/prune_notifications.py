@@ -0,0 +1,27 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from booking.services.retention import PRUNE_BATCH_SIZE, prune_notifications, retention_days
+
+
+class Command(BaseCommand):
+    help = ("Переносить прочитані сповіщення, старші за NOTIFICATION_RETENTION_DAYS, в архів. "
+            "З --interval працює як періодичне завдання.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=None, help="термін зберігання, днів")
+        parser.add_argument('--batch-size', type=int, default=PRUNE_BATCH_SIZE)
+        parser.add_argument('--interval', type=float, default=0, help="повторювати кожні N годин; 0 — один прохід")
+
+    def handle(self, *args, **options):
+        days = options['days'] if options['days'] is not None else retention_days()
+        while True:
+            started = time.monotonic()
+            moved = prune_notifications(days, options['batch_size'])
+            self.stdout.write(self.style.SUCCESS(
+                f"Заархівовано {moved} сповіщень старших за {days} днів за {time.monotonic() - started:.1f} с."
+            ))
+            if not options['interval']:
+                break
+            time.sleep(options['interval'] * 3600)
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from booking.services.occupancy import rebuild_nights
+
+
+class Command(BaseCommand):
+    help = "Перебудовує індекс зайнятості номерів (RoomNight) з підтверджених бронювань"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=5000)
+
+    def handle(self, *args, **options):
+        created = rebuild_nights(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Індекс перебудовано: {created} ночей."))
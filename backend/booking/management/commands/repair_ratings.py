@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from booking.services.ratings import recompute_ratings
+
+
+class Command(BaseCommand):
+    help = "Перераховує денормалізовані агрегати відгуків (кількість, сума, гістограма) для готелів"
+
+    def add_arguments(self, parser):
+        parser.add_argument('hostel_ids', nargs='*', type=int, help="id готелів; без аргументів — усі")
+
+    def handle(self, *args, **options):
+        updated = recompute_ratings(options['hostel_ids'] or None)
+        self.stdout.write(self.style.SUCCESS(f"Рейтинги перераховано для {updated} готелів."))
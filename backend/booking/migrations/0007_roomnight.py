@@ -0,0 +1,72 @@
+# Generated by Django 6.0.2 on 2026-10-18 04:29
+
+from datetime import timedelta
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def fill_room_nights(apps, schema_editor):
+    Booking = apps.get_model("booking", "Booking")
+    RoomNight = apps.get_model("booking", "RoomNight")
+    batch = []
+    for booking in Booking.objects.filter(approved=True).iterator(chunk_size=5000):
+        day = booking.start_date
+        while day < booking.last_date:
+            batch.append(RoomNight(room_id=booking.room_id, booking_id=booking.pk, date=day))
+            day += timedelta(days=1)
+        if len(batch) >= 5000:
+            RoomNight.objects.bulk_create(batch)
+            batch = []
+    if batch:
+        RoomNight.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("booking", "0006_reviews_delete_comment"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RoomNight",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("date", models.DateField(verbose_name="Ніч")),
+                (
+                    "booking",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="nights",
+                        to="booking.booking",
+                    ),
+                ),
+                (
+                    "room",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="nights",
+                        to="booking.room",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["date", "room"], name="roomnight_date_room_idx"
+                    )
+                ],
+                "unique_together": {("booking", "date")},
+            },
+        ),
+        migrations.RunPython(fill_room_nights, migrations.RunPython.noop),
+    ]
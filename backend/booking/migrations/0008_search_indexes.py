@@ -0,0 +1,30 @@
+# Generated by Django 6.0.2 on 2026-10-18 04:30
+
+import django.db.models.functions.text
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("booking", "0007_roomnight"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="hostel",
+            index=models.Index(
+                django.db.models.functions.text.Upper("city"),
+                models.F("is_active"),
+                name="hostel_city_active_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="room",
+            index=models.Index(
+                fields=["hostel", "price", "bed"], name="room_hostel_price_bed_idx"
+            ),
+        ),
+    ]
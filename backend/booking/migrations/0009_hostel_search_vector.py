@@ -0,0 +1,44 @@
+# Generated by Django 6.0.2 on 2026-10-18 04:31
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.conf import settings
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations
+
+
+def fill_search_vector(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    Hostel = apps.get_model("booking", "Hostel")
+    Hostel.objects.update(
+        search_vector=SearchVector("name", weight="A", config="simple")
+        + SearchVector("city", weight="B", config="simple")
+        + SearchVector("address", weight="C", config="simple")
+        + SearchVector("about", weight="D", config="simple")
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("booking", "0008_search_indexes"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="hostel",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(
+                editable=False, null=True
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="hostel",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["search_vector"], name="hostel_search_vector_idx"
+            ),
+        ),
+        migrations.RunPython(fill_search_vector, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,65 @@
+# Generated by Django 6.0.2 on 2026-10-18 04:33
+
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum
+
+
+def fill_rating_aggregates(apps, schema_editor):
+    Hostel = apps.get_model("booking", "Hostel")
+    Reviews = apps.get_model("booking", "Reviews")
+    stats = Reviews.objects.values("hostel").annotate(
+        count=Count("id"),
+        total=Sum("rating"),
+        **{f"rating_{star}": Count("id", filter=Q(rating=star)) for star in range(1, 6)}
+    )
+    for row in stats:
+        hostel_id = row.pop("hostel")
+        Hostel.objects.filter(pk=hostel_id).update(
+            reviews_count=row.pop("count"), rating_sum=row.pop("total"), **row
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("booking", "0009_hostel_search_vector"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="hostel",
+            name="rating_1",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="hostel",
+            name="rating_2",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="hostel",
+            name="rating_3",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="hostel",
+            name="rating_4",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="hostel",
+            name="rating_5",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="hostel",
+            name="rating_sum",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="hostel",
+            name="reviews_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(fill_rating_aggregates, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 6.0.2 on 2026-10-18 04:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("booking", "0011_keyset_pagination_indexes"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="booking",
+            index=models.Index(
+                condition=models.Q(("approved__isnull", True)),
+                fields=["created_at", "id"],
+                name="booking_pending_idx",
+            ),
+        ),
+    ]
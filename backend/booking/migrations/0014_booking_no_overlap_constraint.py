@@ -0,0 +1,70 @@
+# Generated by Django 6.0.2 on 2026-10-18 04:42
+
+import booking.models
+import django.contrib.postgres.constraints
+import django.contrib.postgres.fields.ranges
+from django.contrib.postgres.operations import BtreeGistExtension
+from django.db import migrations, models
+
+# Перетини серед підтверджених і заявок, що очікують, — це рішення адміністраторів, тож міграція
+# їх не виправляє сама: вона зупиняється й показує пари, які треба розв'язати вручну.
+FIND_OVERLAPS_SQL = """
+    SELECT b.room_id, o.id, b.id
+    FROM booking_booking b
+    JOIN booking_booking o
+      ON o.room_id = b.room_id AND o.id < b.id
+     AND daterange(o.start_date, o.last_date) && daterange(b.start_date, b.last_date)
+    WHERE (b.approved IS NULL OR b.approved IS TRUE)
+      AND (o.approved IS NULL OR o.approved IS TRUE)
+    ORDER BY b.room_id, o.id, b.id
+"""
+
+
+def check_overlaps(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(FIND_OVERLAPS_SQL)
+        overlaps = cursor.fetchall()
+    if overlaps:
+        pairs = "\n".join(
+            f"  кімната {room_id}: бронювання {first} і {second}"
+            for room_id, first, second in overlaps
+        )
+        raise RuntimeError(
+            "Неможливо створити booking_room_no_overlap: є бронювання, що перетинаються "
+            "(підтверджені або ті, що очікують). Відхиліть або змініть одне з кожної пари "
+            f"та повторіть міграцію:\n{pairs}"
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("booking", "0013_updated_at"),
+    ]
+
+    operations = [
+        BtreeGistExtension(),
+        migrations.RunPython(check_overlaps, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="booking",
+            constraint=django.contrib.postgres.constraints.ExclusionConstraint(
+                condition=models.Q(
+                    ("approved__isnull", True), ("approved", True), _connector="OR"
+                ),
+                expressions=[
+                    (
+                        booking.models.DateRange(
+                            "start_date",
+                            "last_date",
+                            django.contrib.postgres.fields.ranges.RangeBoundary(),
+                        ),
+                        "&&",
+                    ),
+                    ("room", "="),
+                ],
+                name="booking_room_no_overlap",
+            ),
+        ),
+    ]
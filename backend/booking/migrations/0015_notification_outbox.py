@@ -0,0 +1,49 @@
+# Generated by Django 6.0.2 on 2026-10-18 04:46
+
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import F
+
+
+def mark_existing_delivered(apps, schema_editor):
+    # Старі сповіщення вже були надіслані напряму, повторно їх не доставляємо
+    Notification = apps.get_model("booking", "Notification")
+    Notification.objects.update(delivered_at=F("created_at"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("booking", "0014_booking_no_overlap_constraint"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="notification",
+            name="attempts",
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="notification",
+            name="delivered_at",
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name="notification",
+            name="next_attempt_at",
+            field=models.DateTimeField(
+                default=django.utils.timezone.now, editable=False
+            ),
+        ),
+        migrations.RunPython(mark_existing_delivered, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="notification",
+            index=models.Index(
+                condition=models.Q(("delivered_at__isnull", True)),
+                fields=["next_attempt_at", "id"],
+                name="notification_outbox_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 6.0.2 on 2026-10-18 05:10
+
+from django.db import migrations
+
+# Вираз збігається з тим, що Django генерує для email__iexact у PostgreSQL: UPPER("email"::text)
+CREATE_INDEX_SQL = "CREATE INDEX IF NOT EXISTS auth_user_email_upper_idx ON auth_user (UPPER(email::text))"
+DROP_INDEX_SQL = "DROP INDEX IF EXISTS auth_user_email_upper_idx"
+
+
+def create_email_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute(CREATE_INDEX_SQL)
+
+
+def drop_email_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute(DROP_INDEX_SQL)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("auth", "0012_alter_user_first_name_max_length"),
+        ("booking", "0019_claims_user"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_email_index, drop_email_index),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 6.0.2 on 2026-10-18 05:25
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("booking", "0020_user_email_upper_index"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="client",
+            name="updated_at",
+            field=models.DateTimeField(
+                auto_now=True, default=django.utils.timezone.now
+            ),
+            preserve_default=False,
+        ),
+    ]
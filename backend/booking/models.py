@@ -1,19 +1,94 @@
 __author__ = "Anton Uniatitskyi"
 __version__ = "1.0.0"
 
-from django.db import models
+from django.db import models, transaction
+from django.contrib.postgres.constraints import ExclusionConstraint
+from django.contrib.postgres.fields import DateRangeField, RangeBoundary, RangeOperators
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
+from django.db.models.functions import Upper
 from django.contrib.auth.models import User
 from django.utils import timezone
 from django.conf import settings
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.contrib.auth.hashers import make_password, check_password
 
+BOOKING_OVERLAP_CONSTRAINT = 'booking_room_no_overlap'
+
+
+class DateRange(models.Func):
+    function = 'daterange'
+    output_field = DateRangeField()
+
+
+class FieldTrackerMixin:
+    """
+    Запам'ятовує значення tracked_fields (attname) при завантаженні з БД, щоб сигнали бачили,
+    що змінилося, без повторного SELECT. Для нового об'єкта змінені всі відстежувані поля.
+    """
+    tracked_fields = ()
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = {
+            name: value for name, value in zip(field_names, values) if name in cls.tracked_fields
+        }
+        return instance
+
+    def changed_fields(self):
+        loaded = getattr(self, '_loaded_values', None)
+        if loaded is None:
+            return set(self.tracked_fields)
+        # Невідоме (відкладене) при завантаженні поле вважаємо зміненим
+        return {
+            name for name in self.tracked_fields
+            if name not in loaded or loaded[name] != getattr(self, name)
+        }
+
+    def has_changed(self, *fields):
+        return bool(self.changed_fields().intersection(fields))
+
+    def loaded_value(self, name, default=None):
+        """Значення поля на момент завантаження з БД (до змін у пам'яті)."""
+        return getattr(self, '_loaded_values', {}).get(name, default)
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        # Сигнали post_save вже відпрацювали зі старим знімком; тепер поточні значення — збережені
+        self._loaded_values = {name: getattr(self, name) for name in self.tracked_fields}
+
+
+class ClaimsUser(User):
+    """
+    Користувач, відновлений з claims access-токена. Поля, яких немає в токені, відкладені:
+    перше звернення до них підставляє значення з LRU повних User (services.users), а не з БД.
+    """
+
+    class Meta:
+        proxy = True
+
+    def refresh_from_db(self, using=None, fields=None, from_queryset=None):
+        from .services.users import cached_user
+
+        deferred = self.get_deferred_fields()
+        user = None
+        if fields and from_queryset is None and deferred.issuperset(fields):
+            user = cached_user(self.pk)
+        if user is None:
+            return super().refresh_from_db(using=using, fields=fields, from_queryset=from_queryset)
+        for attname in deferred:
+            setattr(self, attname, getattr(user, attname))
+
+
 class Client(models.Model):
     user = models.OneToOneField(
         User, on_delete=models.CASCADE, related_name='client'
     )
     age = models.PositiveIntegerField(verbose_name="Вік")
     last_login = models.DateTimeField(null=True, blank=True, verbose_name="Останній вхід")
+    # Мітка версії для ETag бронювань (client_details); зміни User теж її оновлюють
+    updated_at = models.DateTimeField(auto_now=True)
 
     def update_last_login(self):
         """Обновляет время последнего входа"""
@@ -53,10 +128,48 @@ class Hostel(models.Model):
         verbose_name="Головне фото готелю"
     )
     is_active = models.BooleanField(default=False, verbose_name="Активний")
+    search_vector = SearchVectorField(null=True, editable=False)
+    # Денормалізовані агрегати відгуків, оновлюються сигналами Reviews
+    reviews_count = models.PositiveIntegerField(default=0, editable=False)
+    rating_sum = models.PositiveIntegerField(default=0, editable=False)
+    rating_1 = models.PositiveIntegerField(default=0, editable=False)
+    rating_2 = models.PositiveIntegerField(default=0, editable=False)
+    rating_3 = models.PositiveIntegerField(default=0, editable=False)
+    rating_4 = models.PositiveIntegerField(default=0, editable=False)
+    rating_5 = models.PositiveIntegerField(default=0, editable=False)
+    # Мітка версії для ETag/Last-Modified; зміни кімнат, фото і відгуків теж її оновлюють
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(Upper('city'), 'is_active', name='hostel_city_active_idx'),
+            GinIndex(fields=['search_vector'], name='hostel_search_vector_idx'),
+        ]
+
+    RATING_FIELDS = ('reviews_count', 'rating_sum', 'rating_1', 'rating_2', 'rating_3', 'rating_4', 'rating_5')
+
+    def save(self, *args, **kwargs):
+        # Не перезаписуємо лічильники відгуків застарілими значеннями з завантаженого об'єкта
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.RATING_FIELDS
+            ]
+        super().save(*args, **kwargs)
 
     def get_room(self):
         return self.rooms.order_by("bed")
 
+    @property
+    def average_rating(self):
+        if not self.reviews_count:
+            return 0
+        return round(self.rating_sum / self.reviews_count, 1)
+
+    @property
+    def rating_histogram(self):
+        return {str(star): getattr(self, f"rating_{star}") for star in range(1, 6)}
+
     def __str__(self) -> str:
         return f"{self.name}"
 
@@ -73,6 +186,12 @@ class Room(models.Model):
     bed = models.PositiveIntegerField(verbose_name="Кількість спальних місць")
     hostel = models.ForeignKey(Hostel, on_delete=models.CASCADE, related_name="rooms")
     preview = models.ImageField(upload_to='rooms/previews/', null=True, blank=True, verbose_name="Головне фото кімнати")
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['hostel', 'price', 'bed'], name='room_hostel_price_bed_idx'),
+        ]
 
     def get_image(self):
         return self.images.all()
@@ -87,7 +206,7 @@ class RoomImage(models.Model):
     def __str__(self):
         return f"Фото кімнати №{self.room.number}"
 
-class Booking(models.Model):
+class Booking(FieldTrackerMixin, models.Model):
     client = models.ForeignKey(Client, on_delete=models.SET_NULL, null=True)
     room = models.ForeignKey(Room, on_delete=models.CASCADE)
     price = models.PositiveIntegerField(verbose_name="Ціна")
@@ -95,6 +214,7 @@ class Booking(models.Model):
     last_date = models.DateField(verbose_name="Дата кінця")
     request_text = models.TextField(verbose_name="Текст заявки", blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
     approved = models.BooleanField(
         choices=[
             (True, "Підтверджено"),
@@ -103,9 +223,47 @@ class Booking(models.Model):
     null=True
     )
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['-created_at', '-id'], name='booking_created_idx'),
+            models.Index(
+                fields=['created_at', 'id'],
+                condition=models.Q(approved__isnull=True),
+                name='booking_pending_idx'
+            ),
+        ]
+        constraints = [
+            # Перетин дат в одному номері забороняє сама БД; відхилені заявки номер не тримають
+            ExclusionConstraint(
+                name=BOOKING_OVERLAP_CONSTRAINT,
+                expressions=[
+                    (DateRange('start_date', 'last_date', RangeBoundary()), RangeOperators.OVERLAPS),
+                    ('room', RangeOperators.EQUAL),
+                ],
+                condition=models.Q(approved__isnull=True) | models.Q(approved=True),
+            ),
+        ]
+
+    tracked_fields = ('approved', 'room_id', 'start_date', 'last_date')
+
     def __str__(self) -> str:
         return f"{self.client}, {self.room}, {self.price}, {self.start_date}, {self.last_date}, {self.created_at}"
 
+class RoomNight(models.Model):
+    """Одна зайнята ніч номера за підтвердженим бронюванням (індекс зайнятості)."""
+    room = models.ForeignKey(Room, on_delete=models.CASCADE, related_name="nights")
+    booking = models.ForeignKey(Booking, on_delete=models.CASCADE, related_name="nights")
+    date = models.DateField(verbose_name="Ніч")
+
+    class Meta:
+        unique_together = ('booking', 'date')
+        indexes = [
+            models.Index(fields=['date', 'room'], name='roomnight_date_room_idx'),
+        ]
+
+    def __str__(self):
+        return f"Кімната №{self.room_id}, {self.date}"
+
 class Reviews(models.Model):
     hostel = models.ForeignKey(Hostel, on_delete=models.CASCADE, related_name="reviews")
     user = models.ForeignKey(User, on_delete=models.CASCADE)
@@ -119,6 +277,15 @@ class Reviews(models.Model):
         unique_together = ('hostel', 'user')
         ordering = ['-created_at']
 
+    def save(self, *args, **kwargs):
+        # Лічильники готелю оновлюються сигналами в тій самій транзакції
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            return super().delete(*args, **kwargs)
+
     def __str__(self):
         return f"Відгук від {self.user.username} на {self.hostel.name}"
 
@@ -137,6 +304,34 @@ class Notification(models.Model):
     message = models.TextField()
     is_read = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
+    # Outbox: рядок пишеться в транзакції запиту, у WebSocket його доставляє dispatch_notifications
+    delivered_at = models.DateTimeField(null=True, blank=True, editable=False)
+    attempts = models.PositiveSmallIntegerField(default=0, editable=False)
+    next_attempt_at = models.DateTimeField(default=timezone.now, editable=False)
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['recipient', '-created_at', '-id'], name='notification_recipient_idx'),
+            models.Index(
+                fields=['next_attempt_at', 'id'],
+                condition=models.Q(delivered_at__isnull=True),
+                name='notification_outbox_idx'
+            ),
+            models.Index(fields=['recipient'], condition=models.Q(is_read=False), name='notification_unread_idx'),
+            models.Index(fields=['recipient', 'delivered_at', 'id'], name='notification_delivery_idx'),
+        ]
+class NotificationArchive(models.Model):
+    """Прочитані сповіщення, старші за NOTIFICATION_RETENTION_DAYS; переносить prune_notifications."""
+    id = models.BigIntegerField(primary_key=True)
+    recipient = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='archived_notifications')
+    title = models.CharField(max_length=255)
+    message = models.TextField()
+    created_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
-        ordering = ['-created_at']
\ No newline at end of file
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['recipient', '-created_at'], name='notification_archive_idx'),
+        ]
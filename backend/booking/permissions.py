@@ -23,7 +23,7 @@ class IsClientOrAdmin(permissions.BasePermission):
 
         if isinstance(obj, Booking):
             if user.is_staff:
-                return obj.room.hostel.admin == user
+                return obj.room.hostel.admin_id == user.id
             return bool(obj.client and obj.client.user == user)
         return False
 
@@ -1,6 +1,7 @@
 from django.urls import path
-from .consumers import NotificationConsumer
+from .consumers import AvailabilityConsumer, NotificationConsumer
 
 websocket_urlpatterns = [
     path("ws/notifications/", NotificationConsumer.as_asgi()),
+    path("ws/hostels/<int:hostel_id>/availability/", AvailabilityConsumer.as_asgi()),
 ]
\ No newline at end of file
@@ -2,20 +2,93 @@ __author__ = "Anton Uniatitskyi"
 __version__ = "1.0.0"
 
 from rest_framework import serializers
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.settings import api_settings
 
-from .models import Hostel, HostelImage, Room, Client, Booking, RoomImage, Notification, Reviews
+from .models import (BOOKING_OVERLAP_CONSTRAINT, Hostel, HostelImage, Room, Client, Booking,
+                     RoomImage, Notification, Reviews)
 from django.utils import timezone
-from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
-from rest_framework_simplejwt.views import TokenObtainPairView
-from django.contrib.auth.models import User
-from django.db.models import Q, Sum, Avg
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from rest_framework_simplejwt.tokens import AccessToken
+from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
+from django.contrib.auth.models import User, update_last_login
+from django.db import IntegrityError, transaction
+from django.db.models import Exists, OuterRef, Q
+from django.urls import reverse
+
+from .services.bookings import create_group_booking, stay_price
+from .services.broadcast import AUDIENCE_ADMINS, AUDIENCE_CLIENTS, AUDIENCE_HOSTEL_CLIENTS
+from .services.logins import last_login_buffer
+from .services.users import user_claims
+
+HOSTEL_TOP_REVIEWS = 5
+BOOKING_OVERLAP_MESSAGE = "Ця кімната вже зайнята на обрані дати."
+GROUP_BOOKING_MAX_ROOMS = 20
+
+
+def save_without_overlap(save, *args):
+    """Виконує запис броней і перетворює порушення booking_room_no_overlap на помилку валідації."""
+    try:
+        with transaction.atomic():
+            return save(*args)
+    except IntegrityError as exc:
+        if BOOKING_OVERLAP_CONSTRAINT in str(exc):
+            raise serializers.ValidationError({api_settings.NON_FIELD_ERRORS_KEY: [BOOKING_OVERLAP_MESSAGE]})
+        raise
+
+class DynamicFieldsMixin:
+    """
+    Розріджені набори полів для серіалізатора, створеного у ViewSet (GET-запити):
+    ?fields=id,name — повернути лише перелічені поля;
+    ?expand=room_details — розгорнути лише перелічені вкладені об'єкти з Meta.expandable_fields.
+    Без параметрів повертаються всі поля, як і раніше.
+    """
+
+    @staticmethod
+    def _query_set(request, name):
+        value = request.query_params.get(name)
+        if value is None:
+            return None
+        return {item.strip() for item in value.split(',') if item.strip()}
+
+    @classmethod
+    def selected_fields(cls, request):
+        """Імена полів, які треба віддати, або None, якщо обмежень немає."""
+        if request is None or request.method not in SAFE_METHODS:
+            return None
+        fields = cls._query_set(request, 'fields')
+        expand = cls._query_set(request, 'expand')
+        if fields is None and expand is None:
+            return None
+
+        names = set(cls.Meta.fields)
+        if fields is not None:
+            names &= fields | (expand or set())
+        if expand is not None:
+            names -= set(getattr(cls.Meta, 'expandable_fields', ())) - expand
+        return names
+
+    def get_fields(self):
+        fields = super().get_fields()
+        if 'view' not in self.context:
+            return fields
+        parent = self.parent
+        if parent is not None and not (isinstance(parent, serializers.ListSerializer) and parent.parent is None):
+            return fields
+
+        selected = self.selected_fields(self.context.get('request'))
+        if selected is None:
+            return fields
+        return {name: field for name, field in fields.items() if name in selected}
 
 class HostelImageSerializer(serializers.ModelSerializer):
     class Meta:
         model = HostelImage
         fields = ['id', 'image']
 
-class ReviewsSerializer(serializers.ModelSerializer):
+class ReviewsSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     user_name = serializers.CharField(source='user.username', read_only=True)
     class Meta:
         model = Reviews
@@ -35,7 +108,7 @@ class RoomImageSerializer(serializers.ModelSerializer):
 class DeleteAccountSerializer(serializers.Serializer):
     password = serializers.CharField(write_only=True, required=True)
 
-class ClientSerializer(serializers.ModelSerializer):
+class ClientSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     first_name = serializers.CharField(source='user.first_name')
     last_name = serializers.CharField(source='user.last_name')
     email = serializers.CharField(source='user.email')
@@ -60,7 +133,7 @@ class ClientSerializer(serializers.ModelSerializer):
         instance.user.save()
         return super().update(instance, validated_data)
 
-class RoomSerializer(serializers.ModelSerializer):
+class RoomSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     hostel_name = serializers.ReadOnlyField(source='hostel.name')
     hostel_address = serializers.ReadOnlyField(source='hostel.address')
     hostel_city = serializers.ReadOnlyField(source='hostel.city')
@@ -68,28 +141,72 @@ class RoomSerializer(serializers.ModelSerializer):
     class Meta:
         model = Room
         fields = ['id', 'number', 'price', 'bed', 'hostel', 'hostel_name', 'hostel_city', 'hostel_address', 'preview', 'images']
+        expandable_fields = ['images']
 
-class HostelSerializer(serializers.ModelSerializer):
+class HostelListSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
+    """Коротка картка готелю для списку: без вкладених кімнат, фото й відгуків."""
+    average_rating = serializers.FloatField(read_only=True)
+    room_count = serializers.IntegerField(read_only=True)
+    min_price = serializers.IntegerField(read_only=True, allow_null=True)
+    free_seats = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = Hostel
+        fields = ['id', 'name', 'city', 'address', 'main_image', 'is_active', 'average_rating', 'reviews_count', 'room_count', 'min_price', 'free_seats']
+
+class HostelSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     free_seats = serializers.SerializerMethodField()
     rooms = RoomSerializer(many=True, read_only=True)
     gallery_images = HostelImageSerializer(many=True, read_only=True)
-    reviews = ReviewsSerializer(many=True, read_only=True)
+    reviews = serializers.SerializerMethodField()
+    reviews_url = serializers.SerializerMethodField()
 
-    average_rating = serializers.SerializerMethodField()
+    average_rating = serializers.FloatField(read_only=True)
+    rating_histogram = serializers.DictField(child=serializers.IntegerField(), read_only=True)
 
     class Meta:
         model = Hostel
-        fields = ['id', 'name', 'about', 'city', 'address', 'main_image', 'free_seats', 'rooms', 'gallery_images', 'is_active', 'reviews', 'average_rating']
+        fields = ['id', 'name', 'about', 'city', 'address', 'main_image', 'free_seats', 'rooms', 'gallery_images', 'is_active', 'reviews', 'reviews_url', 'average_rating', 'reviews_count', 'rating_histogram']
+        read_only_fields = ['reviews_count']
+        expandable_fields = ['rooms', 'gallery_images', 'reviews']
 
     def get_free_seats(self, obj):
-        return obj.rooms.aggregate(total=Sum('bed'))['total'] or 0
+        return sum(room.bed for room in obj.rooms.all())
+
+    def get_reviews(self, obj):
+        # HostelViewSet.retrieve підтягує останні відгуки одним prefetch у top_reviews
+        reviews = getattr(obj, 'top_reviews', None)
+        if reviews is None:
+            reviews = obj.reviews.select_related('user')[:HOSTEL_TOP_REVIEWS]
+        return ReviewsSerializer(reviews, many=True, context={'request': self.context.get('request')}).data
+
+    def get_reviews_url(self, obj):
+        url = f"{reverse('review-list')}?hostel={obj.pk}"
+        request = self.context.get('request')
+        return request.build_absolute_uri(url) if request else url
+
+class HostelSearchQuerySerializer(serializers.Serializer):
+    city = serializers.CharField(required=False, allow_blank=True)
+    check_in = serializers.DateField()
+    check_out = serializers.DateField()
+    min_beds = serializers.IntegerField(required=False, default=1, min_value=1)
 
-    def get_average_rating(self, obj):
-        avg = obj.reviews.aggregate(total=Avg('rating'))['total'] or 0
-        return round(avg, 1) if avg else 0
+    def validate(self, attrs):
+        if attrs['check_in'] >= attrs['check_out']:
+            raise serializers.ValidationError({"check_out": "Дата виїзду має бути пізніше дати заїзду."})
+        return attrs
+
+class HostelSearchSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
+    cheapest_room = serializers.JSONField(read_only=True)
+
+    class Meta:
+        model = Hostel
+        fields = ['id', 'name', 'city', 'address', 'main_image', 'cheapest_room']
 
-class BookingSerializer(serializers.ModelSerializer):
+class BookingSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     price = serializers.IntegerField(read_only=True)
+    # Готель номера потрібен сигналу сповіщень, тож завантажується разом із номером
+    room = serializers.PrimaryKeyRelatedField(queryset=Room.objects.select_related('hostel'))
 
     client_details = ClientSerializer(source='client', read_only=True)
     room_details = RoomSerializer(source='room', read_only=True)
@@ -97,12 +214,12 @@ class BookingSerializer(serializers.ModelSerializer):
     class Meta:
         model = Booking
         fields = ['id', 'client', 'room', 'start_date', 'last_date', 'price', 'approved', 'client_details', 'room_details', 'request_text']
+        expandable_fields = ['client_details', 'room_details']
 
     def validate(self, attrs):
         instance = self.instance
         start = attrs.get('start_date', instance.start_date if instance else None)
         end = attrs.get('last_date', instance.last_date if instance else None)
-        room = attrs.get('room', instance.room if instance else None)
 
         if start and end:
             if start >= end:
@@ -111,29 +228,68 @@ class BookingSerializer(serializers.ModelSerializer):
             if not instance and start < timezone.now().date():
                 raise serializers.ValidationError({"start_date": "Не можна забронювати номер на минуле."})
 
-        if room and start and end:
-            overlap = Booking.objects.filter(
-                room=room,
-                start_date__lt=end,
-                last_date__gt=start
-            ).exclude(pk=instance.pk if instance else None)
-
-            if overlap.exists():
-                raise serializers.ValidationError("Ця кімната вже зайнята на обрані дати.")
-
+        # Перетин дат перевіряє обмеження booking_room_no_overlap під час запису
         return attrs
 
     def create(self, validated_data):
-        room = validated_data['room']
-        start = validated_data['start_date']
-        end = validated_data['last_date']
+        validated_data['price'] = stay_price(
+            validated_data['room'], validated_data['start_date'], validated_data['last_date']
+        )
+        return save_without_overlap(super().create, validated_data)
 
-        days = (end - start).days
-        if days == 0: days = 1
+    def update(self, instance, validated_data):
+        return save_without_overlap(super().update, instance, validated_data)
+
+class GroupBookingSerializer(serializers.Serializer):
+    rooms = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        min_length=1,
+        max_length=GROUP_BOOKING_MAX_ROOMS
+    )
+    start_date = serializers.DateField()
+    last_date = serializers.DateField()
+    request_text = serializers.CharField(required=False, allow_blank=True, allow_null=True)
 
-        validated_data['price'] = days * room.price
+    def validate(self, attrs):
+        start, end = attrs['start_date'], attrs['last_date']
+        if start >= end:
+            raise serializers.ValidationError({"start_date": "Дата виїзду має бути пізніше дати заїзду."})
+        if start < timezone.now().date():
+            raise serializers.ValidationError({"start_date": "Не можна забронювати номер на минуле."})
+
+        room_ids = list(dict.fromkeys(attrs['rooms']))
+        # Усі номери з готелем і зайнятістю на дати — одним запитом
+        busy = Booking.objects.filter(
+            room=OuterRef('pk'), start_date__lt=end, last_date__gt=start
+        ).exclude(approved=False)
+        rooms = Room.objects.filter(pk__in=room_ids).select_related('hostel__admin').annotate(busy=Exists(busy))
+        rooms = {room.pk: room for room in rooms}
+
+        missing = [pk for pk in room_ids if pk not in rooms]
+        if missing:
+            raise serializers.ValidationError({"rooms": f"Номери не знайдено: {', '.join(map(str, missing))}."})
+        if len({room.hostel_id for room in rooms.values()}) > 1:
+            raise serializers.ValidationError({"rooms": "Усі номери групової заявки мають бути в одному готелі."})
+        busy_numbers = [str(rooms[pk].number) for pk in room_ids if rooms[pk].busy]
+        if busy_numbers:
+            raise serializers.ValidationError({"rooms": f"{BOOKING_OVERLAP_MESSAGE} Номери: {', '.join(busy_numbers)}."})
+
+        attrs['rooms'] = [rooms[pk] for pk in room_ids]
+        return attrs
 
-        return super().create(validated_data)
+    def create(self, validated_data):
+        return save_without_overlap(
+            create_group_booking,
+            validated_data.get('client'),
+            validated_data['rooms'],
+            validated_data['start_date'],
+            validated_data['last_date'],
+            validated_data.get('request_text'),
+        )
+
+class BookingDecisionSerializer(serializers.Serializer):
+    id = serializers.IntegerField(min_value=1)
+    approved = serializers.BooleanField()
 
 class RegisterSerializer(serializers.ModelSerializer):
     username = serializers.CharField(write_only=True)
@@ -179,6 +335,14 @@ class RegisterSerializer(serializers.ModelSerializer):
 class UniversalTokenObtainSerializer(TokenObtainPairSerializer):
     username_field = 'username'
 
+    @classmethod
+    def get_token(cls, user):
+        # Роль і профіль у підписаних claims: ClaimsJWTAuthentication не ходить у БД на кожен запит
+        token = super().get_token(user)
+        for claim, value in user_claims(user).items():
+            token[claim] = value
+        return token
+
     def validate(self, attrs):
         login_input = attrs.get("username")
         password = attrs.get("password")
@@ -186,17 +350,40 @@ class UniversalTokenObtainSerializer(TokenObtainPairSerializer):
         if not login_input or not password:
             raise serializers.ValidationError({"detail": "Логін та пароль обов'язкові."})
 
-        user = User.objects.filter(
-            Q(username=login_input) | Q(email=login_input)
-        ).first()
+        # username — унікальний індекс, email — індекс UPPER(email) з міграції 0020.
+        # Точний збіг має перевагу; без нього email шукаємо без урахування регістру,
+        # але лише якщо такий акаунт один — інакше незрозуміло, чий пароль перевіряти
+        candidates = list(User.objects.select_related('client').filter(
+            Q(username=login_input) | Q(email__iexact=login_input)
+        ).order_by('pk'))
+        exact = [u for u in candidates if u.username == login_input] or [
+            u for u in candidates if u.email == login_input
+        ]
+        if exact:
+            user = exact[0]
+        elif len(candidates) == 1:
+            user = candidates[0]
+        elif candidates:
+            raise serializers.ValidationError({
+                "detail": "Кілька акаунтів мають цю пошту з різним регістром. Увійдіть за логіном або точною поштою."
+            })
+        else:
+            user = None
 
         if not user:
             raise serializers.ValidationError({"detail": "Користувача з такими даними не знайдено."})
 
+        # Єдина перевірка хешу: super().validate() через authenticate() порахував би його вдруге
         if not user.check_password(str(password)):
             raise serializers.ValidationError({"detail": "Невірний пароль."})
-        attrs['username'] = user.username
-        data = super().validate(attrs)
+        if not jwt_settings.USER_AUTHENTICATION_RULE(user):
+            raise AuthenticationFailed(self.error_messages['no_active_account'], 'no_active_account')
+
+        self.user = user
+        refresh = self.get_token(user)
+        data = {'refresh': str(refresh), 'access': str(refresh.access_token)}
+        if jwt_settings.UPDATE_LAST_LOGIN:
+            update_last_login(None, user)
 
         if user.is_superuser or user.is_staff:
             data['role'] = 'admin'
@@ -205,7 +392,7 @@ class UniversalTokenObtainSerializer(TokenObtainPairSerializer):
 
         client_profile = getattr(user, 'client', None)
         if client_profile:
-            client_profile.update_last_login()
+            last_login_buffer.record(client_profile.id)
             data['client_id'] = client_profile.id
             data['fullname'] = client_profile.fullname
             data['age'] = client_profile.age
@@ -220,9 +407,50 @@ class UniversalTokenObtainSerializer(TokenObtainPairSerializer):
 class UniversalTokenObtainView(TokenObtainPairView):
     serializer_class = UniversalTokenObtainSerializer
 
-class NotificationSerializer(serializers.ModelSerializer):
+class ClaimsTokenRefreshSerializer(TokenRefreshSerializer):
+    """Перечитує claims з БД при оновленні: зміна ролі діє з наступного refresh, а не з нового входу."""
+
+    def validate(self, attrs):
+        data = super().validate(attrs)
+        access = AccessToken(data['access'])
+        user = User.objects.select_related('client').filter(
+            pk=access[jwt_settings.USER_ID_CLAIM], is_active=True
+        ).first()
+        if user is None:
+            raise AuthenticationFailed('Користувача не знайдено або він неактивний', code='user_inactive')
+        for claim, value in user_claims(user).items():
+            access[claim] = value
+        data['access'] = str(access)
+        return data
+
+class ClaimsTokenRefreshView(TokenRefreshView):
+    serializer_class = ClaimsTokenRefreshSerializer
+
+class NotificationSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Notification
         fields = ['id', 'title', 'message', 'is_read', 'created_at']
         read_only_fields = ['id', 'title', 'message', 'created_at']
 
+class BroadcastSerializer(serializers.Serializer):
+    audience = serializers.ChoiceField(choices=[
+        (AUDIENCE_HOSTEL_CLIENTS, "Клієнти готелю"),
+        (AUDIENCE_CLIENTS, "Усі клієнти"),
+        (AUDIENCE_ADMINS, "Усі адміністратори"),
+    ])
+    hostel = serializers.PrimaryKeyRelatedField(queryset=Hostel.objects.all(), required=False)
+    title = serializers.CharField(max_length=255)
+    message = serializers.CharField()
+
+    def validate(self, attrs):
+        user = self.context['request'].user
+        if attrs['audience'] == AUDIENCE_HOSTEL_CLIENTS:
+            hostel = attrs.get('hostel')
+            if hostel is None:
+                raise serializers.ValidationError({"hostel": "Вкажіть готель для розсилки його клієнтам."})
+            if not user.is_superuser and hostel.admin_id != user.id:
+                raise serializers.ValidationError({"hostel": "Розсилка доступна лише для власного готелю."})
+        elif not user.is_superuser:
+            raise serializers.ValidationError({"audience": "Розсилка всім клієнтам чи адміністраторам доступна лише суперадміністратору."})
+        return attrs
+
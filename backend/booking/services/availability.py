@@ -0,0 +1,75 @@
+import logging
+from collections import defaultdict
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.db import transaction
+
+from ..models import Room
+
+logger = logging.getLogger(__name__)
+
+STATE_PENDING = 'pending'  # заявка чекає рішення, але номер уже тримає (booking_room_no_overlap)
+STATE_BOOKED = 'booked'
+STATE_FREE = 'free'
+
+
+def availability_group(hostel_id):
+    return f"hostel_{hostel_id}_availability"
+
+
+def booking_state(booking):
+    if booking.approved is None:
+        return STATE_PENDING
+    return STATE_BOOKED if booking.approved else STATE_FREE
+
+
+def availability_delta(room_id, start_date, last_date, state):
+    """Зміна зайнятості одного номера на ночі [start_date, last_date)."""
+    return {
+        "room": room_id,
+        "start_date": str(start_date),
+        "last_date": str(last_date),
+        "state": state,
+    }
+
+
+def room_hostel_id(room_id, room=None):
+    """Готель номера; без зайвого запиту, якщо номер уже підвантажений. None — номер видалено."""
+    if room is not None:
+        return room.hostel_id
+    return Room.objects.filter(pk=room_id).values_list('hostel_id', flat=True).first()
+
+
+def publish_availability(deltas):
+    """
+    Після коміту надсилає зміни підписникам готелів: deltas — [(hostel_id, delta)].
+    На кожен готель одне повідомлення зі списком змін; збій каналу запит не ламає.
+    """
+    by_hostel = defaultdict(list)
+    for hostel_id, delta in deltas:
+        if hostel_id is not None:
+            by_hostel[hostel_id].append(delta)
+    if not by_hostel:
+        return
+
+    def send():
+        channel_layer = get_channel_layer()
+        for hostel_id, items in by_hostel.items():
+            try:
+                async_to_sync(channel_layer.group_send)(
+                    availability_group(hostel_id), {"type": "send_availability", "deltas": items}
+                )
+            except Exception:
+                logger.exception("Не вдалося надіслати зміни зайнятості готелю %s", hostel_id)
+    transaction.on_commit(send)
+
+
+def booking_deltas(bookings):
+    """Поточний стан номерів для бронювань із уже підвантаженим room."""
+    return [
+        (booking.room.hostel_id, availability_delta(
+            booking.room_id, booking.start_date, booking.last_date, booking_state(booking)
+        ))
+        for booking in bookings
+    ]
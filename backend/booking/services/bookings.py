@@ -0,0 +1,103 @@
+from itertools import chain
+
+from django.db import transaction
+from django.utils import timezone
+
+from ..models import Booking, RoomNight
+from .availability import booking_deltas, publish_availability
+from .notificate import create_notification, create_notifications
+from .occupancy import booking_nights
+
+
+def stay_price(room, start, end):
+    days = (end - start).days
+    if days == 0: days = 1
+    return days * room.price
+
+
+def create_group_booking(client, rooms, start, end, request_text=None):
+    """
+    Групова заявка: усі номери одного готелю на ті самі дати одним INSERT у транзакції.
+    Сигнали post_save не спрацьовують, тому адміністратор отримує одне зведене сповіщення.
+    """
+    with transaction.atomic():
+        bookings = Booking.objects.bulk_create([
+            Booking(
+                client=client,
+                room=room,
+                price=stay_price(room, start, end),
+                start_date=start,
+                last_date=end,
+                request_text=request_text,
+            )
+            for room in rooms
+        ])
+        publish_availability(booking_deltas(bookings))
+
+        hostel = rooms[0].hostel
+        if hostel.admin_id:
+            numbers = ", ".join(str(room.number) for room in rooms)
+            create_notification(
+                recipient=hostel.admin,
+                title="Нове групове бронювання",
+                message=f"Отримано групову заявку на номери {numbers} у готелі «{hostel.name}»."
+            )
+    return bookings
+
+
+def decision_notification(booking):
+    """Заголовок і текст сповіщення клієнту про рішення щодо заявки."""
+    room_number, hostel_name = booking.room.number, booking.room.hostel.name
+    if booking.approved:
+        return (
+            "Бронювання підтверджено",
+            f"Вашу заявку на номер {room_number} у готелі «{hostel_name}» схвалено!"
+        )
+    return (
+        "Бронювання відхилено",
+        f"На жаль, вашу заявку на номер {room_number} у готелі «{hostel_name}» відхилено."
+    )
+
+
+def decide_bookings(user, decisions):
+    """
+    Пакетне рішення по заявках: decisions — {id: approved}. Змінюються лише заявки, що очікують
+    і належать готелям користувача; по одному UPDATE на кожен результат, ночі й сповіщення — пакетно.
+    Перетинів між заявками тут немає: їх забороняє обмеження booking_room_no_overlap.
+    """
+    with transaction.atomic():
+        bookings = Booking.objects.filter(
+            pk__in=decisions, approved__isnull=True
+        ).select_related('room__hostel', 'client').only(
+            'id', 'room_id', 'start_date', 'last_date', 'approved', 'client__user_id',
+            'room__number', 'room__hostel__name', 'room__hostel__admin_id'
+        ).order_by('pk').select_for_update(of=('self',))
+        if not user.is_superuser:
+            bookings = bookings.filter(room__hostel__admin=user)
+        bookings = list(bookings)
+
+        outcome = {True: [], False: []}
+        for booking in bookings:
+            booking.approved = bool(decisions[booking.pk])
+            outcome[booking.approved].append(booking.pk)
+
+        now = timezone.now()
+        for approved, ids in outcome.items():
+            if ids:
+                Booking.objects.filter(pk__in=ids).update(approved=approved, updated_at=now)
+
+        RoomNight.objects.bulk_create(chain.from_iterable(
+            booking_nights(booking) for booking in bookings if booking.approved
+        ))
+        create_notifications([
+            (booking.client.user_id, *decision_notification(booking))
+            for booking in bookings if booking.client_id
+        ])
+        publish_availability(booking_deltas(bookings))
+
+    decided = outcome[True] + outcome[False]
+    return {
+        'approved': outcome[True],
+        'rejected': outcome[False],
+        'skipped': [pk for pk in decisions if pk not in decided],
+    }
@@ -0,0 +1,46 @@
+from itertools import islice
+
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import QuerySet
+
+from ..models import Notification
+from .unread import forget_unread
+
+BROADCAST_CHUNK_SIZE = 2000
+
+AUDIENCE_HOSTEL_CLIENTS = 'hostel_clients'
+AUDIENCE_CLIENTS = 'clients'
+AUDIENCE_ADMINS = 'admins'
+
+
+def audience_ids(audience, hostel=None):
+    """Підзапит id отримувачів: клієнти з бронюваннями в готелі, усі клієнти або всі адміністратори."""
+    if audience == AUDIENCE_HOSTEL_CLIENTS:
+        users = User.objects.filter(client__booking__room__hostel=hostel).distinct()
+    elif audience == AUDIENCE_CLIENTS:
+        users = User.objects.filter(client__isnull=False)
+    else:
+        users = User.objects.filter(is_staff=True)
+    return users.filter(is_active=True).order_by().values_list('pk', flat=True)
+
+
+def broadcast(recipient_ids, title, message, chunk_size=BROADCAST_CHUNK_SIZE):
+    """
+    Розсилка великому списку отримувачів: id читаються потоком, рядки вставляються пакетами
+    по chunk_size, тож пам'ять не залежить від кількості отримувачів. Доставку в WebSocket
+    пакетами виконує dispatch_notifications після коміту, лічильники непрочитаних скидаються.
+    """
+    created = 0
+    if isinstance(recipient_ids, QuerySet):
+        recipient_ids = recipient_ids.iterator(chunk_size=chunk_size)
+    ids = iter(recipient_ids)
+    with transaction.atomic():
+        while chunk := list(islice(ids, chunk_size)):
+            Notification.objects.bulk_create(
+                [Notification(recipient_id=pk, title=title, message=message) for pk in chunk],
+                batch_size=chunk_size
+            )
+            forget_unread(chunk)
+            created += len(chunk)
+    return created
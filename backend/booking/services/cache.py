@@ -0,0 +1,82 @@
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+VERSION_KEY = 'catalog:version'
+HITS_KEY = 'catalog:stats:hits'
+MISSES_KEY = 'catalog:stats:misses'
+
+
+def _incr(key):
+    try:
+        return cache.incr(key)
+    except ValueError:
+        cache.add(key, 0, None)
+        return cache.incr(key)
+
+
+def catalog_version():
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        # Після втрати ключа починаємо з нового значення, щоб не підхопити старі записи
+        cache.add(VERSION_KEY, time.time_ns(), None)
+        version = cache.get(VERSION_KEY)
+    return version
+
+
+def invalidate_catalog():
+    """Робить недійсними всі закешовані відповіді каталогу зміною версії в ключах."""
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.set(VERSION_KEY, time.time_ns(), None)
+
+
+def invalidate_catalog_on_commit():
+    # Одразу — щоб ніхто не читав старий кеш, і після коміту — щоб не лишився кеш,
+    # зібраний з ще не закомічених даних між цими моментами
+    invalidate_catalog()
+    transaction.on_commit(invalidate_catalog)
+
+
+def viewer_role(user):
+    """Роль для ключа кешу або None, якщо відповідь для цього користувача не кешується."""
+    if not user or not user.is_authenticated:
+        return 'anon'
+    if user.is_staff or user.is_superuser:
+        return None
+    return 'client'
+
+
+def response_cache_key(request, role):
+    query = '&'.join(
+        f"{key}={value}"
+        for key, values in sorted(request.query_params.lists())
+        for value in sorted(values)
+    )
+    base = f"{request.scheme}://{request.get_host()}{request.path}"
+    return f"catalog:{catalog_version()}:{role}:{base}?{query}"
+
+
+def get_cached(key):
+    data = cache.get(key)
+    _incr(HITS_KEY if data is not None else MISSES_KEY)
+    return data
+
+
+def set_cached(key, data):
+    cache.set(key, data, getattr(settings, 'CATALOG_CACHE_TIMEOUT', 300))
+
+
+def catalog_cache_stats():
+    hits = cache.get(HITS_KEY, 0)
+    misses = cache.get(MISSES_KEY, 0)
+    total = hits + misses
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_ratio': round(hits / total, 3) if total else 0,
+        'version': catalog_version(),
+    }
@@ -0,0 +1,53 @@
+import hashlib
+
+from django.utils import timezone
+from django.utils.http import http_date, parse_http_date_safe, parse_etags
+from rest_framework import status
+from rest_framework.response import Response
+
+from ..models import Client, Hostel, Room
+
+
+def make_etag(*parts):
+    digest = hashlib.md5(':'.join(str(part) for part in parts).encode()).hexdigest()
+    return f'"{digest}"'
+
+
+def is_not_modified(request, etag, last_modified=None):
+    """Перевіряє If-None-Match (пріоритетний) або If-Modified-Since; last_modified — unix timestamp."""
+    if_none_match = request.headers.get('If-None-Match')
+    if if_none_match:
+        etags = parse_etags(if_none_match)
+        return '*' in etags or etag in etags or f'W/{etag}' in etags
+    if_modified_since = parse_http_date_safe(request.headers.get('If-Modified-Since', ''))
+    return bool(last_modified and if_modified_since and last_modified <= if_modified_since)
+
+
+def conditional_headers(etag, last_modified, shared=False):
+    return {
+        'ETag': etag,
+        'Last-Modified': http_date(last_modified),
+        # Клієнт може зберігати відповідь, але щоразу перевіряє її умовним запитом;
+        # однакову для всіх анонімну відповідь може зберігати й проміжний кеш
+        'Cache-Control': 'public, no-cache' if shared else 'private, no-cache',
+    }
+
+
+def not_modified_response(headers):
+    return Response(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+
+def touch_hostels(hostel_ids):
+    """Оновлює мітку версії готелів, коли змінилися їхні кімнати, фото чи відгуки."""
+    Hostel.objects.filter(pk__in=hostel_ids).update(updated_at=timezone.now())
+
+
+def touch_clients(user_ids):
+    """Ім'я та пошта профілю клієнта живуть у User: їхня зміна теж змінює версію профілю."""
+    Client.objects.filter(user_id__in=user_ids).update(updated_at=timezone.now())
+
+
+def touch_rooms(room_ids):
+    now = timezone.now()
+    Room.objects.filter(pk__in=room_ids).update(updated_at=now)
+    Hostel.objects.filter(rooms__in=room_ids).update(updated_at=now)
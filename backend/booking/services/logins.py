@@ -0,0 +1,65 @@
+import atexit
+import logging
+import threading
+import time
+
+from django.db import DatabaseError
+from django.utils import timezone
+
+from ..models import Client
+
+logger = logging.getLogger(__name__)
+
+LAST_LOGIN_FLUSH_SIZE = 200
+LAST_LOGIN_FLUSH_INTERVAL = 30  # секунд; стільки last_login може відставати на активному воркері
+
+
+class LastLoginBuffer:
+    """
+    Буфер Client.last_login процесу: {client_id: час входу}. Вхід лише записує в словник,
+    а пачка пишеться одним UPDATE, коли набереться size записів або мине interval секунд.
+    """
+
+    def __init__(self, size=LAST_LOGIN_FLUSH_SIZE, interval=LAST_LOGIN_FLUSH_INTERVAL):
+        self.size = size
+        self.interval = interval
+        self._pending = {}
+        self._flushed_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def record(self, client_id, when=None):
+        with self._lock:
+            self._pending[client_id] = when or timezone.now()
+            due = len(self._pending) >= self.size or time.monotonic() - self._flushed_at >= self.interval
+        if due:
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._flushed_at = time.monotonic()
+        if not pending:
+            return 0
+        try:
+            # bulk_update не застосовує auto_now, а last_login входить у client_details бронювань
+            now = timezone.now()
+            Client.objects.bulk_update(
+                [Client(id=client_id, last_login=when, updated_at=now) for client_id, when in pending.items()],
+                ['last_login', 'updated_at'], batch_size=self.size
+            )
+        except DatabaseError:
+            logger.exception("Не вдалося записати last_login для %s клієнтів", len(pending))
+            with self._lock:
+                # Новіші входи, що прийшли під час запису, не перезаписуємо
+                for client_id, when in pending.items():
+                    self._pending.setdefault(client_id, when)
+            return 0
+        return len(pending)
+
+    def __len__(self):
+        return len(self._pending)
+
+
+last_login_buffer = LastLoginBuffer()
+# Залишок буфера пишемо при штатній зупинці воркера
+atexit.register(last_login_buffer.flush)
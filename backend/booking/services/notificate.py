@@ -1,27 +1,36 @@
-from channels.layers import get_channel_layer
-from asgiref.sync import async_to_sync
 from ..models import Notification
+from .unread import count_new_notifications
+
+
+def notification_event(notification, unread_count=None):
+    """Повідомлення для group_send у групу користувача (обробник NotificationConsumer.send_notification)."""
+    data = {
+        "id": notification.id,
+        "title": notification.title,
+        "message": notification.message,
+        "created_at": notification.created_at.strftime("%H:%M")
+    }
+    if unread_count is not None:
+        data["unread_count"] = unread_count
+    return {"type": "send_notification", "data": data}
 
 
 def create_notification(recipient, title, message):
+    """Пише сповіщення в outbox; у WebSocket його доставить dispatch_notifications після коміту."""
     notification = Notification.objects.create(
         recipient=recipient,
         title=title,
         message=message
     )
+    count_new_notifications([notification.recipient_id])
+    return notification
 
-    channel_layer = get_channel_layer()
-    group_name = f"user_{recipient.id}"
 
-    async_to_sync(channel_layer.group_send)(
-        group_name,
-        {
-            "type": "send_notification",
-            "data": {
-                "id": notification.id,
-                "title": title,
-                "message": message,
-                "created_at": notification.created_at.strftime("%H:%M")
-            }
-        }
-    )
\ No newline at end of file
+def create_notifications(items):
+    """Пакетне створення: items — [(recipient_id, title, message)], один INSERT на всі сповіщення."""
+    notifications = Notification.objects.bulk_create([
+        Notification(recipient_id=recipient_id, title=title, message=message)
+        for recipient_id, title, message in items
+    ])
+    count_new_notifications([notification.recipient_id for notification in notifications])
+    return notifications
@@ -0,0 +1,52 @@
+from datetime import timedelta
+
+from django.db import transaction
+
+from ..models import Booking, RoomNight
+
+
+def booking_nights(booking):
+    """Ночі бронювання: від дати заїзду включно до дати виїзду не включно."""
+    nights = []
+    day = booking.start_date
+    while day < booking.last_date:
+        nights.append(RoomNight(room_id=booking.room_id, booking_id=booking.pk, date=day))
+        day += timedelta(days=1)
+    return nights
+
+
+def sync_booking_nights(booking):
+    """Перебудовує ночі одного бронювання. Номер блокують лише підтверджені броні."""
+    with transaction.atomic():
+        RoomNight.objects.filter(booking_id=booking.pk).delete()
+        if booking.approved is True:
+            RoomNight.objects.bulk_create(booking_nights(booking))
+
+
+def booked_room_ids(check_in, check_out):
+    """Підзапит id номерів, зайнятих хоча б одну ніч у проміжку [check_in, check_out)."""
+    return RoomNight.objects.filter(
+        date__gte=check_in,
+        date__lt=check_out
+    ).values('room_id')
+
+
+def rebuild_nights(batch_size=5000):
+    """Повністю перебудовує індекс зайнятості з таблиці бронювань."""
+    created = 0
+    with transaction.atomic():
+        RoomNight.objects.all().delete()
+        batch = []
+        bookings = Booking.objects.filter(approved=True).only(
+            'id', 'room_id', 'start_date', 'last_date'
+        )
+        for booking in bookings.iterator(chunk_size=batch_size):
+            batch.extend(booking_nights(booking))
+            if len(batch) >= batch_size:
+                RoomNight.objects.bulk_create(batch, batch_size=batch_size)
+                created += len(batch)
+                batch = []
+        if batch:
+            RoomNight.objects.bulk_create(batch, batch_size=batch_size)
+            created += len(batch)
+    return created
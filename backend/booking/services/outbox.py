@@ -0,0 +1,85 @@
+import asyncio
+from datetime import timedelta
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.db import transaction
+from django.db.models import Count, Min
+from django.utils import timezone
+
+from ..models import Notification
+from .notificate import notification_event
+from .unread import cached_unread_counts
+
+OUTBOX_BATCH_SIZE = 200
+OUTBOX_MAX_ATTEMPTS = 8
+OUTBOX_BACKOFF_BASE = 2  # секунди, подвоюється з кожною невдалою спробою
+OUTBOX_BACKOFF_MAX = 300
+
+
+def backoff_delay(attempts):
+    return timedelta(seconds=min(OUTBOX_BACKOFF_BASE * 2 ** (attempts - 1), OUTBOX_BACKOFF_MAX))
+
+
+def pending_notifications():
+    return Notification.objects.filter(delivered_at__isnull=True, attempts__lt=OUTBOX_MAX_ATTEMPTS)
+
+
+async def send_events(channel_layer, notifications, unread_counts=None):
+    """Усі group_send пакета одночасно; виняток окремого надсилання повертається як результат."""
+    unread_counts = unread_counts or {}
+    return await asyncio.gather(*(
+        channel_layer.group_send(
+            f"user_{notification.recipient_id}",
+            notification_event(notification, unread_counts.get(notification.recipient_id))
+        )
+        for notification in notifications
+    ), return_exceptions=True)
+
+
+def dispatch_batch(batch_size=OUTBOX_BATCH_SIZE):
+    """
+    Доставляє один пакет готових сповіщень. Рядки блокуються з SKIP LOCKED, тож кілька
+    диспетчерів не надсилають те саме. Повертає (доставлено, невдало, затримки в секундах).
+    """
+    channel_layer = get_channel_layer()
+    with transaction.atomic():
+        batch = list(
+            pending_notifications()
+            .filter(next_attempt_at__lte=timezone.now())
+            .order_by('next_attempt_at', 'id')
+            .select_for_update(skip_locked=True)[:batch_size]
+        )
+        if not batch:
+            return 0, 0, []
+
+        unread_counts = cached_unread_counts({notification.recipient_id for notification in batch})
+        results = async_to_sync(send_events)(channel_layer, batch, unread_counts)
+        now = timezone.now()
+        delivered, failed = [], []
+        for notification, result in zip(batch, results):
+            notification.attempts += 1
+            if isinstance(result, Exception):
+                notification.next_attempt_at = now + backoff_delay(notification.attempts)
+                failed.append(notification)
+            else:
+                notification.delivered_at = now
+                delivered.append(notification)
+
+        Notification.objects.bulk_update(delivered, ['delivered_at', 'attempts'])
+        Notification.objects.bulk_update(failed, ['next_attempt_at', 'attempts'])
+
+    latencies = [(n.delivered_at - n.created_at).total_seconds() for n in delivered]
+    return len(delivered), len(failed), latencies
+
+
+def outbox_stats():
+    """Глибина черги, вік найстаршого недоставленого сповіщення та кількість відкинутих після всіх спроб."""
+    pending = pending_notifications().aggregate(depth=Count('id'), oldest=Min('created_at'))
+    return {
+        'depth': pending['depth'],
+        'oldest_age': (timezone.now() - pending['oldest']).total_seconds() if pending['oldest'] else 0,
+        'dead': Notification.objects.filter(
+            delivered_at__isnull=True, attempts__gte=OUTBOX_MAX_ATTEMPTS
+        ).count(),
+    }
@@ -0,0 +1,44 @@
+from django.db.models import Count, F, Q, Sum
+
+from ..models import Hostel, Reviews
+
+STARS = range(1, 6)
+
+
+def apply_review(hostel_id, rating, sign=1):
+    """Додає (sign=1) або прибирає (sign=-1) один відгук з агрегатів готелю атомарним UPDATE."""
+    star_field = f"rating_{rating}"
+    Hostel.objects.filter(pk=hostel_id).update(
+        reviews_count=F('reviews_count') + sign,
+        rating_sum=F('rating_sum') + sign * rating,
+        **{star_field: F(star_field) + sign}
+    )
+
+
+def recompute_ratings(hostel_ids=None):
+    """Перераховує агрегати відгуків з таблиці Reviews. Повертає кількість оновлених готелів."""
+    hostels = Hostel.objects.all()
+    if hostel_ids is not None:
+        hostels = hostels.filter(pk__in=hostel_ids)
+
+    stats = {
+        row['hostel']: row
+        for row in Reviews.objects.filter(hostel__in=hostels).values('hostel').annotate(
+            count=Count('id'),
+            total=Sum('rating'),
+            **{f"star_{star}": Count('id', filter=Q(rating=star)) for star in STARS}
+        )
+    }
+
+    updated = []
+    for hostel in hostels.only('id'):
+        row = stats.get(hostel.id, {})
+        hostel.reviews_count = row.get('count', 0)
+        hostel.rating_sum = row.get('total') or 0
+        for star in STARS:
+            setattr(hostel, f"rating_{star}", row.get(f"star_{star}", 0))
+        updated.append(hostel)
+
+    fields = ['reviews_count', 'rating_sum'] + [f"rating_{star}" for star in STARS]
+    Hostel.objects.bulk_update(updated, fields, batch_size=1000)
+    return len(updated)
@@ -0,0 +1,43 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from ..models import Notification, NotificationArchive
+
+PRUNE_BATCH_SIZE = 5000
+
+
+def retention_days():
+    return getattr(settings, 'NOTIFICATION_RETENTION_DAYS', 90)
+
+
+def archive_batch(cutoff, batch_size=PRUNE_BATCH_SIZE):
+    """
+    Переносить до batch_size прочитаних сповіщень, створених до cutoff, в NotificationArchive.
+    Рядки вибираються за id (старі — на початку первинного ключа) і блокуються з SKIP LOCKED.
+    """
+    with transaction.atomic():
+        batch = list(
+            Notification.objects.filter(is_read=True, created_at__lt=cutoff)
+            .order_by('id')
+            .select_for_update(skip_locked=True)
+            .values('id', 'recipient_id', 'title', 'message', 'created_at')[:batch_size]
+        )
+        if not batch:
+            return 0
+        NotificationArchive.objects.bulk_create(
+            [NotificationArchive(**row) for row in batch], ignore_conflicts=True
+        )
+        Notification.objects.filter(pk__in=[row['id'] for row in batch]).delete()
+    return len(batch)
+
+
+def prune_notifications(days=None, batch_size=PRUNE_BATCH_SIZE):
+    """Архівує всі прочитані сповіщення, старші за days днів, короткими транзакціями."""
+    cutoff = timezone.now() - timedelta(days=retention_days() if days is None else days)
+    moved = 0
+    while archived := archive_batch(cutoff, batch_size):
+        moved += archived
+    return moved
@@ -0,0 +1,44 @@
+import re
+
+from django.contrib.postgres.search import SearchQuery, SearchVector
+from django.db import connection
+
+from ..models import Hostel
+
+# Вбудованої української конфігурації в PostgreSQL немає, тому без стемінгу
+SEARCH_CONFIG = 'simple'
+
+# Ті самі поля, що й у search_fields HostelViewSet, з вагою для ранжування
+HOSTEL_SEARCH_WEIGHTS = (
+    ('name', 'A'),
+    ('city', 'B'),
+    ('address', 'C'),
+    ('about', 'D'),
+)
+
+
+def hostel_search_vector():
+    vector = None
+    for field, weight in HOSTEL_SEARCH_WEIGHTS:
+        part = SearchVector(field, weight=weight, config=SEARCH_CONFIG)
+        vector = part if vector is None else vector + part
+    return vector
+
+
+def update_hostel_search_vector(hostel_ids):
+    """Оновлює збережений tsvector готелів одним UPDATE."""
+    if connection.vendor != 'postgresql':
+        return
+    Hostel.objects.filter(pk__in=hostel_ids).update(search_vector=hostel_search_vector())
+
+
+def build_search_query(terms):
+    """Перетворює пошукові слова на префіксний tsquery: «льві центр» -> льві:* & центр:*."""
+    words = [word for term in terms for word in re.findall(r'\w+', term)]
+    if not words:
+        return None
+    return SearchQuery(
+        ' & '.join(f"{word}:*" for word in words),
+        search_type='raw',
+        config=SEARCH_CONFIG
+    )
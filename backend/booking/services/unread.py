@@ -0,0 +1,97 @@
+import logging
+from collections import Counter
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.core.cache import cache
+from django.db import transaction
+
+from ..models import Notification
+
+logger = logging.getLogger(__name__)
+
+# Лічильник перераховується з БД щонайменше так часто: це межа, до якої може жити розбіжність
+# від гонки між COUNT і приростами інших процесів
+UNREAD_TIMEOUT = 10 * 60
+
+
+def unread_key(user_id):
+    return f"notifications:unread:{user_id}"
+
+
+def _count_unread(user_id):
+    return Notification.objects.filter(recipient_id=user_id, is_read=False).count()
+
+
+def unread_count(user_id):
+    """
+    Кількість непрочитаних з Redis; за відсутності ключа — COUNT по частковому індексу.
+    Сповіщення, закомічене між COUNT і add, могло загубитися (його incr не знайшов ключа)
+    або порахуватися двічі (incr після add), тому після засіву рахуємо ще раз і виправляємо ключ.
+    """
+    key = unread_key(user_id)
+    count = cache.get(key)
+    if count is None:
+        count = _count_unread(user_id)
+        if cache.add(key, count, UNREAD_TIMEOUT):
+            recount = _count_unread(user_id)
+            if cache.get(key) != recount:
+                cache.set(key, recount, UNREAD_TIMEOUT)
+            count = recount
+    return count
+
+
+def cached_unread_counts(user_ids):
+    """Лише ті лічильники, що вже є в кеші, без звернення до БД: {user_id: count}."""
+    keys = {unread_key(user_id): user_id for user_id in user_ids}
+    return {keys[key]: count for key, count in cache.get_many(keys).items()}
+
+
+def _add_unread(user_id, delta):
+    try:
+        if cache.incr(unread_key(user_id), delta) < 0:
+            cache.delete(unread_key(user_id))
+    except ValueError:
+        # Ключа немає — наступне читання порахує з БД
+        pass
+
+
+def count_new_notifications(user_ids):
+    """Після коміту збільшує лічильники отримувачів нових сповіщень (id може повторюватися)."""
+    counts = Counter(user_ids)
+
+    def apply():
+        for user_id, delta in counts.items():
+            _add_unread(user_id, delta)
+    transaction.on_commit(apply)
+
+
+def forget_unread(user_ids):
+    """Для масових розсилок: один delete_many замість incr на кожного отримувача."""
+    user_ids = list(user_ids)
+    transaction.on_commit(lambda: cache.delete_many([unread_key(user_id) for user_id in user_ids]))
+
+
+def publish_unread_count(user_id, count):
+    """Надсилає новий лічильник у WebSocket-групу користувача; збій каналу запит не ламає."""
+    try:
+        async_to_sync(get_channel_layer().group_send)(
+            f"user_{user_id}", {"type": "send_unread_count", "count": count}
+        )
+    except Exception:
+        logger.exception("Не вдалося надіслати лічильник непрочитаних користувачу %s", user_id)
+
+
+def mark_read(user_id):
+    """Одне сповіщення позначено прочитаним."""
+    def apply():
+        _add_unread(user_id, -1)
+        publish_unread_count(user_id, unread_count(user_id))
+    transaction.on_commit(apply)
+
+
+def reset_unread(user_id):
+    def apply():
+        cache.set(unread_key(user_id), 0, UNREAD_TIMEOUT)
+        publish_unread_count(user_id, 0)
+    transaction.on_commit(apply)
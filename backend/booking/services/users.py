@@ -0,0 +1,125 @@
+import threading
+import time
+from collections import OrderedDict
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import transaction
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+
+USER_CACHE_SIZE = 1024
+USER_CACHE_TTL = 60  # секунд; інші процеси бачать зміну користувача не пізніше ніж через TTL
+# Зміна цих полів відкликає вже видані токени: claims у них більше не відповідають користувачу
+SECURITY_FIELDS = ('is_active', 'is_staff', 'is_superuser', 'password')
+
+
+class UserCache:
+    """LRU повних User на процес з коротким TTL: {user_id: (expires_at, user)}."""
+
+    def __init__(self, maxsize=USER_CACHE_SIZE, ttl=USER_CACHE_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id):
+        with self._lock:
+            item = self._items.get(user_id)
+            if item is None:
+                return None
+            if item[0] <= time.monotonic():
+                del self._items[user_id]
+                return None
+            self._items.move_to_end(user_id)
+            return item[1]
+
+    def put(self, user_id, user):
+        with self._lock:
+            self._items[user_id] = (time.monotonic() + self.ttl, user)
+            self._items.move_to_end(user_id)
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+
+    def forget(self, user_id):
+        with self._lock:
+            self._items.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+
+user_cache = UserCache()
+
+
+def cached_user(user_id):
+    """Повний User з LRU або з БД; None, якщо користувача немає."""
+    user = user_cache.get(user_id)
+    if user is None:
+        user = User.objects.filter(pk=user_id).first()
+        if user is not None:
+            user_cache.put(user_id, user)
+    return user
+
+
+def forget_user(user_id):
+    user_cache.forget(user_id)
+
+
+def token_version_key(user_id):
+    return f"auth:token_version:{user_id}"
+
+
+def token_version(user_id):
+    """Поточна версія токенів користувача в Redis; токен зі старішою версією відкликано."""
+    return cache.get(token_version_key(user_id), 0)
+
+
+def revoke_tokens(user_id):
+    """
+    Підвищує версію токенів: усі видані раніше access-токени перестають прийматися.
+    Ключ живе не довше за access-токен — після цього старих токенів уже не існує.
+    """
+    key = token_version_key(user_id)
+    leeway = jwt_settings.LEEWAY
+    if isinstance(leeway, timedelta):
+        leeway = leeway.total_seconds()
+    timeout = int(jwt_settings.ACCESS_TOKEN_LIFETIME.total_seconds() + leeway) + 1
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, 0, timeout)
+        cache.incr(key)
+    cache.touch(key, timeout)
+    forget_user(user_id)
+
+
+def revoke_tokens_on_commit(user_id):
+    transaction.on_commit(lambda: revoke_tokens(user_id))
+
+
+def security_fields_changed(user, update_fields=None):
+    """Чи змінює збереження user активність, роль або пароль (один SELECT лише для наявного користувача)."""
+    if user._state.adding or user.pk is None:
+        return False
+    fields = [field for field in SECURITY_FIELDS if field not in user.get_deferred_fields()]
+    if update_fields is not None:
+        fields = [field for field in fields if field in update_fields]
+    if not fields:
+        return False
+    old = User.objects.filter(pk=user.pk).values(*fields).first()
+    return old is not None and any(old[field] != getattr(user, field) for field in fields)
+
+
+def user_claims(user):
+    """Claims, з яких ClaimsJWTAuthentication відновлює користувача без запиту до БД."""
+    client = getattr(user, 'client', None)
+    return {
+        'role': 'admin' if user.is_superuser or user.is_staff else 'client',
+        'client_id': client.id if client else None,
+        'username': user.username,
+        'is_staff': user.is_staff,
+        'is_superuser': user.is_superuser,
+        'token_version': token_version(user.pk),
+    }
@@ -1,47 +1,159 @@
-from django.db.models.signals import post_save, pre_save
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.contrib.auth.models import User
 from django.dispatch import receiver
-from .models import Booking
-from .services.notificate import create_notification
-
-@receiver(pre_save, sender=Booking)
-def track_approval_change(sender, instance, **kwargs):
-    if instance.pk:
-        try:
-            old_obj = Booking.objects.get(pk=instance.pk)
-            if old_obj.approved != instance.approved:
-                instance._approved_changed = True
-            else:
-                instance._approved_changed = False
-        except Booking.DoesNotExist:
-            instance._approved_changed = False
-    else:
-        instance._approved_changed = False
+from .models import Booking, ClaimsUser, Client, Hostel, HostelImage, Reviews, Room, RoomImage
+from .services.availability import (STATE_FREE, availability_delta, booking_state, publish_availability,
+                                    room_hostel_id)
+from .services.bookings import decision_notification
+from .services.cache import invalidate_catalog_on_commit
+from .services.conditional import touch_clients, touch_hostels, touch_rooms
+from .services.notificate import create_notifications
+from .services.occupancy import sync_booking_nights
+from .services.ratings import apply_review
+from .services.search import update_hostel_search_vector
+from .services.users import forget_user, revoke_tokens_on_commit, security_fields_changed
+
+@receiver(post_save, sender=Booking)
+def booking_occupancy_handler(sender, instance, created, **kwargs):
+    # Видалення броні прибирає її ночі каскадно, нова заявка без підтвердження номер не блокує
+    if created and instance.approved is not True:
+        return
+    if instance.has_changed('approved', 'room_id', 'start_date', 'last_date'):
+        sync_booking_nights(instance)
 
 @receiver(post_save, sender=Booking)
 def booking_notification_handler(sender, instance, created, **kwargs):
-    hostel_name = instance.room.hostel.name
-    room_number = instance.room.number
+    # Адресатів беремо за id: room.hostel і client зазвичай уже підвантажені через select_related
     if created:
-        admin_user = instance.room.hostel.admin
-        if admin_user:
-            create_notification(
-                recipient=admin_user,
-                title="Нове бронювання",
-                message=f"Отримано нову заявку на номер {room_number} у готелі «{hostel_name}»."
-            )
-
-    else:
-        is_changed = getattr(instance, '_approved_changed', False)
-        if is_changed:
-            if instance.approved is True:
-                create_notification(
-                    recipient=instance.client.user,
-                    title="Бронювання підтверджено",
-                    message=f"Вашу заявку на номер {instance.room.number} у готелі «{hostel_name}» схвалено!"
-                )
-            elif instance.approved is False:
-                create_notification(
-                    recipient=instance.client.user,
-                    title="Бронювання відхилено",
-                    message=f"На жаль, вашу заявку на номер {instance.room.number} у готелі «{hostel_name}» відхилено."
-                )
\ No newline at end of file
+        hostel = instance.room.hostel
+        if hostel.admin_id:
+            create_notifications([(
+                hostel.admin_id,
+                "Нове бронювання",
+                f"Отримано нову заявку на номер {instance.room.number} у готелі «{hostel.name}»."
+            )])
+
+    elif instance.has_changed('approved') and instance.approved is not None and instance.client_id:
+        create_notifications([(instance.client.user_id, *decision_notification(instance))])
+
+def _cached_room(booking):
+    return booking.room if Booking.room.is_cached(booking) else None
+
+@receiver(post_save, sender=Booking)
+def booking_availability_handler(sender, instance, created, **kwargs):
+    if not created and not instance.has_changed('approved', 'room_id', 'start_date', 'last_date'):
+        return
+    room = _cached_room(instance)
+    deltas = []
+    if not created and instance.has_changed('room_id', 'start_date', 'last_date'):
+        # Старі ночі звільняються; невідомі при завантаженні значення пропускаємо
+        old_room_id = instance.loaded_value('room_id')
+        old_start, old_last = instance.loaded_value('start_date'), instance.loaded_value('last_date')
+        if old_room_id and old_start and old_last:
+            old_hostel_id = room_hostel_id(old_room_id, room if old_room_id == instance.room_id else None)
+            deltas.append((old_hostel_id, availability_delta(old_room_id, old_start, old_last, STATE_FREE)))
+    deltas.append((room_hostel_id(instance.room_id, room), availability_delta(
+        instance.room_id, instance.start_date, instance.last_date, booking_state(instance)
+    )))
+    publish_availability(deltas)
+
+@receiver(post_delete, sender=Booking)
+def booking_cancel_availability_handler(sender, instance, **kwargs):
+    if instance.approved is False:
+        return
+    publish_availability([(room_hostel_id(instance.room_id, _cached_room(instance)), availability_delta(
+        instance.room_id, instance.start_date, instance.last_date, STATE_FREE
+    ))])
+
+@receiver(post_save, sender=Hostel)
+def hostel_search_vector_handler(sender, instance, **kwargs):
+    update_hostel_search_vector([instance.pk])
+
+def locked_review_rating(review_id):
+    """
+    (hostel_id, rating) рядка з блокуванням до кінця транзакції (Reviews.save/delete атомарні):
+    паралельна зміна того ж відгуку чекає й бачить уже новий рейтинг, тож дельти не дублюються.
+    """
+    old = Reviews.objects.select_for_update().filter(pk=review_id).values('hostel_id', 'rating').first()
+    return (old['hostel_id'], old['rating']) if old else None
+
+@receiver(pre_save, sender=Reviews)
+def track_review_change(sender, instance, **kwargs):
+    instance._old_rating = locked_review_rating(instance.pk) if instance.pk else None
+
+@receiver(pre_delete, sender=Reviews)
+def track_review_delete(sender, instance, **kwargs):
+    # Рейтинг з БД, а не з можливо застарілого instance; None — відгук уже видалив інший запит
+    instance._old_rating = locked_review_rating(instance.pk)
+
+@receiver(post_save, sender=Reviews)
+def review_rating_handler(sender, instance, created, **kwargs):
+    old = getattr(instance, '_old_rating', None)
+    new = (instance.hostel_id, instance.rating)
+    if old == new:
+        return
+    if old:
+        apply_review(*old, sign=-1)
+    apply_review(*new, sign=1)
+
+@receiver(post_delete, sender=Reviews)
+def review_delete_handler(sender, instance, **kwargs):
+    old = getattr(instance, '_old_rating', None)
+    if old:
+        apply_review(*old, sign=-1)
+
+@receiver(post_save, sender=Hostel)
+@receiver(post_delete, sender=Hostel)
+@receiver(post_save, sender=Room)
+@receiver(post_delete, sender=Room)
+@receiver(post_save, sender=RoomImage)
+@receiver(post_delete, sender=RoomImage)
+@receiver(post_save, sender=HostelImage)
+@receiver(post_delete, sender=HostelImage)
+@receiver(post_save, sender=Reviews)
+@receiver(post_delete, sender=Reviews)
+def catalog_cache_handler(sender, **kwargs):
+    invalidate_catalog_on_commit()
+
+@receiver(post_save, sender=Room)
+@receiver(post_delete, sender=Room)
+@receiver(post_save, sender=HostelImage)
+@receiver(post_delete, sender=HostelImage)
+@receiver(post_save, sender=Reviews)
+@receiver(post_delete, sender=Reviews)
+def hostel_version_handler(sender, instance, **kwargs):
+    # Ці дані входять у відповідь готелю, тому змінюють його ETag
+    touch_hostels([instance.hostel_id])
+
+@receiver(post_save, sender=RoomImage)
+@receiver(post_delete, sender=RoomImage)
+def room_version_handler(sender, instance, **kwargs):
+    touch_rooms([instance.room_id])
+
+@receiver(pre_save, sender=User)
+@receiver(pre_save, sender=ClaimsUser)
+def track_user_security_change(sender, instance, update_fields=None, **kwargs):
+    instance._revoke_tokens = security_fields_changed(instance, update_fields)
+
+@receiver(post_save, sender=User)
+@receiver(post_save, sender=ClaimsUser)
+def user_cache_handler(sender, instance, created, **kwargs):
+    forget_user(instance.pk)
+    if not created:
+        touch_clients([instance.pk])
+    if getattr(instance, '_revoke_tokens', False):
+        revoke_tokens_on_commit(instance.pk)
+
+@receiver(post_delete, sender=User)
+@receiver(post_delete, sender=ClaimsUser)
+def user_delete_handler(sender, instance, **kwargs):
+    forget_user(instance.pk)
+    revoke_tokens_on_commit(instance.pk)
+
+@receiver(post_save, sender=Client)
+@receiver(post_delete, sender=Client)
+def client_user_cache_handler(sender, instance, created=False, **kwargs):
+    forget_user(instance.user_id)
+    # client_id у claims змінився: профіль з'явився або видалений
+    if created or kwargs['signal'] is post_delete:
+        revoke_tokens_on_commit(instance.user_id)
@@ -1,10 +1,39 @@
-from django.test import TestCase
+import asyncio
+import threading
+from io import StringIO
+from unittest import mock, skipUnless
+
+from django.core.management import call_command
+from django.db import connection, connections
+from django.test import RequestFactory, TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
 from django.contrib.auth.models import User
-from .models import Client, Hostel, Room, Booking
+from .models import Client, Hostel, Room, Booking, RoomNight, Reviews, RoomImage, Notification, NotificationArchive
 from datetime import date, timedelta
 from rest_framework.exceptions import ValidationError
-from .serializers import BookingSerializer
-from rest_framework.test import APITestCase
+from .serializers import BookingSerializer, HOSTEL_TOP_REVIEWS
+from .services.ratings import recompute_ratings
+from .services.cache import catalog_cache_stats
+from .services.outbox import dispatch_batch, outbox_stats
+from .services.broadcast import audience_ids, broadcast
+from .services.notificate import create_notification
+from .services.retention import prune_notifications
+from .services.users import token_version_key, user_cache
+from .services.logins import LastLoginBuffer, last_login_buffer
+from django.contrib.auth.hashers import check_password
+from .authentication import ClaimsJWTAuthentication
+from django.core.cache import cache
+from django.utils import timezone
+from channels.testing import WebsocketCommunicator
+from rest_framework_simplejwt.tokens import AccessToken
+from .consumers import (HOSTEL_NOT_FOUND_CLOSE_CODE, NotificationConsumer, SEND_FAILED_CLOSE_CODE,
+                        SLOW_CONSUMER_CLOSE_CODE)
+from django.test import override_settings
+from .routing import websocket_urlpatterns
+from .services.availability import availability_group
+from channels.layers import get_channel_layer
+from channels.routing import URLRouter
+from rest_framework.test import APIClient, APITestCase
 from rest_framework import status
 from django.urls import reverse
 # Create your tests here.
@@ -75,8 +104,8 @@ def test_booking_queryset_isolation(self):
 
         url = reverse('booking-list')
         response = self.client.get(url)
-        self.assertEqual(len(response.data), 1)
-        self.assertEqual(response.data[0]['client'], self.client_profile.pk)
+        self.assertEqual(len(response.data['results']), 1)
+        self.assertEqual(response.data['results'][0]['client'], self.client_profile.pk)
 
 class RegistrationTest(APITestCase):
     def test_registration_success(self):
@@ -115,3 +144,1191 @@ class RoomPermissionTest(APITestCase):
         }
         response = self.client.post(url, data)
         self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+class RoomOccupancyIndexTest(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='sleeper', password='password123')
+        self.client_profile = Client.objects.create(user=self.user, age=25)
+        self.hostel = Hostel.objects.create(name="Night", city="Kyiv")
+        self.room = Room.objects.create(number=1, price=300, bed=2, hostel=self.hostel)
+        self.other_room = Room.objects.create(number=2, price=300, bed=2, hostel=self.hostel)
+        self.start = date.today() + timedelta(days=5)
+        self.booking = Booking.objects.create(
+            client=self.client_profile, room=self.room, price=600,
+            start_date=self.start, last_date=self.start + timedelta(days=2)
+        )
+
+    def search(self):
+        response = self.client.get(reverse('room-list'), {
+            'hostel': self.hostel.pk,
+            'check_in': (self.start + timedelta(days=1)).isoformat(),
+            'check_out': (self.start + timedelta(days=4)).isoformat(),
+        })
+        return {room['id'] for room in response.data['results']}
+
+    def test_pending_booking_does_not_block_room(self):
+        self.assertEqual(RoomNight.objects.count(), 0)
+        self.assertEqual(self.search(), {self.room.pk, self.other_room.pk})
+
+    def test_index_follows_approval_and_deletion(self):
+        self.booking.approved = True
+        self.booking.save()
+        self.assertEqual(
+            list(RoomNight.objects.values_list('date', flat=True).order_by('date')),
+            [self.start, self.start + timedelta(days=1)]
+        )
+        self.assertEqual(self.search(), {self.other_room.pk})
+
+        self.booking.approved = False
+        self.booking.save()
+        self.assertEqual(self.search(), {self.room.pk, self.other_room.pk})
+
+        self.booking.approved = True
+        self.booking.save()
+        self.booking.delete()
+        self.assertFalse(RoomNight.objects.exists())
+
+class HostelCalendarTest(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='planner', password='password123')
+        self.client_profile = Client.objects.create(user=self.user, age=30)
+        self.hostel = Hostel.objects.create(name="Calendar", city="Lviv", is_active=True)
+        self.room = Room.objects.create(number=1, price=300, bed=2, hostel=self.hostel)
+        self.other_room = Room.objects.create(number=2, price=400, bed=3, hostel=self.hostel)
+        self.start = date.today() + timedelta(days=3)
+        Booking.objects.create(
+            client=self.client_profile, room=self.room, price=600, approved=True,
+            start_date=self.start, last_date=self.start + timedelta(days=2)
+        )
+
+    def test_calendar_matrix(self):
+        url = reverse('hostel-calendar', args=[self.hostel.pk])
+        response = self.client.get(url, {
+            'from': self.start.isoformat(),
+            'to': (self.start + timedelta(days=2)).isoformat(),
+        })
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([room['id'] for room in response.data['rooms']], [self.room.pk, self.other_room.pk])
+        self.assertEqual([day['booked'] for day in response.data['days']], [[1, 0], [1, 0], [0, 0]])
+        self.assertEqual(response.data['days'][0]['free_seats'], 3)
+        self.assertEqual(response.data['days'][2]['free_rooms'], 2)
+
+    def test_calendar_rejects_reversed_range(self):
+        url = reverse('hostel-calendar', args=[self.hostel.pk])
+        response = self.client.get(url, {'from': '2026-06-10', 'to': '2026-06-01'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+class HostelSearchTest(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='traveller', password='password123')
+        self.client_profile = Client.objects.create(user=self.user, age=30)
+        self.lviv = Hostel.objects.create(name="Lviv Old Town", city="Lviv", is_active=True)
+        self.lviv_full = Hostel.objects.create(name="Lviv Full", city="Lviv", is_active=True)
+        self.kyiv = Hostel.objects.create(name="Kyiv", city="Kyiv", is_active=True)
+        self.cheap = Room.objects.create(number=1, price=300, bed=2, hostel=self.lviv)
+        Room.objects.create(number=2, price=200, bed=1, hostel=self.lviv)
+        Room.objects.create(number=3, price=500, bed=2, hostel=self.lviv)
+        busy = Room.objects.create(number=1, price=100, bed=2, hostel=self.lviv_full)
+        Room.objects.create(number=1, price=100, bed=2, hostel=self.kyiv)
+        self.start = date.today() + timedelta(days=7)
+        Booking.objects.create(
+            client=self.client_profile, room=busy, price=200, approved=True,
+            start_date=self.start, last_date=self.start + timedelta(days=2)
+        )
+
+    def test_search_returns_cheapest_free_room_per_hostel(self):
+        response = self.client.get(reverse('hostel-search'), {
+            'city': 'lviv',
+            'check_in': self.start.isoformat(),
+            'check_out': (self.start + timedelta(days=3)).isoformat(),
+            'min_beds': 2,
+        })
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['count'], 1)
+        result = response.data['results'][0]
+        self.assertEqual(result['id'], self.lviv.pk)
+        self.assertEqual(result['cheapest_room']['id'], self.cheap.pk)
+        self.assertEqual(result['cheapest_room']['price'], 300)
+
+    def test_search_requires_dates(self):
+        response = self.client.get(reverse('hostel-search'), {'city': 'Lviv'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+class HostelFullTextSearchTest(APITestCase):
+    def setUp(self):
+        Hostel.objects.create(name="Ратуша Хостел", city="Lviv", about="Поруч площа Ринок", is_active=True)
+        Hostel.objects.create(name="Море", city="Odesa", about="Біля пляжу", is_active=True)
+
+    def test_search_matches_name_and_about(self):
+        url = reverse('hostel-list')
+        names = [h['name'] for h in self.client.get(url, {'search': 'Ратуша'}).data['results']]
+        self.assertEqual(names, ["Ратуша Хостел"])
+        names = [h['name'] for h in self.client.get(url, {'search': 'пляжу'}).data['results']]
+        self.assertEqual(names, ["Море"])
+
+class HostelRatingAggregatesTest(TestCase):
+    def setUp(self):
+        self.hostel = Hostel.objects.create(name="Rated")
+        self.users = [User.objects.create_user(username=f'reviewer{i}') for i in range(3)]
+
+    def test_aggregates_follow_reviews(self):
+        Reviews.objects.create(hostel=self.hostel, user=self.users[0], rating=5)
+        review = Reviews.objects.create(hostel=self.hostel, user=self.users[1], rating=2)
+        Reviews.objects.create(hostel=self.hostel, user=self.users[2], rating=5)
+
+        review.rating = 4
+        review.save()
+        self.hostel.refresh_from_db()
+        self.assertEqual(self.hostel.reviews_count, 3)
+        self.assertEqual(self.hostel.average_rating, 4.7)
+        self.assertEqual(self.hostel.rating_histogram, {"1": 0, "2": 0, "3": 0, "4": 1, "5": 2})
+
+        review.delete()
+        self.hostel.refresh_from_db()
+        self.assertEqual(self.hostel.rating_sum, 10)
+        self.assertEqual(self.hostel.rating_4, 0)
+
+    def test_stale_review_delete_uses_current_rating(self):
+        review = Reviews.objects.create(hostel=self.hostel, user=self.users[0], rating=2)
+        stale = Reviews.objects.get(pk=review.pk)
+        duplicate = Reviews.objects.get(pk=review.pk)
+        review.rating = 4
+        review.save()
+
+        stale.delete()
+        duplicate.delete()
+        self.hostel.refresh_from_db()
+        self.assertEqual(
+            (self.hostel.reviews_count, self.hostel.rating_sum, self.hostel.rating_2, self.hostel.rating_4), (0, 0, 0, 0)
+        )
+
+    def test_stale_hostel_save_keeps_counters(self):
+        stale = Hostel.objects.get(pk=self.hostel.pk)
+        Reviews.objects.create(hostel=self.hostel, user=self.users[0], rating=3)
+        stale.name = "Renamed"
+        stale.save()
+        self.hostel.refresh_from_db()
+        self.assertEqual(self.hostel.reviews_count, 1)
+
+    def test_recompute_repairs_drift(self):
+        Reviews.objects.create(hostel=self.hostel, user=self.users[0], rating=3)
+        Hostel.objects.filter(pk=self.hostel.pk).update(reviews_count=7, rating_sum=0)
+        recompute_ratings()
+        self.hostel.refresh_from_db()
+        self.assertEqual((self.hostel.reviews_count, self.hostel.rating_sum, self.hostel.rating_3), (1, 3, 1))
+
+class HostelListRepresentationTest(APITestCase):
+    def create_hostel(self, index):
+        hostel = Hostel.objects.create(name=f"Hostel {index}", city="Kyiv", is_active=True)
+        for number in range(3):
+            room = Room.objects.create(number=number, price=100 * (number + 1), bed=2, hostel=hostel)
+            RoomImage.objects.create(room=room)
+        return hostel
+
+    def test_list_is_summary_with_fixed_query_count(self):
+        # Запит версії для ETag плюс одна вибірка списку
+        self.create_hostel(0)
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('hostel-list'))
+        for index in range(1, 5):
+            self.create_hostel(index)
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('hostel-list'))
+
+        item = response.data['results'][0]
+        self.assertNotIn('rooms', item)
+        self.assertEqual((item['room_count'], item['min_price'], item['free_seats']), (3, 100, 6))
+
+    def test_detail_limits_reviews(self):
+        hostel = self.create_hostel(0)
+        for index in range(HOSTEL_TOP_REVIEWS + 2):
+            user = User.objects.create_user(username=f'critic{index}')
+            Reviews.objects.create(hostel=hostel, user=user, rating=4)
+
+        response = self.client.get(reverse('hostel-detail', args=[hostel.pk]))
+        self.assertEqual(len(response.data['reviews']), HOSTEL_TOP_REVIEWS)
+        self.assertEqual(len(response.data['rooms']), 3)
+        self.assertTrue(response.data['reviews_url'].endswith(f"/api/reviews/?hostel={hostel.pk}"))
+
+class SparseFieldsetTest(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='sparse', password='password123')
+        self.client_profile = Client.objects.create(user=self.user, age=22)
+        self.hostel = Hostel.objects.create(name="Sparse", city="Kyiv", is_active=True)
+        for number in range(3):
+            room = Room.objects.create(number=number, price=100, bed=1, hostel=self.hostel)
+            RoomImage.objects.create(room=room)
+            Booking.objects.create(
+                client=self.client_profile, room=room, price=100,
+                start_date=date.today() + timedelta(days=3),
+                last_date=date.today() + timedelta(days=4)
+            )
+        self.client.force_authenticate(user=self.user)
+
+    def test_fields_limits_payload_and_skips_joins(self):
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('booking-list'), {'fields': 'id,start_date,approved'})
+        self.assertEqual(set(response.data['results'][0]), {'id', 'start_date', 'approved'})
+
+    def test_expand_selects_nested_objects(self):
+        response = self.client.get(reverse('booking-list'), {'expand': 'room_details'})
+        booking = response.data['results'][0]
+        self.assertIn('room_details', booking)
+        self.assertNotIn('client_details', booking)
+        self.assertEqual(len(booking['room_details']['images']), 1)
+
+    def test_default_response_is_unchanged(self):
+        response = self.client.get(reverse('booking-list'))
+        self.assertIn('client_details', response.data['results'][0])
+        self.assertIn('room_details', response.data['results'][0])
+
+    def test_room_list_without_images(self):
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('room-list'), {'fields': 'id,number,hostel_name'})
+        self.assertEqual(response.data['results'][0]['hostel_name'], "Sparse")
+
+class KeysetPaginationTest(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='pager', password='password123')
+        self.client_profile = Client.objects.create(user=self.user, age=22)
+        hostel = Hostel.objects.create(name="Pages", city="Kyiv", is_active=True)
+        room = Room.objects.create(number=1, price=100, bed=1, hostel=hostel)
+        for offset in range(5):
+            Booking.objects.create(
+                client=self.client_profile, room=room, price=100,
+                start_date=date.today() + timedelta(days=10 + offset * 2),
+                last_date=date.today() + timedelta(days=11 + offset * 2)
+            )
+        self.client.force_authenticate(user=self.user)
+
+    def test_pages_follow_cursor_without_duplicates(self):
+        seen = []
+        url = reverse('booking-list') + '?page_size=2&fields=id'
+        while url:
+            response = self.client.get(url)
+            self.assertNotIn('count', response.data)
+            seen.extend(item['id'] for item in response.data['results'])
+            url = response.data['next']
+        expected = list(Booking.objects.order_by('-created_at', '-id').values_list('id', flat=True))
+        self.assertEqual(seen, expected)
+
+class PendingQueueTest(APITestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user(username='queue_admin', is_staff=True)
+        other_admin = User.objects.create_user(username='other_admin', is_staff=True)
+        guest = User.objects.create_user(username='queue_guest')
+        self.guest_profile = Client.objects.create(user=guest, age=30)
+        room = Room.objects.create(number=1, price=100, bed=1, hostel=Hostel.objects.create(name="Mine", admin=self.admin))
+        foreign_room = Room.objects.create(number=1, price=100, bed=1, hostel=Hostel.objects.create(name="Foreign", admin=other_admin))
+
+        def book(target, offset, approved=None):
+            return Booking.objects.create(
+                client=self.guest_profile, room=target, price=100, approved=approved,
+                start_date=date.today() + timedelta(days=offset),
+                last_date=date.today() + timedelta(days=offset + 1)
+            )
+
+        self.first = book(room, 10)
+        self.second = book(room, 12)
+        book(room, 14, approved=True)
+        book(foreign_room, 10)
+
+    def test_queue_is_scoped_and_oldest_first(self):
+        self.client.force_authenticate(user=self.admin)
+        response = self.client.get(reverse('booking-pending'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['count'], 2)
+        self.assertEqual([b['id'] for b in response.data['results']], [self.first.pk, self.second.pk])
+
+    def test_queue_is_forbidden_for_clients(self):
+        self.client.force_authenticate(user=self.guest_profile.user)
+        response = self.client.get(reverse('booking-pending'))
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+class CatalogCacheTest(APITestCase):
+    def setUp(self):
+        self.hostel = Hostel.objects.create(name="Cached", city="Kyiv", is_active=True)
+        self.room = Room.objects.create(number=1, price=100, bed=1, hostel=self.hostel)
+
+    def test_repeated_read_is_served_from_cache(self):
+        url = reverse('hostel-detail', args=[self.hostel.pk])
+        self.client.get(url)
+        before = catalog_cache_stats()
+        with self.assertNumQueries(0):
+            response = self.client.get(url)
+        self.assertEqual(response.data['name'], "Cached")
+        self.assertEqual(catalog_cache_stats()['hits'], before['hits'] + 1)
+
+    def test_room_change_invalidates_cache(self):
+        url = reverse('room-list')
+        self.client.get(url, {'hostel': self.hostel.pk})
+        self.room.price = 250
+        self.room.save()
+        response = self.client.get(url, {'hostel': self.hostel.pk})
+        self.assertEqual(response.data['results'][0]['price'], 250)
+
+    def test_staff_reads_bypass_cache(self):
+        admin = User.objects.create_user(username='cache_admin', is_staff=True, is_superuser=True)
+        self.client.force_authenticate(user=admin)
+        url = reverse('hostel-detail', args=[self.hostel.pk])
+        before = catalog_cache_stats()
+        self.client.get(url)
+        self.client.get(url)
+        after = catalog_cache_stats()
+        self.assertEqual((after['hits'], after['misses']), (before['hits'], before['misses']))
+
+
+class ConditionalGetTest(APITestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user(username='etag_admin', is_staff=True, is_superuser=True)
+        self.hostel = Hostel.objects.create(name="Tagged", city="Kyiv", is_active=True, admin=self.admin)
+        self.room = Room.objects.create(number=1, price=100, bed=1, hostel=self.hostel)
+        self.url = reverse('hostel-detail', args=[self.hostel.pk])
+
+    def test_unchanged_hostel_returns_304_without_serialization(self):
+        self.client.force_authenticate(user=self.admin)
+        etag = self.client.get(self.url)['ETag']
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response['ETag'], etag)
+
+    def test_room_change_changes_hostel_etag(self):
+        self.client.force_authenticate(user=self.admin)
+        etag = self.client.get(self.url)['ETag']
+        self.room.price = 300
+        self.room.save()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_cached_anonymous_read_returns_304_without_queries(self):
+        etag = self.client.get(self.url)['ETag']
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_catalog_etag_is_shared_per_role(self):
+        etags = []
+        for username in ('etag_reader_1', 'etag_reader_2'):
+            self.client.force_authenticate(user=Client.objects.create(
+                user=User.objects.create_user(username=username), age=20
+            ).user)
+            etags.append(self.client.get(self.url)['ETag'])
+        self.assertEqual(etags[0], etags[1])
+
+        self.client.force_authenticate(user=None)
+        response = self.client.get(self.url)
+        self.assertNotEqual(response['ETag'], etags[0])
+        self.assertEqual(response['Cache-Control'], 'public, no-cache')
+
+    def test_booking_etag_follows_hostel_and_client_edits(self):
+        user = User.objects.create_user(username='etag_renamed', first_name="Старе")
+        Booking.objects.create(
+            client=Client.objects.create(user=user, age=30), room=self.room, price=100,
+            start_date=date.today() + timedelta(days=3), last_date=date.today() + timedelta(days=5)
+        )
+        self.client.force_authenticate(user=user)
+        url = reverse('booking-list')
+
+        etag = self.client.get(url)['ETag']
+        self.hostel.name = "Renamed"
+        self.hostel.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['results'][0]['room_details']['hostel_name'], "Renamed")
+
+        etag = response['ETag']
+        user.first_name = "Нове"
+        user.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['results'][0]['client_details']['first_name'], "Нове")
+
+    def test_booking_list_etag_follows_approval(self):
+        user = User.objects.create_user(username='etag_guest')
+        booking = Booking.objects.create(
+            client=Client.objects.create(user=user, age=30), room=self.room, price=100,
+            start_date=date.today() + timedelta(days=3), last_date=date.today() + timedelta(days=5)
+        )
+        self.client.force_authenticate(user=user)
+        url = reverse('booking-list')
+        etag = self.client.get(url)['ETag']
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_304_NOT_MODIFIED)
+        booking.approved = True
+        booking.save()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_200_OK)
+
+
+class GroupBookingTest(APITestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user(username='group_admin', is_staff=True)
+        self.hostel = Hostel.objects.create(name="Group", city="Kyiv", is_active=True, admin=self.admin)
+        self.rooms = [Room.objects.create(number=n, price=100 * n, bed=2, hostel=self.hostel) for n in range(1, 4)]
+        self.user = User.objects.create_user(username='group_guest')
+        self.client_profile = Client.objects.create(user=self.user, age=30)
+        self.client.force_authenticate(user=self.user)
+        self.start = date.today() + timedelta(days=5)
+
+    def post(self, rooms):
+        return self.client.post(reverse('booking-group'), {
+            'rooms': [room.pk for room in rooms],
+            'start_date': self.start.isoformat(),
+            'last_date': (self.start + timedelta(days=2)).isoformat(),
+        }, format='json')
+
+    def test_group_booking_is_created_with_one_notification(self):
+        response = self.post(self.rooms)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual([b['price'] for b in response.data], [200, 400, 600])
+        self.assertEqual(Booking.objects.filter(client=self.client_profile).count(), 3)
+        notifications = Notification.objects.filter(recipient=self.admin)
+        self.assertEqual(notifications.count(), 1)
+        self.assertIn("1, 2, 3", notifications.get().message)
+
+    def test_busy_room_rejects_whole_group(self):
+        Booking.objects.create(
+            client=self.client_profile, room=self.rooms[1], price=100,
+            start_date=self.start + timedelta(days=1), last_date=self.start + timedelta(days=3)
+        )
+        response = self.post(self.rooms)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('rooms', response.data)
+        self.assertEqual(Booking.objects.count(), 1)
+
+
+class BookingDecisionTest(APITestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user(username='decide_admin', is_staff=True)
+        hostel = Hostel.objects.create(name="Decide", admin=self.admin)
+        foreign_hostel = Hostel.objects.create(name="Foreign decide")
+        guest = User.objects.create_user(username='decide_guest')
+        self.guest_profile = Client.objects.create(user=guest, age=30)
+        start = date.today() + timedelta(days=5)
+
+        def book(room):
+            return Booking.objects.create(
+                client=self.guest_profile, room=room, price=100,
+                start_date=start, last_date=start + timedelta(days=2)
+            )
+
+        rooms = [Room.objects.create(number=n, price=100, bed=1, hostel=hostel) for n in range(3)]
+        self.bookings = [book(room) for room in rooms]
+        self.foreign = book(Room.objects.create(number=1, price=100, bed=1, hostel=foreign_hostel))
+        self.client.force_authenticate(user=self.admin)
+
+    def test_batch_decision(self):
+        first, second, third = self.bookings
+        payload = [
+            {'id': first.pk, 'approved': True},
+            {'id': second.pk, 'approved': True},
+            {'id': third.pk, 'approved': False},
+            {'id': self.foreign.pk, 'approved': True},
+        ]
+        response = self.client.post(reverse('booking-decide'), payload, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, {
+            'approved': [first.pk, second.pk], 'rejected': [third.pk], 'skipped': [self.foreign.pk]
+        })
+        self.assertEqual(
+            dict(Booking.objects.values_list('pk', 'approved')),
+            {first.pk: True, second.pk: True, third.pk: False, self.foreign.pk: None}
+        )
+        self.assertEqual(RoomNight.objects.count(), 4)
+        titles = list(Notification.objects.filter(recipient=self.guest_profile.user).values_list('title', flat=True))
+        self.assertEqual(sorted(titles), ["Бронювання відхилено", "Бронювання підтверджено", "Бронювання підтверджено"])
+
+    def test_decisions_are_staff_only(self):
+        self.client.force_authenticate(user=self.guest_profile.user)
+        response = self.client.post(reverse('booking-decide'), [], format='json')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class BookingChangeTrackingTest(TestCase):
+    def setUp(self):
+        admin = User.objects.create_user(username='tracker_admin', is_staff=True)
+        user = User.objects.create_user(username='tracker_guest')
+        self.client_profile = Client.objects.create(user=user, age=30)
+        hostel = Hostel.objects.create(name="Tracker", admin=admin)
+        self.room = Room.objects.create(number=1, price=100, bed=1, hostel=hostel)
+        self.start = date.today() + timedelta(days=5)
+
+    def test_create_notifies_admin_without_lazy_loads(self):
+        room = Room.objects.select_related('hostel').get(pk=self.room.pk)
+        booking = Booking(
+            client=self.client_profile, room=room, price=100,
+            start_date=self.start, last_date=self.start + timedelta(days=2)
+        )
+        # INSERT броні та INSERT сповіщення
+        with self.assertNumQueries(2):
+            booking.save()
+
+    def test_approval_uses_snapshot_instead_of_requery(self):
+        Booking.objects.create(
+            client=self.client_profile, room=self.room, price=100,
+            start_date=self.start, last_date=self.start + timedelta(days=2)
+        )
+        booking = Booking.objects.select_related('room__hostel', 'client').get()
+        self.assertEqual(booking.changed_fields(), set())
+        booking.approved = True
+        self.assertEqual(booking.changed_fields(), {'approved'})
+        # UPDATE, перебудова ночей (savepoint, DELETE, INSERT, release) та INSERT сповіщення
+        with self.assertNumQueries(6):
+            booking.save()
+        self.assertEqual(booking.changed_fields(), set())
+        self.assertEqual(RoomNight.objects.filter(booking=booking).count(), 2)
+
+        booking.request_text = "Пізній заїзд"
+        with self.assertNumQueries(1):
+            booking.save()
+
+
+class NotificationOutboxTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='outbox_user')
+        self.notification = Notification.objects.create(recipient=self.user, title="Тест", message="Привіт")
+
+    def test_dispatch_marks_delivered(self):
+        self.assertEqual(outbox_stats()['depth'], 1)
+        delivered, failed, latencies = dispatch_batch()
+        self.assertEqual((delivered, failed, len(latencies)), (1, 0, 1))
+        self.notification.refresh_from_db()
+        self.assertIsNotNone(self.notification.delivered_at)
+        self.assertEqual(outbox_stats()['depth'], 0)
+        self.assertEqual(dispatch_batch(), (0, 0, []))
+
+    def test_failed_send_is_retried_later(self):
+        layer = mock.Mock()
+        layer.group_send = mock.AsyncMock(side_effect=ConnectionError("redis недоступний"))
+        with mock.patch('booking.services.outbox.get_channel_layer', return_value=layer):
+            self.assertEqual(dispatch_batch()[:2], (0, 1))
+        self.notification.refresh_from_db()
+        self.assertIsNone(self.notification.delivered_at)
+        self.assertEqual(self.notification.attempts, 1)
+        self.assertGreater(self.notification.next_attempt_at, self.notification.created_at)
+        # До настання next_attempt_at повторної спроби немає
+        self.assertEqual(dispatch_batch(), (0, 0, []))
+
+
+class BroadcastTest(APITestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user(username='broadcast_admin', is_staff=True)
+        self.hostel = Hostel.objects.create(name="Broadcast", admin=self.admin)
+        room = Room.objects.create(number=1, price=100, bed=1, hostel=self.hostel)
+        start = date.today() + timedelta(days=5)
+        for index in range(5):
+            guest = User.objects.create_user(username=f'broadcast_guest{index}')
+            client = Client.objects.create(user=guest, age=30)
+            Booking.objects.create(
+                client=client, room=room, price=100,
+                start_date=start + timedelta(days=index * 2), last_date=start + timedelta(days=index * 2 + 1)
+            )
+        User.objects.create_user(username='bystander')
+        Notification.objects.all().delete()
+        self.client.force_authenticate(user=self.admin)
+
+    def test_hostel_clients_broadcast(self):
+        response = self.client.post(reverse('notification-broadcast'), {
+            'audience': 'hostel_clients', 'hostel': self.hostel.pk,
+            'title': "Технічні роботи", 'message': "Готель закрито на обслуговування.",
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.data['recipients'], 5)
+        self.assertEqual(Notification.objects.filter(title="Технічні роботи", delivered_at__isnull=True).count(), 5)
+        self.assertFalse(Notification.objects.filter(recipient__username='bystander').exists())
+
+    def test_chunks_do_not_lose_recipients(self):
+        self.assertEqual(broadcast(audience_ids('hostel_clients', self.hostel), "Т", "П", chunk_size=2), 5)
+        self.assertEqual(Notification.objects.values('recipient').distinct().count(), 5)
+
+    def test_hostel_admin_cannot_broadcast_to_everyone(self):
+        response = self.client.post(reverse('notification-broadcast'), {
+            'audience': 'clients', 'title': "Спам", 'message': "Спам",
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Notification.objects.exists())
+
+
+class UnreadCounterTest(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='unread_user')
+        cache.delete(f"notifications:unread:{self.user.pk}")
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse('notification-unread-count')
+
+    def notify(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            return create_notification(self.user, "Тест", "Привіт")
+
+    def test_unread_filter_returns_only_unread_page(self):
+        first = self.notify()
+        self.notify()
+        self.notify()
+        Notification.objects.filter(pk=first.pk).update(is_read=True)
+        response = self.client.get(reverse('notification-list'), {'is_read': 'false', 'page_size': 2})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['results']), 2)
+        self.assertNotIn(first.pk, [item['id'] for item in response.data['results']])
+        self.assertFalse(any(item['is_read'] for item in response.data['results']))
+
+    def test_counter_follows_create_read_and_read_all(self):
+        first = self.notify()
+        self.assertEqual(self.client.get(self.url).data['unread_count'], 1)
+        self.notify()
+        self.notify()
+        # Лічильник уже в кеші: відповідь без COUNT у БД
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(self.url).data['unread_count'], 3)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('notification-mark-as-read', args=[first.pk]))
+            self.client.post(reverse('notification-mark-as-read', args=[first.pk]))
+        self.assertEqual(self.client.get(self.url).data['unread_count'], 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('notification-mark-all-as-read'))
+        self.assertEqual(self.client.get(self.url).data['unread_count'], 0)
+
+
+    def seed_with(self, concurrent):
+        real_add = cache.add
+
+        def add(*args, **kwargs):
+            concurrent('before')
+            added = real_add(*args, **kwargs)
+            concurrent('after')
+            return added
+
+        with mock.patch.object(cache, 'add', side_effect=add):
+            return self.client.get(self.url).data['unread_count']
+
+    def test_notification_committed_before_seed_is_not_lost(self):
+        def concurrent(moment):
+            # Закомічене після COUNT, але його incr не знайшов ключа
+            if moment == 'before':
+                Notification.objects.create(recipient=self.user, title="Т", message="П")
+        self.assertEqual(self.seed_with(concurrent), 1)
+        self.assertEqual(cache.get(f"notifications:unread:{self.user.pk}"), 1)
+
+    def test_notification_counted_before_seed_is_not_doubled(self):
+        Notification.objects.create(recipient=self.user, title="Т", message="П")
+
+        def concurrent(moment):
+            # Уже у першому COUNT, а його incr прийшов після засіву
+            if moment == 'after':
+                cache.incr(f"notifications:unread:{self.user.pk}")
+        self.assertEqual(self.seed_with(concurrent), 1)
+        self.assertEqual(cache.get(f"notifications:unread:{self.user.pk}"), 1)
+
+
+class NotificationRetentionTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='retention_user')
+
+    def notification(self, age_days, is_read):
+        notification = Notification.objects.create(recipient=self.user, title="Т", message="П", is_read=is_read)
+        Notification.objects.filter(pk=notification.pk).update(
+            created_at=notification.created_at - timedelta(days=age_days)
+        )
+        return notification
+
+    def test_only_old_read_notifications_are_archived(self):
+        old_read = [self.notification(120, True) for _ in range(3)]
+        old_unread = self.notification(120, False)
+        fresh_read = self.notification(5, True)
+
+        self.assertEqual(prune_notifications(days=90, batch_size=2), 3)
+        self.assertEqual(set(Notification.objects.values_list('pk', flat=True)), {old_unread.pk, fresh_read.pk})
+        self.assertEqual(set(NotificationArchive.objects.values_list('pk', flat=True)), {n.pk for n in old_read})
+        self.assertEqual(prune_notifications(days=90), 0)
+
+
+class NotificationResumeTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='resume_user')
+        self.notifications = [
+            Notification.objects.create(recipient=self.user, title=f"N{i}", message="П", delivered_at=timezone.now())
+            for i in range(3)
+        ]
+        # Ще не доставлене диспетчером — прийде живою подією, а не з відтворення
+        Notification.objects.create(recipient=self.user, title="Pending", message="П")
+        self.token = str(AccessToken.for_user(self.user))
+
+    async def test_reconnect_replays_missed_notifications(self):
+        last_id = self.notifications[0].pk
+        communicator = WebsocketCommunicator(
+            NotificationConsumer.as_asgi(), f"/ws/notifications/?token={self.token}&last_id={last_id}"
+        )
+        connected, _ = await communicator.connect()
+        self.assertTrue(connected)
+        # Відтворені сповіщення приходять одним пакетним кадром
+        replayed = (await communicator.receive_json_from())['batch']
+        self.assertEqual([item['id'] for item in replayed], [n.pk for n in self.notifications[1:]])
+        self.assertTrue(await communicator.receive_nothing())
+
+        await communicator.send_json_to({'last_id': self.notifications[1].pk})
+        self.assertEqual((await communicator.receive_json_from())['title'], "N2")
+        await communicator.disconnect()
+
+    async def test_retried_lower_id_is_replayed_after_higher_one(self):
+        # N0 не вдалося надіслати одразу: диспетчер доставив його вже після N2, яке клієнт отримав
+        retried = self.notifications[0]
+        retried.delivered_at = timezone.now()
+        await retried.asave(update_fields=['delivered_at'])
+        communicator = WebsocketCommunicator(
+            NotificationConsumer.as_asgi(), f"/ws/notifications/?token={self.token}&last_id={self.notifications[2].pk}"
+        )
+        await communicator.connect()
+        self.assertEqual((await communicator.receive_json_from())['id'], retried.pk)
+        self.assertTrue(await communicator.receive_nothing())
+
+        await communicator.send_json_to({'last_id': 10 ** 9})
+        self.assertEqual(await communicator.receive_json_from(), {'resync': True})
+        await communicator.disconnect()
+
+
+class ClaimsAuthenticationTest(APITestCase):
+    def setUp(self):
+        user_cache.clear()
+        self.addCleanup(last_login_buffer.flush)
+        self.user = User.objects.create_user(username='claims_user', email='claims@test.com', password='pass12345')
+        self.client_profile = Client.objects.create(user=self.user, age=25)
+
+    def login(self):
+        response = self.client.post(reverse('login'), {'username': 'claims_user', 'password': 'pass12345'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data
+
+    def auth_queries(self, token):
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse('booking-list'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [q['sql'] for q in ctx.captured_queries if 'FROM "auth_user"' in q['sql']]
+
+    def test_claims_token_needs_no_user_queries(self):
+        access = AccessToken(self.login()['access'])
+        self.assertEqual(access['role'], 'client')
+        self.assertEqual(access['client_id'], self.client_profile.pk)
+        self.assertEqual(self.auth_queries(str(access)), [])
+
+    def test_legacy_token_uses_user_cache(self):
+        token = str(AccessToken.for_user(self.user))
+        self.assertEqual(len(self.auth_queries(token)), 1)
+        self.assertEqual(self.auth_queries(token), [])
+
+    def test_deferred_fields_load_once_and_invalidate_on_save(self):
+        token = AccessToken(self.login()['access'])
+        user = ClaimsJWTAuthentication().get_user(token)
+        self.assertEqual(user, self.user)
+        with self.assertNumQueries(0):
+            self.assertEqual(user.client.pk, self.client_profile.pk)
+        with self.assertNumQueries(1):
+            self.assertEqual(user.email, 'claims@test.com')
+        with self.assertNumQueries(0):
+            self.assertEqual(ClaimsJWTAuthentication().get_user(token).email, 'claims@test.com')
+
+        self.user.email = 'new@test.com'
+        self.user.save()
+        with self.assertNumQueries(1):
+            self.assertEqual(ClaimsJWTAuthentication().get_user(token).email, 'new@test.com')
+
+    def header_user(self, username):
+        response = self.client.post(reverse('login'), {'username': username, 'password': 'pass12345'})
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {response.data['access']}")
+        request = RequestFactory().get('/', HTTP_AUTHORIZATION=f"Bearer {response.data['access']}")
+        return ClaimsJWTAuthentication().authenticate(request)[0]
+
+    def test_claims_map_to_the_right_fields(self):
+        user = self.header_user('claims_user')
+        self.assertEqual((user.username, user.is_staff, user.is_superuser, user.is_active), ('claims_user', False, False, True))
+
+        admin = User.objects.create_user(username='claims_admin', password='pass12345', is_staff=True)
+        Hostel.objects.create(name="Claims", admin=admin)
+        user = self.header_user('claims_admin')
+        self.assertEqual((user.username, user.is_staff, user.is_superuser), ('claims_admin', True, False))
+        self.assertFalse(hasattr(user, 'client'))
+        self.assertEqual(self.client.get(reverse('booking-pending')).status_code, status.HTTP_200_OK)
+
+    def test_client_token_cannot_touch_foreign_booking(self):
+        other = Client.objects.create(user=User.objects.create_user(username='claims_other'), age=40)
+        room = Room.objects.create(number=1, price=100, bed=1, hostel=Hostel.objects.create(name="Claims"))
+        booking = Booking.objects.create(
+            client=other, room=room, price=100, start_date=date.today(), last_date=date.today() + timedelta(days=1)
+        )
+        self.header_user('claims_user')
+        url = reverse('booking-detail', args=[booking.pk])
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(self.client.patch(url, {'price': 1}).status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(self.client.delete(url).status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(self.client.get(reverse('booking-pending')).status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(self.client.get(reverse('booking-list')).data['results'], [])
+
+    def test_refresh_reissues_claims(self):
+        refresh = self.login()['refresh']
+        self.user.is_staff = True
+        self.user.save()
+        response = self.client.post(reverse('token_refresh'), {'refresh': refresh})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        access = AccessToken(response.data['access'])
+        self.assertEqual(access['role'], 'admin')
+        self.assertTrue(access['is_staff'])
+
+
+class LoginPipelineTest(APITestCase):
+    def setUp(self):
+        self.addCleanup(last_login_buffer.flush)
+        self.user = User.objects.create_user(username='fast_login', email='Fast@Test.com', password='pass12345')
+        self.client_profile = Client.objects.create(user=self.user, age=30)
+
+    def login(self, username, password='pass12345'):
+        return self.client.post(reverse('login'), {'username': username, 'password': password})
+
+    def test_exact_email_wins_over_case_insensitive_match(self):
+        other = User.objects.create_user(username='fast_login_2', email='fast@test.com', password='other12345')
+        Client.objects.create(user=other, age=31)
+
+        response = self.login('fast@test.com', 'other12345')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(AccessToken(response.data['access'])['user_id'], str(other.pk))
+
+        response = self.login(self.user.email)  # create_user нормалізує домен: 'Fast@test.com'
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(AccessToken(response.data['access'])['user_id'], str(self.user.pk))
+
+    def test_ambiguous_case_insensitive_email_is_rejected(self):
+        User.objects.create_user(username='fast_login_2', email='fast@test.com', password='pass12345')
+        response = self.login('FAST@TEST.COM')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_email_is_case_insensitive_and_hash_checked_once(self):
+        with mock.patch('django.contrib.auth.base_user.check_password', wraps=check_password) as checker:
+            response = self.login('fast@test.COM')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['client_id'], self.client_profile.pk)
+        self.assertEqual(checker.call_count, 1)
+
+    def test_inactive_user_rejected(self):
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.login('fast_login').status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_last_login_is_buffered(self):
+        self.assertEqual(self.login('fast_login').status_code, status.HTTP_200_OK)
+        self.client_profile.refresh_from_db()
+        self.assertIsNone(self.client_profile.last_login)
+
+        last_login_buffer.flush()
+        self.client_profile.refresh_from_db()
+        self.assertIsNotNone(self.client_profile.last_login)
+
+    def test_buffer_flushes_in_batches(self):
+        other = Client.objects.create(user=User.objects.create_user(username='fast_login_2'), age=20)
+        buffer = LastLoginBuffer(size=2)
+        with self.assertNumQueries(0):
+            buffer.record(self.client_profile.pk)
+        buffer.record(other.pk)
+        self.assertEqual(len(buffer), 0)
+        self.assertEqual(Client.objects.filter(last_login__isnull=False).count(), 2)
+
+
+class AvailabilityChannelTest(TestCase):
+    def setUp(self):
+        self.hostel = Hostel.objects.create(name="Live", city="Kyiv", is_active=True)
+        self.room = Room.objects.create(number=7, price=100, bed=2, hostel=self.hostel)
+        self.client_profile = Client.objects.create(user=User.objects.create_user(username='live_guest'), age=30)
+        self.start = date.today() + timedelta(days=3)
+        patcher = mock.patch('booking.services.availability.get_channel_layer')
+        self.channel_layer = patcher.start().return_value
+        self.channel_layer.group_send = mock.AsyncMock()
+        self.addCleanup(patcher.stop)
+
+    def sent(self):
+        return [
+            (call.args[0], [(d['room'], d['start_date'], d['state']) for d in call.args[1]['deltas']])
+            for call in self.channel_layer.group_send.await_args_list
+        ]
+
+    def test_booking_lifecycle_publishes_deltas(self):
+        group = availability_group(self.hostel.pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            booking = Booking.objects.create(
+                client=self.client_profile, room=self.room, price=200,
+                start_date=self.start, last_date=self.start + timedelta(days=2)
+            )
+        self.assertEqual(self.sent(), [(group, [(self.room.pk, str(self.start), 'pending')])])
+
+        self.channel_layer.group_send.reset_mock()
+        booking = Booking.objects.get(pk=booking.pk)
+        booking.approved = True
+        booking.start_date = self.start + timedelta(days=1)
+        with self.captureOnCommitCallbacks(execute=True):
+            booking.save()
+        self.assertEqual(self.sent(), [(group, [
+            (self.room.pk, str(self.start), 'free'),
+            (self.room.pk, str(self.start + timedelta(days=1)), 'booked'),
+        ])])
+
+        self.channel_layer.group_send.reset_mock()
+        with self.captureOnCommitCallbacks(execute=True):
+            booking.delete()
+        self.assertEqual(self.sent(), [(group, [(self.room.pk, str(self.start + timedelta(days=1)), 'free')])])
+
+    def test_unrelated_save_publishes_nothing(self):
+        booking = Booking.objects.create(
+            client=self.client_profile, room=self.room, price=200,
+            start_date=self.start, last_date=self.start + timedelta(days=2)
+        )
+        booking = Booking.objects.get(pk=booking.pk)
+        booking.request_text = "Пізній заїзд"
+        with self.captureOnCommitCallbacks(execute=True):
+            booking.save()
+        self.channel_layer.group_send.assert_not_awaited()
+
+    async def test_consumer_forwards_deltas(self):
+        communicator = WebsocketCommunicator(
+            URLRouter(websocket_urlpatterns), f"/ws/hostels/{self.hostel.pk}/availability/"
+        )
+        connected, _ = await communicator.connect()
+        self.assertTrue(connected)
+        delta = {"room": 1, "start_date": "2026-01-01", "last_date": "2026-01-02", "state": "booked"}
+        await get_channel_layer().group_send(
+            availability_group(self.hostel.pk), {"type": "send_availability", "deltas": [delta]}
+        )
+        self.assertEqual(await communicator.receive_json_from(), {"deltas": [delta]})
+        await communicator.disconnect()
+
+    async def test_inactive_or_unknown_hostel_is_rejected(self):
+        inactive = await Hostel.objects.acreate(name="Hidden", city="Kyiv")
+        for hostel_id in (inactive.pk, inactive.pk + 1000):
+            communicator = WebsocketCommunicator(
+                URLRouter(websocket_urlpatterns), f"/ws/hostels/{hostel_id}/availability/"
+            )
+            connected, _ = await communicator.connect()
+            self.assertTrue(connected)
+            self.assertEqual(
+                await communicator.receive_output(), {"type": "websocket.close", "code": HOSTEL_NOT_FOUND_CLOSE_CODE}
+            )
+
+
+class NotificationCoalescingTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='burst_user')
+        self.token = str(AccessToken.for_user(self.user))
+
+    async def connect(self):
+        communicator = WebsocketCommunicator(NotificationConsumer.as_asgi(), f"/ws/notifications/?token={self.token}")
+        connected, _ = await communicator.connect()
+        self.assertTrue(connected)
+        return communicator
+
+    async def burst(self, count):
+        for i in range(count):
+            await get_channel_layer().group_send(f"user_{self.user.pk}", {
+                "type": "send_notification", "data": {"id": i, "title": f"N{i}", "message": "П"}
+            })
+
+    async def test_burst_is_delivered_as_one_frame(self):
+        communicator = await self.connect()
+        await self.burst(3)
+        await get_channel_layer().group_send(f"user_{self.user.pk}", {"type": "send_unread_count", "count": 2})
+        await get_channel_layer().group_send(f"user_{self.user.pk}", {"type": "send_unread_count", "count": 3})
+        frame = await communicator.receive_json_from()
+        self.assertEqual(
+            [item.get('title', item.get('unread_count')) for item in frame['batch']], ["N0", "N1", "N2", 3]
+        )
+        self.assertTrue(await communicator.receive_nothing())
+
+        await self.burst(1)
+        self.assertEqual((await communicator.receive_json_from())['title'], "N0")
+        await communicator.disconnect()
+
+    @override_settings(NOTIFICATION_WS_BUFFER_LIMIT=200, NOTIFICATION_WS_COALESCE_MS=0)
+    async def test_stalled_socket_write_is_disconnected(self):
+        class StalledConsumer(NotificationConsumer):
+            # Сервер не може дописати кадр: клієнт не читає, send не завершується
+            async def send(self, text_data=None, bytes_data=None, close=False):
+                await asyncio.Event().wait()
+
+        communicator = WebsocketCommunicator(StalledConsumer.as_asgi(), f"/ws/notifications/?token={self.token}")
+        connected, _ = await communicator.connect()
+        self.assertTrue(connected)
+        await self.burst(3)
+        self.assertTrue(await communicator.receive_nothing())
+        await self.burst(3)
+        output = await communicator.receive_output()
+        self.assertEqual(output, {"type": "websocket.close", "code": SLOW_CONSUMER_CLOSE_CODE})
+
+    @override_settings(NOTIFICATION_WS_BUFFER_LIMIT=200, NOTIFICATION_WS_COALESCE_MS=0)
+    async def test_reader_without_acks_is_disconnected(self):
+        communicator = await self.connect()
+        for i in range(4):
+            await self.burst(1)
+            await communicator.receive_json_from()
+        await self.burst(1)
+        output = await communicator.receive_output()
+        self.assertEqual(output, {"type": "websocket.close", "code": SLOW_CONSUMER_CLOSE_CODE})
+
+    @override_settings(NOTIFICATION_WS_COALESCE_MS=0)
+    async def test_failed_flush_closes_connection(self):
+        class BrokenConsumer(NotificationConsumer):
+            async def send(self, text_data=None, bytes_data=None, close=False):
+                raise ConnectionError("transport closed")
+
+        communicator = WebsocketCommunicator(BrokenConsumer.as_asgi(), f"/ws/notifications/?token={self.token}")
+        await communicator.connect()
+        with self.assertLogs('booking.consumers', 'ERROR'):
+            await self.burst(1)
+            output = await communicator.receive_output()
+        self.assertEqual(output, {"type": "websocket.close", "code": SEND_FAILED_CLOSE_CODE})
+
+    @override_settings(NOTIFICATION_WS_BUFFER_LIMIT=200, NOTIFICATION_WS_COALESCE_MS=0)
+    async def test_acknowledged_frames_free_the_buffer(self):
+        communicator = await self.connect()
+        for i in range(20):
+            await self.burst(1)
+            self.assertEqual((await communicator.receive_json_from())['title'], "N0")
+            await communicator.send_json_to({"ack": i + 1})
+        await communicator.disconnect()
+
+
+class TokenRevocationTest(APITestCase):
+    def setUp(self):
+        user_cache.clear()
+        self.addCleanup(last_login_buffer.flush)
+        self.user = User.objects.create_user(username='revoked_user', password='pass12345', is_staff=True)
+        self.addCleanup(cache.delete, token_version_key(self.user.pk))
+        self.client_profile = Client.objects.create(user=self.user, age=30)
+        self.hostel = Hostel.objects.create(name="Revoke", admin=self.user)
+        self.room = Room.objects.create(number=1, price=100, bed=1, hostel=self.hostel)
+        response = self.client.post(reverse('login'), {'username': 'revoked_user', 'password': 'pass12345'})
+        self.tokens = response.data
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.tokens['access']}")
+
+    def change(self, **fields):
+        for name, value in fields.items():
+            setattr(self.user, name, value)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.save()
+
+    def test_unrelated_change_keeps_token(self):
+        self.change(first_name="Нове")
+        self.assertEqual(self.client.get(reverse('booking-list')).status_code, status.HTTP_200_OK)
+
+    def test_deactivated_user_is_rejected(self):
+        self.change(is_active=False)
+        self.assertEqual(self.client.get(reverse('booking-list')).status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_demoted_user_loses_admin_rights_until_refresh(self):
+        self.change(is_staff=False)
+        self.assertEqual(self.client.get(reverse('booking-list')).status_code, status.HTTP_401_UNAUTHORIZED)
+
+        response = self.client.post(reverse('token_refresh'), {'refresh': self.tokens['refresh']})
+        access = AccessToken(response.data['access'])
+        self.assertEqual(access['role'], 'client')
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {access}")
+        self.assertEqual(self.client.get(reverse('booking-list')).status_code, status.HTTP_200_OK)
+
+    def test_deleted_user_gets_401_instead_of_500(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.delete()
+        start = date.today() + timedelta(days=5)
+        response = self.client.post(reverse('booking-list'), {
+            'room': self.room.pk, 'start_date': start.isoformat(),
+            'last_date': (start + timedelta(days=2)).isoformat(),
+        })
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class BenchWsFanoutCommandTest(TransactionTestCase):
+    # Без обгортки TestCase в atomic: команда, як і прод, працює в autocommit
+    def test_command_runs_and_removes_its_data(self):
+        out = StringIO()
+        call_command(
+            'bench_ws_fanout', '--connections', '2', '--bursts', '1', '--per-user', '2',
+            '--coalesce-ms', '0', '--timeout', '5', '--in-memory', stdout=out, stderr=StringIO(),
+        )
+        self.assertIn("Утримано з'єднань: 2 з 2", out.getvalue())
+        self.assertIn("Отримано 4 сповіщень", out.getvalue())
+        self.assertFalse(User.objects.filter(username__startswith='bench_ws_').exists())
+        self.assertFalse(Notification.objects.exists())
+
+
+@skipUnless(connection.vendor == 'postgresql', "Обмеження виключення працює лише в PostgreSQL")
+class BookingOverlapConstraintTest(TransactionTestCase):
+    PARALLEL = 8
+
+    def setUp(self):
+        self.hostel = Hostel.objects.create(name="Race", city="Kyiv", is_active=True)
+        self.room = Room.objects.create(number=1, price=100, bed=1, hostel=self.hostel)
+        self.users = []
+        for index in range(self.PARALLEL):
+            user = User.objects.create_user(username=f'racer{index}')
+            Client.objects.create(user=user, age=30)
+            self.users.append(user)
+
+    def test_parallel_bookings_of_one_room(self):
+        start = date.today() + timedelta(days=10)
+        barrier = threading.Barrier(self.PARALLEL)
+        responses = []
+
+        def book(user, offset):
+            api = APIClient()
+            api.force_authenticate(user=user)
+            barrier.wait()
+            try:
+                responses.append(api.post(reverse('booking-list'), {
+                    'room': self.room.pk,
+                    'start_date': (start + timedelta(days=offset)).isoformat(),
+                    'last_date': (start + timedelta(days=offset + 2)).isoformat(),
+                }))
+            finally:
+                connections.close_all()
+
+        threads = [threading.Thread(target=book, args=(user, index % 2)) for index, user in enumerate(self.users)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        created = [r for r in responses if r.status_code == status.HTTP_201_CREATED]
+        rejected = [r for r in responses if r.status_code == status.HTTP_400_BAD_REQUEST]
+        self.assertEqual(len(created), 1)
+        self.assertEqual(len(rejected), self.PARALLEL - 1)
+        self.assertEqual(rejected[0].data['non_field_errors'][0], "Ця кімната вже зайнята на обрані дати.")
+        self.assertEqual(Booking.objects.filter(room=self.room).count(), 1)
+
+
+@skipUnless(connection.vendor == 'postgresql', "SELECT ... FOR UPDATE працює лише в PostgreSQL")
+class ReviewRatingRaceTest(TransactionTestCase):
+    PARALLEL = 6
+
+    def setUp(self):
+        self.hostel = Hostel.objects.create(name="Rated race", city="Kyiv")
+        self.review = Reviews.objects.create(
+            hostel=self.hostel, user=User.objects.create_user(username='race_reviewer'), rating=1
+        )
+
+    def test_parallel_edits_of_one_review_keep_aggregates(self):
+        barrier = threading.Barrier(self.PARALLEL)
+
+        def edit(rating):
+            review = Reviews.objects.get(pk=self.review.pk)
+            review.rating = rating
+            barrier.wait()
+            try:
+                review.save()
+            finally:
+                connections.close_all()
+
+        threads = [threading.Thread(target=edit, args=(index % 5 + 1,)) for index in range(self.PARALLEL)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.hostel.refresh_from_db()
+        rating = Reviews.objects.get(pk=self.review.pk).rating
+        self.assertEqual((self.hostel.reviews_count, self.hostel.rating_sum), (1, rating))
+        self.assertEqual(sum(getattr(self.hostel, f"rating_{star}") for star in range(1, 6)), 1)
+        self.assertEqual(getattr(self.hostel, f"rating_{rating}"), 1)
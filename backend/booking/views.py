@@ -5,29 +5,177 @@ from datetime import datetime, timedelta
 
 from django.db.migrations import serializer
 from django.http import HttpResponse
-from django.db.models import Sum
+from django.db.models import (Count, JSONField, Max, Min, OuterRef, Prefetch, Subquery, Sum,
+                              prefetch_related_objects)
+from django.db.models.functions import Coalesce, JSONObject
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
+from django.utils.http import parse_http_date_safe
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters, generics, status, viewsets
-from rest_framework.permissions import AllowAny, IsAuthenticated, IsAuthenticatedOrReadOnly
+from rest_framework.permissions import AllowAny, IsAdminUser, IsAuthenticated, IsAuthenticatedOrReadOnly
 from rest_framework.decorators import action, parser_classes
 from rest_framework.response import Response
+from rest_framework.views import APIView
+from .filters import FullTextSearchFilter
 from .permissions import IsAdminOrReadOnly, IsClientOrAdmin, IsAuthorOrReadOnly
 from rest_framework.parsers import MultiPartParser, FormParser
 from drf_spectacular.utils import extend_schema, OpenApiResponse
 
-from .models import Booking, Client, Hostel, Room, RoomImage, Reviews, HostelImage
+from .models import Booking, Client, Hostel, Room, RoomImage, Reviews, HostelImage, RoomNight, Notification
 from .serializers import (BookingSerializer, ClientSerializer,
                           HostelSerializer, RegisterSerializer,
                           RoomSerializer, NotificationSerializer,
-                          ReviewsSerializer, HostelImageSerializer, DeleteAccountSerializer, RoomImageSerializer)
+                          ReviewsSerializer, HostelImageSerializer, DeleteAccountSerializer, RoomImageSerializer,
+                          HostelSearchQuerySerializer, HostelSearchSerializer, HostelListSerializer,
+                          GroupBookingSerializer, BookingDecisionSerializer, BroadcastSerializer,
+                          HOSTEL_TOP_REVIEWS)
 
 from rest_framework import viewsets, status
 from rest_framework.response import Response
 from rest_framework.exceptions import PermissionDenied
-from rest_framework.pagination import PageNumberPagination
+from rest_framework.pagination import CursorPagination, PageNumberPagination
 from .services.pdf_service import InvoicePDFGenerator
+from .services.occupancy import booked_room_ids
+from .services.bookings import decide_bookings
+from .services.broadcast import audience_ids, broadcast as send_broadcast
+from .services.unread import mark_read, reset_unread, unread_count as get_unread_count
+from .services.cache import (catalog_cache_stats, get_cached, response_cache_key,
+                             set_cached, viewer_role)
+from .services.conditional import (conditional_headers, is_not_modified, make_etag,
+                                   not_modified_response)
+
+CALENDAR_DEFAULT_DAYS = 31
+CALENDAR_MAX_DAYS = 92
+BOOKING_DECISIONS_MAX = 100
+
+
+class SparseFieldsetMixin:
+    """
+    Додає select_related/prefetch_related лише для полів, які реально запитані через ?fields=/?expand=.
+    related_fields: {поле серіалізатора: {'select_related': [...], 'prefetch_related': [...]}}
+    """
+    related_fields = {}
+
+    def requested_fields(self):
+        return self.get_serializer_class().selected_fields(self.request)
+
+    def wants(self, *fields):
+        requested = self.requested_fields()
+        return requested is None or any(field in requested for field in fields)
+
+    def optimize_queryset(self, qs):
+        select, prefetch = [], []
+        for field, relations in self.related_fields.items():
+            if self.wants(field):
+                select.extend(relations.get('select_related', []))
+                prefetch.extend(relations.get('prefetch_related', []))
+        if select:
+            qs = qs.select_related(*select)
+        if prefetch:
+            qs = qs.prefetch_related(*prefetch)
+        return qs
+
+
+class ConditionalGetMixin:
+    """
+    ETag/Last-Modified для list/retrieve. Версія — MAX(updated_at) і кількість рядків вибірки,
+    тож незмінні дані коштують одного індексного запиту і відповіді 304 без серіалізації.
+    etag_fields: поля з мітками часу, зміна яких змінює відповідь.
+    uncached_params: параметри, з якими відповідь залежить від бронювань, — без умовних запитів.
+    """
+    etag_fields = ('updated_at',)
+    uncached_params = ()
+
+    def get_version_queryset(self):
+        return self.get_queryset()
+
+    def etag_scope(self):
+        """Для кого відповідь однакова: (частина ETag, чи можна ділити її між клієнтами)."""
+        return f'user:{self.request.user.pk}', False
+
+    def version_stamp(self):
+        qs = self.filter_queryset(self.get_version_queryset())
+        if self.detail:
+            lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+            qs = qs.filter(**{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+        stamps = {f'stamp_{i}': Max(field) for i, field in enumerate(self.etag_fields)}
+        version = qs.order_by().aggregate(count=Count('pk'), last_pk=Max('pk'), **stamps)
+        if not version['count']:
+            return None
+        last_modified = max(version[key] for key in stamps if version[key] is not None)
+        scope, shared = self.etag_scope()
+        etag = make_etag(scope, self.request.get_full_path(), *version.values())
+        return etag, int(last_modified.timestamp()), shared
+
+    def conditional_response(self, handler, request, *args, **kwargs):
+        if any(param in request.query_params for param in self.uncached_params):
+            return handler(request, *args, **kwargs)
+        version = self.version_stamp()
+        if version is None:
+            # Порожній список або 404 — віддаємо як є
+            return handler(request, *args, **kwargs)
+
+        etag, last_modified, shared = version
+        headers = conditional_headers(etag, last_modified, shared)
+        if is_not_modified(request, etag, last_modified):
+            return not_modified_response(headers)
+
+        response = handler(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            for name, value in headers.items():
+                response[name] = value
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_response(super().retrieve, request, *args, **kwargs)
+
+
+class CatalogCacheMixin:
+    """
+    Read-through кеш у Redis для list/retrieve каталогу. Ключ — версія каталогу, роль глядача
+    та повний URL із параметрами; версію змінюють сигнали при зміні готелів, кімнат, фото й відгуків.
+    Разом із даними зберігаються ETag/Last-Modified, тож 304 з кешу не звертається до БД.
+    """
+    uncached_params = ()
+    cached_headers = ('ETag', 'Last-Modified', 'Cache-Control')
+
+    def etag_scope(self):
+        # Тіло кешується на роль, тож і валідатор має бути спільним для ролі, а не для користувача
+        role = viewer_role(self.request.user)
+        if role is None:
+            return super().etag_scope()
+        return f'role:{role}', role == 'anon'
+
+    def cached_response(self, handler, request, *args, **kwargs):
+        role = viewer_role(request.user)
+        if role is None or any(param in request.query_params for param in self.uncached_params):
+            return handler(request, *args, **kwargs)
+
+        key = response_cache_key(request, role)
+        cached = get_cached(key)
+        if cached is not None:
+            headers = cached['headers']
+            if 'ETag' in headers and is_not_modified(
+                request, headers['ETag'], parse_http_date_safe(headers.get('Last-Modified', ''))
+            ):
+                return not_modified_response(headers)
+            return Response(cached['data'], headers=headers)
+
+        response = handler(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            headers = {name: response[name] for name in self.cached_headers if response.has_header(name)}
+            set_cached(key, {'data': response.data, 'headers': headers})
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(super().retrieve, request, *args, **kwargs)
 
 
 class ReviewsPagination(PageNumberPagination):
@@ -36,15 +184,55 @@ class ReviewsPagination(PageNumberPagination):
     max_page_size = 50
 
 
-class ReviewsViewSet(viewsets.ModelViewSet):
+class KeysetPagination(CursorPagination):
+    """Курсорна пагінація: наступна сторінка береться по індексу від останнього запису, без COUNT(*) та OFFSET."""
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    ordering = ('-created_at', '-id')
+
+
+class PendingQueuePagination(KeysetPagination):
+    """Черга заявок: найстаріші першими, плюс дешевий COUNT по частковому індексу."""
+    ordering = ('created_at', 'id')
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.count = queryset.count()
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        return Response({
+            'count': self.count,
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+
+class IdKeysetPagination(KeysetPagination):
+    ordering = ('id',)
+
+
+class HostelKeysetPagination(IdKeysetPagination):
+    def get_ordering(self, request, queryset, view):
+        # Результати повнотекстового пошуку гортаються за релевантністю
+        if 'search_rank' in queryset.query.annotations:
+            return ('-search_rank', 'id')
+        return super().get_ordering(request, queryset, view)
+
+
+class ReviewsViewSet(SparseFieldsetMixin, viewsets.ModelViewSet):
     serializer_class = ReviewsSerializer
     permission_classes = [IsAuthenticatedOrReadOnly, IsAuthorOrReadOnly]
     pagination_class = ReviewsPagination
     filter_backends = [DjangoFilterBackend]
     filterset_fields = ['hostel']
+    related_fields = {
+        'user_name': {'select_related': ['user']},
+    }
 
     def get_queryset(self):
-        return Reviews.objects.select_related('user', 'hostel').all()
+        return self.optimize_queryset(Reviews.objects.all())
 
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
@@ -54,10 +242,20 @@ class ReviewsViewSet(viewsets.ModelViewSet):
         return super().update(request, *args, **kwargs)
 
 
-class RoomViewSet(viewsets.ModelViewSet):
+class RoomViewSet(CatalogCacheMixin, ConditionalGetMixin, SparseFieldsetMixin, viewsets.ModelViewSet):
     serializer_class = RoomSerializer
+    # Вільні номери на дати залежать від бронювань, тому не кешуються
+    uncached_params = ('check_in', 'check_out')
+    etag_fields = ('updated_at', 'hostel__updated_at')
     filterset_fields = ['hostel']
     filter_backends = [DjangoFilterBackend]
+    pagination_class = IdKeysetPagination
+    related_fields = {
+        'hostel_name': {'select_related': ['hostel']},
+        'hostel_city': {'select_related': ['hostel']},
+        'hostel_address': {'select_related': ['hostel']},
+        'images': {'prefetch_related': ['images']},
+    }
 
     def get_queryset(self):
         user = self.request.user
@@ -77,13 +275,9 @@ class RoomViewSet(viewsets.ModelViewSet):
                 check_out_date = datetime.strptime(check_out, '%Y-%m-%d').date()
             except ValueError:
                 return qs
-            booked_room_ids = Booking.objects.filter(
-                start_date__lt=check_out_date,
-                last_date__gt=check_in_date,
-                approved=True  # только подтверждённые брони блокируют номер
-            ).values_list('room_id', flat=True)
-            qs = qs.exclude(id__in=booked_room_ids)
-        return qs
+            # Індекс зайнятості містить лише ночі підтверджених броней
+            qs = qs.exclude(id__in=booked_room_ids(check_in_date, check_out_date))
+        return self.optimize_queryset(qs)
 
     def perform_create(self, serializer):
         hostel = serializer.validated_data.get('hostel')
@@ -130,16 +324,28 @@ class RoomViewSet(viewsets.ModelViewSet):
         return Response(status=204)
 
 
-class HostelViewSet(viewsets.ModelViewSet):
+class HostelSearchPagination(PageNumberPagination):
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+
+class HostelViewSet(CatalogCacheMixin, ConditionalGetMixin, SparseFieldsetMixin, viewsets.ModelViewSet):
     queryset = Hostel.objects.all()
     serializer_class = HostelSerializer
     # Вимоги 4.1: Пошук по ключовому слову
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter]
+    filter_backends = [DjangoFilterBackend, FullTextSearchFilter]
     search_fields = ['name', 'about', 'city', 'address']
     permission_classes = [IsAdminOrReadOnly]
     parser_classes = (MultiPartParser, FormParser)
-
-    def get_queryset(self):
+    pagination_class = HostelKeysetPagination
+    related_fields = {
+        'rooms': {'prefetch_related': ['rooms__images']},
+        'free_seats': {'prefetch_related': ['rooms']},
+        'gallery_images': {'prefetch_related': ['gallery_images']},
+    }
+
+    def get_version_queryset(self):
         user = self.request.user
         if user.is_superuser:
             return Hostel.objects.all()
@@ -147,6 +353,32 @@ class HostelViewSet(viewsets.ModelViewSet):
             return Hostel.objects.filter(admin=user)
         return Hostel.objects.filter(is_active=True)
 
+    def get_queryset(self):
+        qs = self.get_version_queryset()
+        if self.action == 'list':
+            # Агрегати по кімнатах рахуються лише тоді, коли їх запитали
+            if self.wants('room_count', 'min_price', 'free_seats'):
+                qs = qs.annotate(
+                    room_count=Count('rooms'),
+                    min_price=Min('rooms__price'),
+                    free_seats=Coalesce(Sum('rooms__bed'), 0),
+                )
+            return qs
+        if self.action == 'retrieve':
+            qs = self.optimize_queryset(qs)
+            if self.wants('reviews'):
+                qs = qs.prefetch_related(Prefetch(
+                    'reviews',
+                    queryset=Reviews.objects.select_related('user')[:HOSTEL_TOP_REVIEWS],
+                    to_attr='top_reviews'
+                ))
+        return qs
+
+    def get_serializer_class(self):
+        if self.action == 'list':
+            return HostelListSerializer
+        return HostelSerializer
+
     def perform_create(self, serializer):
         serializer.save(admin=self.request.user)
 
@@ -172,6 +404,37 @@ class HostelViewSet(viewsets.ModelViewSet):
         image.delete()
         return Response(status=204)
 
+    @extend_schema(parameters=[HostelSearchQuerySerializer], responses=HostelSearchSerializer(many=True))
+    @action(detail=False, methods=['get'])
+    def search(self, request):
+        params = HostelSearchQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        data = params.validated_data
+
+        # Найдешевший вільний номер кожного готелю — корельований підзапит в одному SQL-запиті
+        free_rooms = Room.objects.filter(
+            hostel=OuterRef('pk'),
+            bed__gte=data['min_beds']
+        ).exclude(
+            id__in=booked_room_ids(data['check_in'], data['check_out'])
+        ).order_by('price', 'id')
+
+        hostels = Hostel.objects.filter(is_active=True)
+        if data.get('city'):
+            hostels = hostels.filter(city__iexact=data['city'])
+        hostels = hostels.annotate(
+            cheapest_price=Subquery(free_rooms.values('price')[:1]),
+            cheapest_room=Subquery(
+                free_rooms.values(data=JSONObject(id='id', number='number', price='price', bed='bed'))[:1],
+                output_field=JSONField()
+            ),
+        ).filter(cheapest_price__isnull=False).order_by('cheapest_price', 'id')
+
+        paginator = HostelSearchPagination()
+        page = paginator.paginate_queryset(hostels, request, view=self)
+        serializer = HostelSearchSerializer(page, many=True, context=self.get_serializer_context())
+        return paginator.get_paginated_response(serializer.data)
+
     @action(detail=True, methods=['get'])
     def availability(self, request, pk=None):
         hostel = self.get_object()
@@ -205,8 +468,64 @@ class HostelViewSet(viewsets.ModelViewSet):
             "booked_details": BookingSerializer(active_bookings, many=True).data
         })
 
+    @action(detail=True, methods=['get'])
+    def calendar(self, request, pk=None):
+        hostel = self.get_object()
+        try:
+            date_from = self._parse_date(request.query_params.get('from')) or timezone.now().date()
+            date_to = self._parse_date(request.query_params.get('to')) or date_from + timedelta(days=CALENDAR_DEFAULT_DAYS - 1)
+        except ValueError:
+            return Response({"error": "Неправильний формат дати. Використовуйте YYYY-MM-DD."}, status=400)
+
+        days_count = (date_to - date_from).days + 1
+        if days_count < 1:
+            return Response({"error": "Дата 'to' має бути не раніше дати 'from'."}, status=400)
+        if days_count > CALENDAR_MAX_DAYS:
+            return Response({"error": f"Максимальний період — {CALENDAR_MAX_DAYS} днів."}, status=400)
+
+        rooms = list(hostel.rooms.order_by('number').values('id', 'number', 'bed'))
+        room_index = {room['id']: i for i, room in enumerate(rooms)}
+
+        # Одна вибірка по індексу зайнятості на весь період замість запиту на кожен день
+        matrix = [[0] * len(rooms) for _ in range(days_count)]
+        nights = RoomNight.objects.filter(
+            room__hostel=hostel,
+            date__gte=date_from,
+            date__lte=date_to
+        ).values_list('date', 'room_id').distinct()
+        for night, room_id in nights:
+            matrix[(night - date_from).days][room_index[room_id]] = 1
+
+        total_seats = sum(room['bed'] for room in rooms)
+        days = []
+        for offset, booked in enumerate(matrix):
+            booked_seats = sum(room['bed'] for room, flag in zip(rooms, booked) if flag)
+            booked_rooms = sum(booked)
+            days.append({
+                "date": date_from + timedelta(days=offset),
+                "booked": booked,
+                "free_rooms": len(rooms) - booked_rooms,
+                "booked_rooms": booked_rooms,
+                "free_seats": total_seats - booked_seats,
+                "booked_seats": booked_seats,
+            })
+
+        return Response({
+            "hostel": hostel.id,
+            "from": date_from,
+            "to": date_to,
+            "rooms": rooms,
+            "days": days,
+        })
+
+    @staticmethod
+    def _parse_date(value):
+        if not value:
+            return None
+        return datetime.strptime(value, '%Y-%m-%d').date()
+
 
-class ClientViewSet(viewsets.ModelViewSet):
+class ClientViewSet(SparseFieldsetMixin, viewsets.ModelViewSet):
     queryset = Client.objects.all()
     serializer_class = ClientSerializer
     permission_classes = [IsClientOrAdmin]
@@ -214,13 +533,16 @@ class ClientViewSet(viewsets.ModelViewSet):
     filter_backends = [filters.OrderingFilter, filters.SearchFilter]
     ordering_fields = ['user__first_name', 'user__last_name']
     search_fields = ['user__email', 'user__first_name', 'user__last_name']
+    related_fields = {
+        field: {'select_related': ['user']} for field in ('first_name', 'last_name', 'email', 'fullname')
+    }
 
     def get_queryset(self):
         user = self.request.user
         # Проверяем аутентификацию и тип
         if user.is_staff:
-            return Client.objects.all()
-        return Client.objects.filter(user=user)
+            return self.optimize_queryset(Client.objects.all())
+        return self.optimize_queryset(Client.objects.filter(user=user))
 
     @action(detail=False, methods=['get', 'patch', 'put'], permission_classes=[IsAuthenticated])
     def me(self, request):
@@ -279,19 +601,27 @@ class ClientViewSet(viewsets.ModelViewSet):
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
-class BookingViewSet(viewsets.ModelViewSet):
+class BookingViewSet(ConditionalGetMixin, SparseFieldsetMixin, viewsets.ModelViewSet):
     queryset = Booking.objects.all()
     serializer_class = BookingSerializer
     permission_classes = [IsAuthenticated, IsClientOrAdmin]
+    pagination_class = KeysetPagination
+    # У відповіді є room_details (з назвою готелю) і client_details
+    etag_fields = ('updated_at', 'room__updated_at', 'room__hostel__updated_at', 'client__updated_at')
 
     filter_backends = [DjangoFilterBackend]
     filterset_fields = ['room__hostel', 'client']
+    related_fields = {
+        'client_details': {'select_related': ['client__user']},
+        'room_details': {'select_related': ['room__hostel'], 'prefetch_related': ['room__images']},
+    }
 
     def get_queryset(self):
         user = self.request.user
-        base_qs = Booking.objects.select_related(
-            'room__hostel__admin', 'client__user'
-        )
+        base_qs = self.optimize_queryset(Booking.objects.all())
+        if self.detail:
+            # Перевірка прав на об'єкт звертається до room.hostel
+            base_qs = base_qs.select_related('room__hostel')
 
         if user.is_superuser:
             qs = base_qs
@@ -334,6 +664,39 @@ class BookingViewSet(viewsets.ModelViewSet):
         else:
             serializer.save()
 
+    @extend_schema(request=GroupBookingSerializer, responses=BookingSerializer(many=True))
+    @action(detail=False, methods=['post'])
+    def group(self, request):
+        serializer = GroupBookingSerializer(data=request.data, context=self.get_serializer_context())
+        serializer.is_valid(raise_exception=True)
+        bookings = serializer.save(client=getattr(request.user, 'client', None))
+        prefetch_related_objects([booking.room for booking in bookings], 'images')
+        data = BookingSerializer(bookings, many=True, context=self.get_serializer_context()).data
+        return Response(data, status=status.HTTP_201_CREATED)
+
+    @action(detail=False, methods=['get'])
+    def pending(self, request):
+        if not request.user.is_staff:
+            raise PermissionDenied("Черга заявок доступна лише адміністраторам готелів.")
+
+        queryset = self.filter_queryset(self.get_queryset()).filter(approved__isnull=True)
+        paginator = PendingQueuePagination()
+        page = paginator.paginate_queryset(queryset, request, view=self)
+        serializer = self.get_serializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
+
+    @extend_schema(request=BookingDecisionSerializer(many=True))
+    @action(detail=False, methods=['post'])
+    def decide(self, request):
+        """Пакетне підтвердження/відхилення: [{"id": 1, "approved": true}, ...]."""
+        if not request.user.is_staff:
+            raise PermissionDenied("Розглядати заявки можуть лише адміністратори готелів.")
+
+        serializer = BookingDecisionSerializer(data=request.data, many=True, max_length=BOOKING_DECISIONS_MAX)
+        serializer.is_valid(raise_exception=True)
+        decisions = {item['id']: item['approved'] for item in serializer.validated_data}
+        return Response(decide_bookings(request.user, decisions))
+
     @action(detail=True, methods=['get'])
     def download_invoice(self, request, pk=None):
         booking = self.get_object()
@@ -347,14 +710,25 @@ class BookingViewSet(viewsets.ModelViewSet):
         return response
 
 
+class CatalogCacheStatsView(APIView):
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response(catalog_cache_stats())
+
+
 class RegisterView(generics.CreateAPIView):
     queryset = Client.objects.all()
     permission_classes = [AllowAny]  # Дозволяємо всім реєструватися
     serializer_class = RegisterSerializer
 
-class NotificationViewSet(viewsets.ReadOnlyModelViewSet):
+class NotificationViewSet(SparseFieldsetMixin, viewsets.ReadOnlyModelViewSet):
     serializer_class = NotificationSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = KeysetPagination
+    # ?is_read=false — лише непрочитані (частковий індекс notification_unread_idx)
+    filter_backends = [DjangoFilterBackend]
+    filterset_fields = ['is_read']
 
     def get_queryset(self):
         return self.request.user.notifications.all().order_by('-created_at')
@@ -362,11 +736,31 @@ class NotificationViewSet(viewsets.ReadOnlyModelViewSet):
     @action(detail=True, methods=['post'], url_path='read')
     def mark_as_read(self, request, pk=None):
         notification = self.get_object()
-        notification.is_read = True
-        notification.save()
+        # Умовний UPDATE: повторне прочитання не зменшує лічильник удруге
+        if Notification.objects.filter(pk=notification.pk, is_read=False).update(is_read=True):
+            mark_read(request.user.id)
         return Response({'status': 'прочитано'}, status=status.HTTP_200_OK)
 
+    @action(detail=False, methods=['get'])
+    def unread_count(self, request):
+        return Response({'unread_count': get_unread_count(request.user.id)})
+
+    @extend_schema(request=BroadcastSerializer)
+    @action(detail=False, methods=['post'])
+    def broadcast(self, request):
+        if not request.user.is_staff:
+            raise PermissionDenied("Розсилки доступні лише адміністраторам.")
+
+        serializer = BroadcastSerializer(data=request.data, context=self.get_serializer_context())
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        recipients = send_broadcast(
+            audience_ids(data['audience'], data.get('hostel')), data['title'], data['message']
+        )
+        return Response({'recipients': recipients}, status=status.HTTP_202_ACCEPTED)
+
     @action(detail=False, methods=['post'], url_path='read-all')
     def mark_all_as_read(self, request):
         self.get_queryset().filter(is_read=False).update(is_read=True)
+        reset_unread(request.user.id)
         return Response({'status': 'всі сповіщення прочитані'}, status=status.HTTP_200_OK)
\ No newline at end of file
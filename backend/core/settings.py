@@ -44,6 +44,7 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     'rest_framework',
     "corsheaders",
     "django_filters",
@@ -93,6 +94,25 @@ CHANNEL_LAYERS = {
     },
 }
 
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": f"redis://{os.environ.get('REDIS_HOST', '127.0.0.1')}:6379/1",
+    },
+}
+
+# Кеш відповідей каталогу (готелі, кімнати) для анонімів і клієнтів, секунди
+CATALOG_CACHE_TIMEOUT = 300
+
+# Прочитані сповіщення, старші за стільки днів, переносяться в архів (prune_notifications)
+NOTIFICATION_RETENTION_DAYS = 90
+
+# Сповіщення, що прийшли в одне WebSocket-з'єднання протягом цього вікна, йдуть одним кадром
+NOTIFICATION_WS_COALESCE_MS = 100
+# Скільки байт сповіщень може бути недоставлено одному клієнту: черга, кадр, що пишеться в сокет,
+# і кадри без підтвердження {"ack": N}. Далі з'єднання закривається як повільне
+NOTIFICATION_WS_BUFFER_LIMIT = 256 * 1024
+
 CORS_ALLOWED_ORIGINS = [
     "http://localhost:5173",
 ]
@@ -134,7 +154,9 @@ AUTH_PASSWORD_VALIDATORS = [
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
         # 'booking.authentication.CustomJWTAuthentication',
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        # 'rest_framework_simplejwt.authentication.JWTAuthentication',
+        # Користувач з claims токена, без запиту до auth_user на кожен запит
+        'booking.authentication.ClaimsJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticatedOrReadOnly',
@@ -159,6 +181,22 @@ SPECTACULAR_SETTINGS = {
             "created_at": "HH:MM"
         }
         ```
+        Кілька подій, що прийшли протягом NOTIFICATION_WS_COALESCE_MS, надходять одним кадром
+        `{"batch": [...]}`. Після кожного кадру клієнт надсилає `{"ack": N}`, де N — кількість отриманих
+        кадрів. Якщо недоставлених або непідтверджених даних стає понад NOTIFICATION_WS_BUFFER_LIMIT байт,
+        з'єднання закривається з кодом 4008; при збої відправки — з кодом 1011.
+
+        **Live Availability:**
+        Зміни зайнятості номерів готелю (без авторизації):
+        `ws://{{host}}/ws/hostels/{id}/availability/`. Для неіснуючого чи неактивного готелю
+        з'єднання закривається з кодом 4404.
+
+        Формат повідомлення (ночі від start_date до last_date, state: pending | booked | free):
+        ```json
+        {
+            "deltas": [{"room": 7, "start_date": "2026-01-01", "last_date": "2026-01-03", "state": "booked"}]
+        }
+        ```
     ''',
     'VERSION': '1.0.0',
     'SERVE_INCLUDE_SCHEMA': False,
@@ -24,10 +24,9 @@ from django.conf.urls.static import static
 from django.conf import settings
 from rest_framework import routers
 from booking.views import BookingViewSet, HostelViewSet, ClientViewSet, RoomViewSet, NotificationViewSet, ReviewsViewSet
-from booking.serializers import UniversalTokenObtainView
+from booking.serializers import UniversalTokenObtainView, ClaimsTokenRefreshView
 from drf_spectacular.views import SpectacularAPIView, SpectacularRedocView, SpectacularSwaggerView
-from rest_framework_simplejwt.views import TokenRefreshView
-from booking.views import RegisterView
+from booking.views import RegisterView, CatalogCacheStatsView
 
 router = routers.DefaultRouter()
 router.register(r'hostels', HostelViewSet)
@@ -42,7 +41,8 @@ urlpatterns = [
     path('api/', include(router.urls)),
     path('api/register/client/', RegisterView.as_view(), name='auth_register'),
     path('api/login/', UniversalTokenObtainView.as_view(), name='login'),
-    path('api/token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
+    path('api/token/refresh/', ClaimsTokenRefreshView.as_view(), name='token_refresh'),
+    path('api/cache/stats/', CatalogCacheStatsView.as_view(), name='catalog_cache_stats'),
     # path('api-auth/', include('rest_framework.urls')),
 
     path('api/schema/', SpectacularAPIView.as_view(), name='schema'),
@@ -41,6 +41,8 @@ api.interceptors.response.use(
                 localStorage.removeItem('token');
                 localStorage.removeItem('refresh');
                 localStorage.removeItem('role');
+                localStorage.removeItem('lastNotificationId');
+                localStorage.removeItem('seenNotificationIds');
                 window.location.href = '/login';
             }
         }
@@ -48,4 +50,17 @@ api.interceptors.response.use(
     }
 );
 
+// Курсорна пагінація віддає сторінки без загальної кількості: проходимо посилання next до кінця
+export const fetchAll = async (url, config = {}) => {
+    const items = [];
+    let response = await api.get(url, { ...config, params: { page_size: 100, ...config.params } });
+    for (;;) {
+        const data = response.data;
+        if (Array.isArray(data)) return data;
+        items.push(...(data.results || []));
+        if (!data.next) return items;
+        response = await api.get(data.next);
+    }
+};
+
 export default api;
\ No newline at end of file
@@ -1,6 +1,9 @@
 import { useState, useEffect } from 'react';
 import { Snackbar, Alert } from '@mui/material';
 
+// Скільки id показаних сповіщень пам'ятаємо, щоб не показати повтор з відтворення
+const SEEN_LIMIT = 200;
+
 export default function LiveNotifications() {
     const [open, setOpen] = useState(false);
     const [message, setMessage] = useState('');
@@ -10,30 +13,81 @@ export default function LiveNotifications() {
         const token = localStorage.getItem('token');
         if (!token) return;
 
-        const ws = new WebSocket(`ws://localhost:8000/ws/notifications/?token=${token}`);
+        let ws;
+        let retryTimer;
+        let retryDelay = 1000;
+        let stopped = false;
+
+        const connect = () => {
+            // Після перепідключення сервер дошле сповіщення, доставлені після останнього отриманого (last_id)
+            const lastId = localStorage.getItem('lastNotificationId');
+            const resume = lastId ? `&last_id=${lastId}` : '';
+            ws = new WebSocket(`ws://localhost:8000/ws/notifications/?token=${token}${resume}`);
+            // Підтверджуємо кожен кадр: без ack сервер вважає клієнта повільним і закриває з'єднання (4008)
+            let received = 0;
+
+            ws.onopen = () => {
+                retryDelay = 1000;
+                console.log('✅ Підключено до живих сповіщень');
+            };
 
-        ws.onopen = () => console.log('✅ Підключено до живих сповіщень');
+            const handle = (data) => {
+                // Лічильник непрочитаних приходить і окремо, і разом зі сповіщенням
+                if (data.unread_count !== undefined) {
+                    window.dispatchEvent(new CustomEvent('unread-count', { detail: data.unread_count }));
+                }
+                if (data.resync) {
+                    // Курсор застарів (або пропущено забагато): список перечитується через REST
+                    localStorage.removeItem('lastNotificationId');
+                    window.dispatchEvent(new CustomEvent('notifications-resync'));
+                    return;
+                }
+                if (!data.title) return;
+                // Порядок доставки не збігається з порядком id: повтор після збою має менший id.
+                // Тому курсор — останнє отримане сповіщення, а дублікати відсіюємо за id
+                const seen = JSON.parse(localStorage.getItem('seenNotificationIds') || '[]');
+                if (seen.includes(data.id)) return;
+                localStorage.setItem('seenNotificationIds', JSON.stringify([...seen, data.id].slice(-SEEN_LIMIT)));
+                localStorage.setItem('lastNotificationId', data.id);
+                console.log('🔔 Отримано сповіщення:', data);
 
-        ws.onmessage = (event) => {
-            const data = JSON.parse(event.data);
-            console.log('🔔 Отримано сповіщення:', data);
+                setMessage(`${data.title}: ${data.message}`);
 
-            setMessage(`${data.title}: ${data.message}`);
+                if (data.message.toLowerCase().includes('відхилено')) {
+                    setSeverity('error');
+                } else if (data.message.toLowerCase().includes('схвалено')) {
+                    setSeverity('success');
+                } else {
+                    setSeverity('info');
+                }
 
-            if (data.message.toLowerCase().includes('відхилено')) {
-                setSeverity('error');
-            } else if (data.message.toLowerCase().includes('схвалено')) {
-                setSeverity('success');
-            } else {
-                setSeverity('info');
-            }
+                setOpen(true);
+            };
 
-            setOpen(true);
+            ws.onmessage = (event) => {
+                const data = JSON.parse(event.data);
+                ws.send(JSON.stringify({ ack: ++received }));
+                // Сповіщення, що прийшли майже одночасно, сервер надсилає одним кадром
+                (data.batch || [data]).forEach(handle);
+            };
+
+            ws.onclose = (event) => {
+                // 4008 — клієнт не встигав читати; пропущене дошле відтворення з last_id
+                console.log('❌ Зв`язок зі сповіщеннями втрачено', event.code);
+                if (stopped) return;
+                // Випадкова затримка, щоб після деплою клієнти не підключались одночасно
+                retryTimer = setTimeout(connect, retryDelay + Math.random() * 1000);
+                retryDelay = Math.min(retryDelay * 2, 30000);
+            };
         };
 
-        ws.onclose = () => console.log('❌ Зв`язок зі сповіщеннями втрачено');
+        connect();
 
-        return () => ws.close();
+        return () => {
+            stopped = true;
+            clearTimeout(retryTimer);
+            ws.close();
+        };
     }, []);
 
     const handleClose = (event, reason) => {
@@ -28,6 +28,8 @@ export default function Navbar({ toggleTheme, mode }) {
         localStorage.removeItem('refresh');
         localStorage.removeItem('role');
         localStorage.removeItem('user');
+        localStorage.removeItem('lastNotificationId');
+        localStorage.removeItem('seenNotificationIds');
         window.location.href = '/login';
     };
 
@@ -14,7 +14,7 @@ import AccountBoxIcon from '@mui/icons-material/AccountBox';
 import DomainIcon from '@mui/icons-material/Domain';
 import AssignmentIcon from '@mui/icons-material/Assignment';
 import PendingActionsIcon from '@mui/icons-material/PendingActions';
-import api from '../api';
+import api, { fetchAll } from '../api';
 
 export default function AdminDashboard() {
     const [currentTab, setCurrentTab] = useState(0);
@@ -56,14 +56,14 @@ export default function AdminDashboard() {
     const loadAllData = async () => {
         setLoading(true);
         try {
-            const [bookingsRes, hostelsRes, roomsRes] = await Promise.all([
-                api.get('bookings/'),
-                api.get('hostels/'),
-                api.get('rooms/')
+            const [bookingsData, hostelsData, roomsData] = await Promise.all([
+                fetchAll('bookings/'),
+                fetchAll('hostels/'),
+                fetchAll('rooms/')
             ]);
-            setBookings(Array.isArray(bookingsRes.data) ? bookingsRes.data : bookingsRes.data.results || []);
-            setMyHostels(Array.isArray(hostelsRes.data) ? hostelsRes.data : hostelsRes.data.results || []);
-            setMyRooms(Array.isArray(roomsRes.data) ? roomsRes.data : roomsRes.data.results || []);
+            setBookings(bookingsData);
+            setMyHostels(hostelsData);
+            setMyRooms(roomsData);
         } catch (error) {
             console.error(error);
             showNotify("Помилка при завантаженні даних", "error");
@@ -85,8 +85,7 @@ export default function AdminDashboard() {
             if (filterStartDate) params.start_from = filterStartDate;
             if (filterLastDate) params.start_to = filterLastDate;
 
-            const response = await api.get('bookings/', { params });
-            setBookings(Array.isArray(response.data) ? response.data : response.data.results || []);
+            setBookings(await fetchAll('bookings/', { params }));
             showNotify("Фільтри застосовано", "info");
         } catch (error) {
             console.error(error);
@@ -96,8 +95,8 @@ export default function AdminDashboard() {
 
     const clearFilters = () => {
         setFilterHotel(''); setFilterStartDate(''); setFilterLastDate(''); setFilterClientName('');
-        api.get('bookings/').then(res => {
-            setBookings(Array.isArray(res.data) ? res.data : res.data.results || []);
+        fetchAll('bookings/').then(data => {
+            setBookings(data);
             showNotify("Фільтри очищено", "info");
         });
     };
@@ -161,6 +160,19 @@ export default function AdminDashboard() {
         }
     };
 
+    const handleOpenEditHostel = async (id) => {
+        // Список повертає короткі картки, повні дані (опис, галерея) беремо з деталей
+        try {
+            const response = await api.get(`hostels/${id}/`);
+            setEditingHotel({ ...response.data });
+            setPendingGalleryFiles([]);
+            setIsEditModalOpen(true);
+        } catch (error) {
+            console.error(error);
+            showNotify("Не вдалося завантажити готель", "error");
+        }
+    };
+
     const handleDeleteHostel = async (id) => {
         if (!window.confirm("Видалити цей готель та всі його кімнати?")) return;
         try {
@@ -495,7 +507,7 @@ export default function AdminDashboard() {
                                     <TableCell>{h.city}, {h.address}</TableCell>
                                     <TableCell><Chip label={h.is_active ? "Активний" : "Прихований"} color={h.is_active ? "success" : "default"} variant="outlined" size="small" /></TableCell>
                                     <TableCell align="center">
-                                        <IconButton color="primary" onClick={() => { setEditingHotel({ ...h }); setPendingGalleryFiles([]); setIsEditModalOpen(true); }}><EditIcon /></IconButton>
+                                        <IconButton color="primary" onClick={() => handleOpenEditHostel(h.id)}><EditIcon /></IconButton>
                                         <IconButton color="error" onClick={() => handleDeleteHostel(h.id)}><DeleteIcon /></IconButton>
                                     </TableCell>
                                 </TableRow>
@@ -1,4 +1,4 @@
-import { useState, useEffect } from 'react';
+import { useState, useEffect, useRef } from 'react';
 import { useParams, useNavigate } from 'react-router-dom';
 import {
     Box, Typography, Container, Card, CardMedia, TextField,
@@ -9,7 +9,7 @@ import LocationOnIcon from '@mui/icons-material/LocationOn';
 import CalendarMonthIcon from '@mui/icons-material/CalendarMonth';
 import HotelIcon from '@mui/icons-material/Hotel';
 import CheckCircleOutlineIcon from '@mui/icons-material/CheckCircleOutline';
-import api from '../api';
+import api, { fetchAll } from '../api';
 
 export default function BookNow() {
     const { id } = useParams();
@@ -25,6 +25,10 @@ export default function BookNow() {
     const [availableRooms, setAvailableRooms] = useState([]);
     const [isSearchingRooms, setIsSearchingRooms] = useState(false);
     const [bookingRoomId, setBookingRoomId] = useState(null);
+    // Збільшується, коли номер на обрані дати звільнився і список треба перечитати
+    const [availabilityVersion, setAvailabilityVersion] = useState(0);
+    const datesRef = useRef({ startDate: '', lastDate: '' });
+    datesRef.current = { startDate, lastDate };
 
     const userRole = localStorage.getItem('role');
 
@@ -72,14 +76,13 @@ export default function BookNow() {
 
                 setIsSearchingRooms(true);
                 try {
-                    const response = await api.get('rooms/', {
+                    setAvailableRooms(await fetchAll('rooms/', {
                         params: {
                             hostel: id,
                             check_in: startDate,
                             check_out: lastDate
                         }
-                    });
-                    setAvailableRooms(Array.isArray(response.data) ? response.data : response.data.results || []);
+                    }));
                 } catch (error) {
                     console.error("Помилка пошуку кімнат:", error);
                 } finally {
@@ -91,7 +94,55 @@ export default function BookNow() {
         };
 
         fetchAvailableRooms();
-    }, [startDate, lastDate, id]);
+    }, [startDate, lastDate, id, availabilityVersion]);
+
+    useEffect(() => {
+        // Живі зміни зайнятості номерів готелю замість повторних запитів до rooms/
+        let ws;
+        let retryTimer;
+        let retryDelay = 1000;
+        let stopped = false;
+
+        const overlaps = (delta) => {
+            const { startDate: from, lastDate: to } = datesRef.current;
+            return from && to && delta.start_date < to && from < delta.last_date;
+        };
+
+        const connect = () => {
+            ws = new WebSocket(`ws://localhost:8000/ws/hostels/${id}/availability/`);
+
+            ws.onopen = () => {
+                retryDelay = 1000;
+            };
+
+            ws.onmessage = (event) => {
+                const { deltas = [] } = JSON.parse(event.data);
+                const relevant = deltas.filter(overlaps);
+                const taken = new Set(relevant.filter(d => d.state !== 'free').map(d => d.room));
+                if (taken.size) {
+                    setAvailableRooms(rooms => rooms.filter(room => !taken.has(room.id)));
+                }
+                if (relevant.some(d => d.state === 'free')) {
+                    setAvailabilityVersion(version => version + 1);
+                }
+            };
+
+            ws.onclose = (event) => {
+                // 4404 — готелю немає або він неактивний: перепідключення нічого не змінить
+                if (stopped || event.code === 4404) return;
+                retryTimer = setTimeout(connect, retryDelay + Math.random() * 1000);
+                retryDelay = Math.min(retryDelay * 2, 30000);
+            };
+        };
+
+        connect();
+
+        return () => {
+            stopped = true;
+            clearTimeout(retryTimer);
+            ws.close();
+        };
+    }, [id]);
 
     const handleBookRoom = async (roomId) => {
         if (userRole === 'admin') {
@@ -8,7 +8,7 @@ import SearchIcon from '@mui/icons-material/Search';
 import LocationOnIcon from '@mui/icons-material/LocationOn';
 import CalendarMonthIcon from '@mui/icons-material/CalendarMonth';
 import PersonOutlineIcon from '@mui/icons-material/PersonOutline';
-import api from '../api';
+import { fetchAll } from '../api';
 
 export default function Home() {
     const [hotels, setHotels] = useState([]);
@@ -17,9 +17,8 @@ export default function Home() {
     const userRole = localStorage.getItem('role');
 
     useEffect(() => {
-        api.get('hostels/')
-            .then(response => {
-                const data = response.data.results ? response.data.results : response.data;
+        fetchAll('hostels/')
+            .then(data => {
                 const activeHotels = data.filter(hotel => hotel.is_active !== false);
                 setHotels(activeHotels);
             })
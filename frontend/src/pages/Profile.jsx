@@ -16,7 +16,7 @@ import VisibilityOff from '@mui/icons-material/VisibilityOff';
 import EditIcon from '@mui/icons-material/Edit';
 import DoneAllIcon from '@mui/icons-material/DoneAll';
 import MarkEmailReadIcon from '@mui/icons-material/MarkEmailRead';
-import api from '../api';
+import api, { fetchAll } from '../api';
 
 export default function UserProfile() {
     const [currentTab, setCurrentTab] = useState(0);
@@ -25,6 +25,7 @@ export default function UserProfile() {
     const [userInfo, setUserInfo] = useState(null);
     const [bookings, setBookings] = useState([]);
     const [messages, setMessages] = useState([]);
+    const [unreadCount, setUnreadCount] = useState(0);
 
     const [snackbar, setSnackbar] = useState({ open: false, message: '', severity: 'success' });
 
@@ -46,14 +47,16 @@ export default function UserProfile() {
     const fetchAllProfileData = async () => {
         setLoading(true);
         try {
-            const [infoRes, bookingsRes, messagesRes] = await Promise.all([
+            const [infoRes, bookingsData, messagesData, unreadRes] = await Promise.all([
                 api.get('clients/me/'),
-                api.get('bookings/'),
-                api.get('notofications/')
+                fetchAll('bookings/'),
+                fetchAll('notofications/'),
+                api.get('notofications/unread_count/')
             ]);
             setUserInfo(infoRes.data);
-            setBookings(Array.isArray(bookingsRes.data) ? bookingsRes.data : bookingsRes.data.results || []);
-            setMessages(Array.isArray(messagesRes.data) ? messagesRes.data : messagesRes.data.results || []);
+            setBookings(bookingsData);
+            setMessages(messagesData);
+            setUnreadCount(unreadRes.data.unread_count);
         } catch (error) {
             console.error("Помилка завантаження даних:", error);
         } finally {
@@ -65,6 +68,18 @@ export default function UserProfile() {
         fetchAllProfileData();
     }, []);
 
+    useEffect(() => {
+        const onUnreadCount = (event) => setUnreadCount(event.detail);
+        // Пропущено забагато сповіщень для відтворення через WebSocket — перечитуємо список
+        const onResync = () => fetchAllProfileData();
+        window.addEventListener('unread-count', onUnreadCount);
+        window.addEventListener('notifications-resync', onResync);
+        return () => {
+            window.removeEventListener('unread-count', onUnreadCount);
+            window.removeEventListener('notifications-resync', onResync);
+        };
+    }, []);
+
     const showNotify = (message, severity = 'success') => {
         setSnackbar({ open: true, message, severity });
     };
@@ -80,6 +95,7 @@ export default function UserProfile() {
     const handleMarkAsRead = async (id) => {
         try {
             await api.post(`notofications/${id}/read/`, { is_read: true });
+            if (messages.some(m => m.id === id && !m.is_read)) setUnreadCount(count => Math.max(count - 1, 0));
             setMessages(prev => prev.map(m => m.id === id ? { ...m, is_read: true } : m));
             showNotify("Позначено як прочитане");
         } catch (error) {
@@ -92,6 +108,7 @@ export default function UserProfile() {
         try {
             await api.post('notofications/read-all/', { is_read: true });
             setMessages(prev => prev.map(m => ({ ...m, is_read: true })));
+            setUnreadCount(0);
             showNotify("Всі сповіщення прочитані");
         } catch (error) {
             console.error(error);
@@ -206,7 +223,6 @@ export default function UserProfile() {
 
     if (loading) return <Box sx={{ display: 'flex', justifyContent: 'center', mt: 10 }}><CircularProgress /></Box>;
 
-    const unreadCount = messages.filter(m => !m.is_read).length;
 
     return (
         <Container maxWidth="md" sx={{ mt: 5, mb: 10 }}>
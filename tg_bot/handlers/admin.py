@@ -1,9 +1,10 @@
 from aiogram import Router, F
+from aiogram.fsm.context import FSMContext
 from aiogram.types import Message, CallbackQuery
 
 from service.api import DjangoApiClient
 from keyboards.keyboards import (
-    admin_booking_keyboard, admin_hostels_keyboard,
+    admin_booking_keyboard, admin_bulk_decision_keyboard, admin_hostels_keyboard,
     admin_hostel_detail_keyboard, main_menu_admin
 )
 
@@ -15,25 +16,29 @@ def _require_admin(user_id: int) -> bool:
     return api.is_logged_in() and api.is_admin()
 
 @router.message(F.text == "Нові заявки")
-async def pending_bookings(message: Message):
+async def pending_bookings(message: Message, state: FSMContext):
     if not _require_admin(message.from_user.id):
         await message.answer("⚠️ Доступ тільки для адміністраторів.")
         return
 
     api = DjangoApiClient(message.from_user.id)
-    bookings = await api.get_bookings()
+    queue = await api.get_pending_queue()
 
-    if bookings is None or isinstance(bookings, dict) and "error" in bookings:
+    if queue is None:
         await message.answer("❌ Не вдалося завантажити заявки.")
         return
 
-    pending = [b for b in bookings if b.get("approved") is None]
+    pending = queue.get("results", [])
+    total = queue.get("count", len(pending))
 
-    if not pending:
+    if not total:
         await message.answer("✅ Нових заявок немає.")
         return
 
-    await message.answer(f"📋 Нових заявок: {len(pending)}")
+    if total > len(pending):
+        await message.answer(f"📋 Нових заявок: {total} (показано найстаріші {len(pending)})")
+    else:
+        await message.answer(f"📋 Нових заявок: {total}")
 
     for booking in pending:
         room = booking.get("room_details", {})
@@ -57,6 +62,35 @@ async def pending_bookings(message: Message):
             parse_mode="HTML"
         )
 
+    # Запам'ятовуємо показані заявки для кнопки «Підтвердити всі показані»
+    await state.update_data(shown_pending=[booking["id"] for booking in pending])
+    if len(pending) > 1:
+        await message.answer(
+            "Можна розглянути всі показані заявки одним запитом:",
+            reply_markup=admin_bulk_decision_keyboard(len(pending))
+        )
+
+
+@router.callback_query(F.data == "bulk_approve_shown")
+async def approve_shown_bookings(callback: CallbackQuery, state: FSMContext):
+    await callback.answer()
+    shown = (await state.get_data()).get("shown_pending", [])
+    if not shown:
+        await callback.message.edit_text("ℹ️ Список заявок застарів, відкрийте «Нові заявки» ще раз.")
+        return
+
+    api = DjangoApiClient(callback.from_user.id)
+    result = await api.decide_bookings({booking_id: True for booking_id in shown})
+    if result is None:
+        await callback.message.answer("❌ Помилка підтвердження.")
+        return
+
+    await state.update_data(shown_pending=[])
+    text = f"✅ <b>Підтверджено заявок: {len(result['approved'])}</b>"
+    if result["skipped"]:
+        text += f"\nℹ️ Вже розглянуті раніше: {len(result['skipped'])}"
+    await callback.message.edit_text(text, parse_mode="HTML")
+
 
 @router.callback_query(F.data.startswith("approve_"))
 async def approve_booking(callback: CallbackQuery):
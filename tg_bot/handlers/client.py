@@ -65,7 +65,7 @@ async def hostel_detail(callback: CallbackQuery):
         f"📍 {h['city']}, {h['address']}\n\n"
         f"📝 {h['about']}\n\n"
         f"🛏 Вільних місць: {h.get('free_seats', 0)}\n"
-        f"⭐ Рейтинг: {stars} ({avg})"
+        f"⭐ Рейтинг: {stars} ({avg}, відгуків: {h.get('reviews_count', 0)})"
     )
     await callback.message.edit_text(
         text,
@@ -199,13 +199,10 @@ async def my_bookings(message: Message):
         await message.answer("⚠️ Спочатку увійдіть у систему.")
         return
 
-    bookings = await api.get_bookings()
-    if not bookings:
-        await message.answer("📋 У вас немає бронювань.")
-        return
-
     status_map = {True: "✅ Підтверджено", False: "❌ Відхилено", None: "⏳ Очікує"}
-    for booking in bookings:
+    shown = 0
+    async for booking in api.iter_bookings():
+        shown += 1
         room = booking.get("room_details", {})
         text = (
             f"📌 <b>Бронювання #{booking['id']}</b>\n"
@@ -217,6 +214,9 @@ async def my_bookings(message: Message):
         )
         await message.answer(text, reply_markup=booking_actions_keyboard(booking["id"]), parse_mode="HTML")
 
+    if not shown:
+        await message.answer("📋 У вас немає бронювань.")
+
 @router.callback_query(F.data.startswith("cancel_booking_"))
 async def cancel_booking_confirm(callback: CallbackQuery):
     await callback.answer()
@@ -15,11 +15,9 @@ async def notifications_polling(bot: Bot, user_id: int):
             if not is_logged_in(user_id):
                 break
             api = DjangoApiClient(user_id)
-            notifications = await api.get_notifications()
-
-            if isinstance(notifications, list):
-                unread = [n for n in notifications if not n.get("is_read")]
+            unread = await api.get_unread_notifications()
 
+            if isinstance(unread, list):
                 for notif in unread:
                     await bot.send_message(
                         user_id,
@@ -92,6 +92,12 @@ def admin_booking_keyboard(booking_id: int) -> InlineKeyboardMarkup:
     builder.adjust(2)
     return builder.as_markup()
 
+def admin_bulk_decision_keyboard(count: int) -> InlineKeyboardMarkup:
+    builder = InlineKeyboardBuilder()
+    builder.button(text=f"✅ Підтвердити всі показані ({count})", callback_data="bulk_approve_shown")
+    builder.adjust(1)
+    return builder.as_markup()
+
 def admin_hostels_keyboard(hostels: list) -> InlineKeyboardMarkup:
     builder = InlineKeyboardBuilder()
     for hostel in hostels:
@@ -1,10 +1,17 @@
 import os
 import aiohttp
-from typing import Dict, Optional
+from collections import OrderedDict
+from typing import Any, AsyncIterator, Dict, Optional, Tuple
 from config import API_BASE_URL
 
 user_session: Dict[int, Dict[str, str]] = {}
 
+# Відповіді з ETag: (tg_user_id, url, params) -> (etag, тіло). Незмінні дані сервер віддає як 304
+ETAG_CACHE_SIZE = 512
+etag_cache: "OrderedDict[tuple, Tuple[str, Any]]" = OrderedDict()
+# Більше сторінка сповіщень не буває: max_page_size KeysetPagination
+NOTIFICATIONS_PAGE_SIZE = 100
+
 
 class DjangoApiClient:
     def __init__(self, tg_user_id: int):
@@ -27,6 +34,46 @@ class DjangoApiClient:
     def logout(self):
         user_session.pop(self.tg_user_id, None)
         self.session_data = {}
+        for key in [key for key in etag_cache if key[0] == self.tg_user_id]:
+            del etag_cache[key]
+
+    async def _get_json(self, session: aiohttp.ClientSession, url: str, params: dict = None) -> Optional[Any]:
+        """GET з If-None-Match: на 304 повертає збережене тіло, на помилку — None."""
+        key = (self.tg_user_id, url, tuple(sorted((params or {}).items())))
+        headers = self._headers()
+        cached = etag_cache.get(key)
+        if cached:
+            headers["If-None-Match"] = cached[0]
+        async with session.get(url, headers=headers, params=params) as resp:
+            if resp.status == 304 and cached:
+                etag_cache.move_to_end(key)
+                return cached[1]
+            if resp.status != 200:
+                return None
+            data = await resp.json()
+            etag = resp.headers.get("ETag")
+        if etag:
+            etag_cache[key] = (etag, data)
+            etag_cache.move_to_end(key)
+            if len(etag_cache) > ETAG_CACHE_SIZE:
+                etag_cache.popitem(last=False)
+        return data
+
+    async def _iter_pages(self, url: str, params: dict = None) -> AsyncIterator[dict]:
+        """Лениво гортає курсорні сторінки API за посиланням next."""
+        async with aiohttp.ClientSession() as session:
+            while url:
+                data = await self._get_json(session, url, params)
+                if data is None:
+                    return
+                if isinstance(data, list):
+                    for item in data:
+                        yield item
+                    return
+                for item in data.get("results", []):
+                    yield item
+                url = data.get("next")
+                params = None  # посилання next вже містить усі параметри
 
     async def login(self, username: str, password: str) -> dict:
         async with aiohttp.ClientSession() as session:
@@ -51,23 +98,33 @@ class DjangoApiClient:
                 data = await resp.json()
                 return resp.status == 201, data
 
+    def iter_hostels(self, search: str = None) -> AsyncIterator[dict]:
+        params = {"fields": "id,name,city"}
+        if search:
+            params["search"] = search
+        return self._iter_pages(f"{API_BASE_URL}/hostels/", params)
+
     async def get_hostels(self, search: str = None) -> list:
-        params = {"search": search} if search else {}
+        return [hostel async for hostel in self.iter_hostels(search)]
+
+    async def search_hostels(self, check_in: str, check_out: str, city: str = None, min_beds: int = 1) -> list:
+        params = {"check_in": check_in, "check_out": check_out, "min_beds": min_beds}
+        if city:
+            params["city"] = city
         async with aiohttp.ClientSession() as session:
             async with session.get(
-                f"{API_BASE_URL}/hostels/",
+                f"{API_BASE_URL}/hostels/search/",
                 headers=self._headers(),
                 params=params
             ) as resp:
-                return await resp.json() if resp.status == 200 else []
+                if resp.status != 200:
+                    return []
+                data = await resp.json()
+                return data.get("results", [])
 
     async def get_hostel(self, hostel_id: int) -> Optional[dict]:
         async with aiohttp.ClientSession() as session:
-            async with session.get(
-                f"{API_BASE_URL}/hostels/{hostel_id}/",
-                headers=self._headers()
-            ) as resp:
-                return await resp.json() if resp.status == 200 else None
+            return await self._get_json(session, f"{API_BASE_URL}/hostels/{hostel_id}/")
 
     async def get_hostel_availability(self, hostel_id: int, date: str = None) -> Optional[dict]:
         params = {"date": date} if date else {}
@@ -79,31 +136,45 @@ class DjangoApiClient:
             ) as resp:
                 return await resp.json() if resp.status == 200 else None
 
-    async def get_rooms(self, hostel_id: int, check_in: str = None, check_out: str = None) -> list:
-        params = {"hostel": hostel_id}
-        if check_in:
-            params["check_in"] = check_in
-        if check_out:
-            params["check_out"] = check_out
+    async def get_hostel_calendar(self, hostel_id: int, date_from: str = None, date_to: str = None) -> Optional[dict]:
+        params = {}
+        if date_from:
+            params["from"] = date_from
+        if date_to:
+            params["to"] = date_to
         async with aiohttp.ClientSession() as session:
             async with session.get(
-                f"{API_BASE_URL}/rooms/",
+                f"{API_BASE_URL}/hostels/{hostel_id}/calendar/",
                 headers=self._headers(),
                 params=params
             ) as resp:
-                return await resp.json() if resp.status == 200 else []
+                return await resp.json() if resp.status == 200 else None
+
+    async def get_rooms(self, hostel_id: int, check_in: str = None, check_out: str = None) -> list:
+        params = {"hostel": hostel_id, "fields": "id,number,bed,price"}
+        if check_in:
+            params["check_in"] = check_in
+        if check_out:
+            params["check_out"] = check_out
+        return [room async for room in self._iter_pages(f"{API_BASE_URL}/rooms/", params)]
+
+    def iter_bookings(self) -> AsyncIterator[dict]:
+        return self._iter_pages(f"{API_BASE_URL}/bookings/")
 
     async def get_bookings(self) -> list:
+        return [booking async for booking in self.iter_bookings()]
+
+    async def get_pending_queue(self) -> Optional[dict]:
+        """Перша сторінка черги заявок (найстаріші першими) разом із загальною кількістю."""
         async with aiohttp.ClientSession() as session:
             async with session.get(
-                f"{API_BASE_URL}/bookings/",
+                f"{API_BASE_URL}/bookings/pending/",
                 headers=self._headers()
             ) as resp:
-                return await resp.json() if resp.status == 200 else []
+                return await resp.json() if resp.status == 200 else None
 
     async def get_pending_bookings(self) -> list:
-        bookings = await self.get_bookings()
-        return [b for b in bookings if b.get("approved") is None]
+        return [booking async for booking in self._iter_pages(f"{API_BASE_URL}/bookings/pending/")]
 
     async def create_booking(self, payload: dict) -> tuple[bool, dict]:
         async with aiohttp.ClientSession() as session:
@@ -115,6 +186,17 @@ class DjangoApiClient:
                 data = await resp.json()
                 return resp.status == 201, data
 
+    async def create_group_booking(self, payload: dict) -> tuple[bool, Any]:
+        """payload: {"rooms": [id, ...], "start_date": ..., "last_date": ...} — усі номери або жодного."""
+        async with aiohttp.ClientSession() as session:
+            async with session.post(
+                f"{API_BASE_URL}/bookings/group/",
+                headers=self._headers(),
+                json=payload
+            ) as resp:
+                data = await resp.json()
+                return resp.status == 201, data
+
     async def cancel_booking(self, booking_id: int) -> tuple[bool, str]:
         async with aiohttp.ClientSession() as session:
             async with session.delete(
@@ -136,6 +218,16 @@ class DjangoApiClient:
                 data = await resp.json()
                 return resp.status == 200, data
 
+    async def decide_bookings(self, decisions: Dict[int, bool]) -> Optional[dict]:
+        """Пакетне рішення по заявках; повертає {"approved": [...], "rejected": [...], "skipped": [...]}."""
+        payload = [{"id": booking_id, "approved": approved} for booking_id, approved in decisions.items()]
+        async with aiohttp.ClientSession() as session:
+            async with session.post(
+                f"{API_BASE_URL}/bookings/decide/",
+                headers=self._headers(),
+                json=payload
+            ) as resp:
+                return await resp.json() if resp.status == 200 else None
 
     async def get_me(self) -> Optional[dict]:
         async with aiohttp.ClientSession() as session:
@@ -145,20 +237,34 @@ class DjangoApiClient:
             ) as resp:
                 return await resp.json() if resp.status == 200 else None
 
+    def iter_notifications(self) -> AsyncIterator[dict]:
+        return self._iter_pages(f"{API_BASE_URL}/notofications/")
+
     async def get_notifications(self) -> list:
+        return [notification async for notification in self.iter_notifications()]
+
+    async def get_unread_count(self) -> Optional[int]:
         async with aiohttp.ClientSession() as session:
             async with session.get(
-                f"{API_BASE_URL}/notofications/",
+                f"{API_BASE_URL}/notofications/unread_count/",
                 headers=self._headers()
             ) as resp:
                 if resp.status != 200:
-                    return []
+                    return None
                 data = await resp.json()
-                return data.get("results", data) if isinstance(data, dict) else data
+                return data.get("unread_count", 0)
 
     async def get_unread_notifications(self) -> list:
-        notifications = await self.get_notifications()
-        return [n for n in notifications if not n.get("is_read")]
+        # Лічильник з кешу дешевий; далі одна сторінка лише непрочитаних, решту забере наступний цикл
+        unread_count = await self.get_unread_count()
+        if not unread_count:
+            return []
+        params = {"is_read": "false", "page_size": min(unread_count, NOTIFICATIONS_PAGE_SIZE)}
+        async with aiohttp.ClientSession() as session:
+            data = await self._get_json(session, f"{API_BASE_URL}/notofications/", params)
+        if data is None:
+            return []
+        return data if isinstance(data, list) else data.get("results", [])
 
     async def mark_notification_read(self, notification_id: int) -> bool:
         async with aiohttp.ClientSession() as session: